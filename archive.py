@@ -0,0 +1,436 @@
+# archive.py - Searchable local archive (SQLite FTS5) of articles, drafts, deliveries and engagement
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+from config import ARCHIVE_ENABLED, ARCHIVE_PATH
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    link TEXT UNIQUE,
+    title TEXT NOT NULL,
+    summary TEXT,
+    source TEXT,
+    published TEXT,
+    published_ts REAL,
+    fetched_at TEXT NOT NULL,
+    rank_score INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_articles_source ON articles(source);
+CREATE INDEX IF NOT EXISTS idx_articles_published ON articles(published_ts);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, summary, source, content='articles', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts(rowid, title, summary, source)
+    VALUES (new.id, new.title, new.summary, new.source);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, summary, source)
+    VALUES ('delete', old.id, old.title, old.summary, old.source);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE OF title, summary, source ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, summary, source)
+    VALUES ('delete', old.id, old.title, old.summary, old.source);
+    INSERT INTO articles_fts(rowid, title, summary, source)
+    VALUES (new.id, new.title, new.summary, new.source);
+END;
+
+CREATE TABLE IF NOT EXISTS drafts (
+    id INTEGER PRIMARY KEY,
+    article_id INTEGER REFERENCES articles(id),
+    title TEXT,
+    content TEXT NOT NULL,
+    model TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_drafts_created ON drafts(created_at);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS drafts_fts USING fts5(
+    title, content, content='drafts', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS drafts_ai AFTER INSERT ON drafts BEGIN
+    INSERT INTO drafts_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS drafts_ad AFTER DELETE ON drafts BEGIN
+    INSERT INTO drafts_fts(drafts_fts, rowid, title, content)
+    VALUES ('delete', old.id, old.title, old.content);
+END;
+
+CREATE TABLE IF NOT EXISTS deliveries (
+    id INTEGER PRIMARY KEY,
+    draft_id INTEGER REFERENCES drafts(id),
+    title TEXT,
+    target TEXT NOT NULL,
+    delivered INTEGER NOT NULL,
+    detail TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_deliveries_draft ON deliveries(draft_id);
+
+CREATE TABLE IF NOT EXISTS engagement (
+    id INTEGER PRIMARY KEY,
+    post_ref TEXT UNIQUE NOT NULL,
+    article_id INTEGER REFERENCES articles(id),
+    metrics TEXT NOT NULL,
+    recorded_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_engagement_article ON engagement(article_id);
+"""
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def _timestamp(published):
+    """
+    RSS (RFC 822) or ISO 8601 date -> unix timestamp, None if unparseable
+    """
+    if not published:
+        return None
+    try:
+        return parsedate_to_datetime(published).timestamp()
+    except (TypeError, ValueError, IndexError):
+        pass
+    try:
+        return datetime.fromisoformat(published.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def _day_timestamp(day):
+    """
+    'YYYY-MM-DD' -> unix timestamp at local midnight
+    """
+    return datetime.strptime(day, "%Y-%m-%d").timestamp()
+
+
+def fts_query(text):
+    """
+    Turn free text into a safe FTS5 query: every word is quoted and
+    prefix-matched, words are AND-ed together
+    """
+    terms = []
+    for word in text.split():
+        word = word.replace('"', '""')
+        if word:
+            terms.append(f'"{word}"*')
+    return " ".join(terms)
+
+
+def parse_search(text):
+    """
+    Split GUI/CLI search text into keywords and filters:
+    'gemini source:verge since:2026-01-01 until:2026-02-01'
+    """
+    filters = {"query": [], "source": None, "since": None, "until": None}
+    for token in text.split():
+        key, sep, value = token.partition(":")
+        if sep and key.lower() in ("source", "since", "until") and value:
+            filters[key.lower()] = value
+        else:
+            filters["query"].append(token)
+    filters["query"] = " ".join(filters["query"])
+    return filters
+
+
+class NewsArchive:
+    """
+    Stores every fetched article, its score, generated drafts and delivery results
+    """
+
+    def __init__(self, path=ARCHIVE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    # ---------- writes ----------
+
+    def add_articles(self, news_items):
+        """
+        Insert new articles (keyed by link); existing ones keep their row
+        """
+        now = _now()
+        rows = [
+            (n.get("link") or None, n.get("title", ""), n.get("summary", ""),
+             n.get("source", ""), n.get("published", ""),
+             _timestamp(n.get("published")), now, n.get("rank_score"))
+            for n in news_items
+        ]
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO articles "
+                "(link, title, summary, source, published, published_ts, fetched_at, rank_score) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def update_scores(self, news_items):
+        """
+        Store the latest rank_score for each article
+        """
+        rows = [(n.get("rank_score"), n.get("link")) for n in news_items if n.get("link")]
+        with self._lock, self.conn:
+            self.conn.executemany("UPDATE articles SET rank_score = ? WHERE link = ?", rows)
+
+    def add_draft(self, news_item, content, model=None):
+        """
+        Store a generated post, returns its draft id
+        """
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                "SELECT id FROM articles WHERE link = ?", (news_item.get("link"),)
+            ).fetchone()
+            cursor = self.conn.execute(
+                "INSERT INTO drafts (article_id, title, content, model, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (row["id"] if row else None, news_item.get("title", ""), content, model, _now()),
+            )
+            return cursor.lastrowid
+
+    def add_delivery(self, content, title, target, delivered, detail=""):
+        """
+        Record a delivery attempt; linked to the draft when the text was not edited
+        """
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                "SELECT id FROM drafts WHERE content = ? ORDER BY id DESC LIMIT 1", (content,)
+            ).fetchone()
+            self.conn.execute(
+                "INSERT INTO deliveries (draft_id, title, target, delivered, detail, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (row["id"] if row else None, title, target, int(bool(delivered)), detail, _now()),
+            )
+
+    def _match_article(self, record):
+        """
+        Find the archived article an engagement record is about:
+        by article link, then article/draft title, then post text
+        """
+        if record.get("link"):
+            row = self.conn.execute(
+                "SELECT id FROM articles WHERE link = ?", (record["link"],)
+            ).fetchone()
+            if row:
+                return row["id"]
+        if record.get("title"):
+            row = self.conn.execute(
+                "SELECT id FROM articles WHERE title = ? ORDER BY id DESC LIMIT 1", (record["title"],)
+            ).fetchone() or self.conn.execute(
+                "SELECT article_id AS id FROM drafts WHERE title = ? AND article_id IS NOT NULL "
+                "ORDER BY id DESC LIMIT 1", (record["title"],)
+            ).fetchone()
+            if row:
+                return row["id"]
+        if record.get("content"):
+            row = self.conn.execute(
+                "SELECT article_id AS id FROM drafts WHERE content = ? AND article_id IS NOT NULL "
+                "ORDER BY id DESC LIMIT 1", (record["content"],)
+            ).fetchone()
+            if row:
+                return row["id"]
+        return None
+
+    def add_engagement(self, records):
+        """
+        Store engagement metrics per post (re-imports update the metrics).
+        records: dicts with post_ref, metrics and link/title/content to match on.
+        Returns how many were matched to an archived article.
+        """
+        matched = 0
+        now = _now()
+        with self._lock, self.conn:
+            for record in records:
+                article_id = self._match_article(record)
+                matched += article_id is not None
+                self.conn.execute(
+                    "INSERT INTO engagement (post_ref, article_id, metrics, recorded_at) "
+                    "VALUES (?, ?, ?, ?) ON CONFLICT(post_ref) DO UPDATE SET "
+                    "article_id = COALESCE(excluded.article_id, article_id), "
+                    "metrics = excluded.metrics, recorded_at = excluded.recorded_at",
+                    (record["post_ref"], article_id, json.dumps(record["metrics"]), now),
+                )
+        return matched
+
+    # ---------- queries ----------
+
+    def search_articles(self, query="", source=None, since=None, until=None, limit=50):
+        """
+        Keyword (FTS5) search over archived articles with optional source/date filters.
+        since/until are 'YYYY-MM-DD'. Results are article dicts, best match first.
+        """
+        sql = ["SELECT a.* FROM articles a"]
+        where, params = [], []
+
+        match = fts_query(query or "")
+        if match:
+            sql.append("JOIN articles_fts f ON f.rowid = a.id")
+            where.append("articles_fts MATCH ?")
+            params.append(match)
+        if source:
+            where.append("a.source LIKE ?")
+            params.append(f"%{source}%")
+        if since:
+            where.append("a.published_ts >= ?")
+            params.append(_day_timestamp(since))
+        if until:
+            where.append("a.published_ts < ?")
+            params.append(_day_timestamp(until) + 86400)
+
+        if where:
+            sql.append("WHERE " + " AND ".join(where))
+        sql.append("ORDER BY " + ("bm25(articles_fts), " if match else "") + "a.published_ts DESC")
+        sql.append("LIMIT ?")
+        params.append(limit)
+
+        with self._lock:
+            rows = self.conn.execute(" ".join(sql), params).fetchall()
+
+        return [
+            {
+                "title": r["title"],
+                "summary": r["summary"],
+                "link": r["link"] or "",
+                "source": r["source"],
+                "published": r["published"],
+                "rank_score": r["rank_score"] or 0,
+            }
+            for r in rows
+        ]
+
+    def search_drafts(self, query="", since=None, until=None, limit=50):
+        """
+        Keyword search over generated drafts, with their delivery results
+        """
+        sql = ["SELECT d.* FROM drafts d"]
+        where, params = [], []
+
+        match = fts_query(query or "")
+        if match:
+            sql.append("JOIN drafts_fts f ON f.rowid = d.id")
+            where.append("drafts_fts MATCH ?")
+            params.append(match)
+        if since:
+            where.append("d.created_at >= ?")
+            params.append(since)
+        if until:
+            where.append("d.created_at < ?")
+            params.append(until + "T99")
+
+        if where:
+            sql.append("WHERE " + " AND ".join(where))
+        sql.append("ORDER BY " + ("bm25(drafts_fts), " if match else "") + "d.id DESC")
+        sql.append("LIMIT ?")
+        params.append(limit)
+
+        with self._lock:
+            rows = self.conn.execute(" ".join(sql), params).fetchall()
+            results = []
+            for r in rows:
+                deliveries = self.conn.execute(
+                    "SELECT target, delivered, detail, created_at FROM deliveries "
+                    "WHERE draft_id = ? ORDER BY id", (r["id"],)
+                ).fetchall()
+                results.append({
+                    "id": r["id"],
+                    "title": r["title"],
+                    "content": r["content"],
+                    "model": r["model"],
+                    "created_at": r["created_at"],
+                    "deliveries": [dict(d) for d in deliveries],
+                })
+        return results
+
+    def published_drafts(self, limit=500):
+        """
+        Drafts successfully delivered to LinkedIn (webhook/Buffer), newest first,
+        with the latest engagement metrics of their article (None if there are none)
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT DISTINCT d.id, d.title, d.content, d.created_at, "
+                "(SELECT e.metrics FROM engagement e WHERE e.article_id = d.article_id "
+                "ORDER BY e.recorded_at DESC LIMIT 1) AS metrics FROM drafts d "
+                "JOIN deliveries v ON v.draft_id = d.id "
+                "WHERE v.delivered = 1 AND v.target != 'local' "
+                "ORDER BY d.id DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [{**dict(r), "metrics": json.loads(r["metrics"]) if r["metrics"] else None}
+                for r in rows]
+
+    def engagement_articles(self):
+        """
+        Articles with engagement metrics attached, for fitting ranking weights
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT a.title, a.summary, a.link, a.source, a.published, a.fetched_at, "
+                "e.metrics FROM engagement e JOIN articles a ON a.id = e.article_id"
+            ).fetchall()
+        return [
+            {
+                "title": r["title"],
+                "summary": r["summary"] or "",
+                "link": r["link"] or "",
+                "source": r["source"],
+                "published": r["published"],
+                "fetched_at": r["fetched_at"],
+                "metrics": json.loads(r["metrics"]),
+            }
+            for r in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def get_archive():
+    """
+    Shared archive instance (None when archiving is disabled or unavailable)
+    """
+    global _archive
+    if not ARCHIVE_ENABLED:
+        return None
+    with _archive_lock:
+        if _archive is None:
+            try:
+                _archive = NewsArchive()
+            except sqlite3.Error as e:
+                print(f"⚠️ Archive unavailable: {e}")
+                return None
+        return _archive
+
+
+def archive_call(method, *args, **kwargs):
+    """
+    Call an archive method, never letting archive errors break the pipeline
+    """
+    archive = get_archive()
+    if archive is None:
+        return None
+    try:
+        return getattr(archive, method)(*args, **kwargs)
+    except sqlite3.Error as e:
+        print(f"⚠️ Archive {method} failed: {e}")
+        return None
@@ -0,0 +1,235 @@
+# article_extractor.py - Optional full-article text for the top-ranked items
+#
+# RSS summaries are often a teaser. For the top ARTICLE_TOP_K ranked items
+# only, the article page is downloaded (at most ARTICLE_MAX_BYTES) and its
+# main text extracted readability-style: paragraphs outside navigation,
+# scripts, headers, footers and asides, preferring those inside <article>
+# or <main>. Pages are fetched concurrently with a hard overall deadline;
+# anything not done by then is simply left out. Extracted text is cached
+# in SQLite by URL, so an article is only downloaded once.
+
+import codecs
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from html.parser import HTMLParser
+
+from config import (
+    ARTICLE_TEXT_ENABLED, ARTICLE_TOP_K, ARTICLE_WORKERS, ARTICLE_MAX_BYTES,
+    ARTICLE_DEADLINE, ARTICLE_MAX_CHARS, ARTICLE_CACHE_PATH
+)
+from metrics import span
+from sources import iter_chunks, is_local
+
+
+SKIP_TAGS = {"script", "style", "noscript", "nav", "header", "footer", "aside",
+             "form", "figure", "button", "svg", "iframe", "select"}
+BLOCK_TAGS = {"p", "li", "blockquote", "h2", "h3", "pre"}
+MAIN_TAGS = {"article", "main"}
+VOID_TAGS = {"br", "img", "hr", "meta", "link", "input", "source", "wbr"}
+MIN_PARAGRAPH_CHARS = 40
+
+
+class _TextParser(HTMLParser):
+    """
+    Collects paragraph text, remembering which paragraphs sit inside <article>/<main>
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.paragraphs = []   # (text, in_main)
+        self._skip = 0
+        self._main = 0
+        self._block = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            if tag == "br":
+                self.handle_data(" ")
+            return
+        if tag in SKIP_TAGS:
+            self._skip += 1
+        elif tag in MAIN_TAGS:
+            self._main += 1
+        elif tag in BLOCK_TAGS and not self._skip:
+            self._flush()
+            self._block = []
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag in MAIN_TAGS:
+            self._main = max(0, self._main - 1)
+        elif tag in BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data):
+        if self._block is not None and not self._skip:
+            self._block.append(data)
+
+    def _flush(self):
+        if self._block is not None:
+            text = " ".join("".join(self._block).split())
+            if len(text) >= MIN_PARAGRAPH_CHARS:
+                self.paragraphs.append((text, self._main > 0))
+        self._block = None
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def extract_text(html, max_chars=ARTICLE_MAX_CHARS):
+    """
+    Main text of an HTML page, paragraphs separated by blank lines
+    """
+    parser = _TextParser()
+    parser.feed(html)
+    parser.close()
+
+    main = [text for text, in_main in parser.paragraphs if in_main]
+    paragraphs = main or [text for text, _ in parser.paragraphs]
+
+    result = []
+    length = 0
+    for text in paragraphs:
+        if length + len(text) > max_chars:
+            break
+        result.append(text)
+        length += len(text) + 2
+    return "\n\n".join(result)
+
+
+def fetch_article_text(url, max_bytes=ARTICLE_MAX_BYTES, timeout=ARTICLE_DEADLINE):
+    """
+    Download at most max_bytes of the page and extract its text
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    parts = []
+    received = 0
+    chunks = iter_chunks(url, chunk_size=16384, timeout=timeout)
+    try:
+        for chunk in chunks:
+            received += len(chunk)
+            parts.append(decoder.decode(chunk))
+            if received >= max_bytes:
+                break
+    finally:
+        chunks.close()
+    return extract_text("".join(parts))
+
+
+class ArticleCache:
+    """
+    url -> extracted text, in SQLite
+    """
+
+    def __init__(self, path=ARTICLE_CACHE_PATH):
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS articles (url TEXT PRIMARY KEY, text TEXT, fetched_at REAL)"
+        )
+        self.conn.commit()
+
+    def get_many(self, urls):
+        urls = list(urls)
+        if not urls:
+            return {}
+        placeholders = ",".join("?" * len(urls))
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT url, text FROM articles WHERE url IN ({placeholders})", urls
+            ).fetchall()
+        return dict(rows)
+
+    def put(self, url, text):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO articles (url, text, fetched_at) VALUES (?, ?, ?)",
+                (url, text, time.time())
+            )
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_article_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ArticleCache()
+        return _cache
+
+
+def article_targets(news_items, top_k=ARTICLE_TOP_K):
+    """
+    The items among the first top_k that still need their article text
+    """
+    if not ARTICLE_TEXT_ENABLED or top_k <= 0:
+        return []
+    return [n for n in news_items[:top_k]
+            if n.get("link") and not n.get("body") and not is_local(n["link"])]
+
+
+def use_cached(targets, s):
+    """
+    Fill news['body'] from the cache, returns the items still missing
+    """
+    cached = get_article_cache().get_many({n["link"] for n in targets})
+    missing = []
+    for news in targets:
+        if news["link"] in cached:
+            if cached[news["link"]]:
+                news["body"] = cached[news["link"]]
+            s.add("cache_hits")
+        else:
+            missing.append(news)
+    return missing
+
+
+def store_text(news, text, s):
+    get_article_cache().put(news["link"], text)  # empty text cached too: nothing to extract
+    if text:
+        news["body"] = text
+        s.add("extracted")
+
+
+def enrich_articles(news_items, top_k=ARTICLE_TOP_K, deadline=ARTICLE_DEADLINE,
+                    workers=ARTICLE_WORKERS):
+    """
+    Attach news['body'] (extracted article text) to the first top_k items.
+    Returns within deadline seconds; slow pages are skipped for this run.
+    """
+    targets = article_targets(news_items, top_k)
+    if not targets:
+        return news_items
+
+    with span("extract", items=len(targets)) as s:
+        missing = use_cached(targets, s)
+
+        if missing:
+            pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="extract")
+            futures = {pool.submit(fetch_article_text, n["link"]): n for n in missing}
+            done, not_done = wait(futures, timeout=deadline)
+            # Don't wait for stragglers; their connections time out on their own.
+            # Queued ones never start (cancel_futures= would need Python 3.9)
+            for future in not_done:
+                future.cancel()
+            pool.shutdown(wait=False)
+
+            for future in done:
+                news = futures[future]
+                try:
+                    text = future.result()
+                except Exception as e:
+                    print(f"⚠️ Could not read article {news['link'][:60]}: {e}")
+                    s.add("errors")
+                    continue
+                store_text(news, text, s)
+            s.add("timed_out", len(not_done))
+
+    return news_items
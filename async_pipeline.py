@@ -0,0 +1,524 @@
+# async_pipeline.py - The whole pipeline on one asyncio event loop
+#
+# fetch -> filter/dedup/budget -> rank -> extract -> generate -> deliver,
+# with httpx for HTTP and AsyncGroq for the LLM instead of a thread per
+# request. Every stage has its own concurrency limit (ASYNC_STAGE_LIMITS),
+# shared by all jobs on the loop, so many accounts or feed sets can run side
+# by side. Cancelling a job (or Ctrl+C) cancels its in-flight requests.
+# Parsing, ranking and validation reuse the sync code unchanged, and LLM
+# calls take their turn in the sync LLMDispatcher, so both share one rate limit.
+#
+# AsyncLoopThread keeps a loop running in a background thread for callers
+# that are not async themselves (the GUI).
+#
+#   python main.py run --async
+#   python main.py run --async --jobs accounts.json
+
+import asyncio
+import codecs
+import functools
+import json
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from groq import AsyncGroq, RateLimitError
+
+from config import (
+    LLM_MODELS, LLM_TIMEOUT, POST_CANDIDATES,
+    ARTICLE_TOP_K, ARTICLE_DEADLINE, ARTICLE_MAX_BYTES, EXTRA_SOURCES,
+    ASYNC_STAGE_LIMITS
+)
+import linkedin_poster
+import post_generator
+from metrics import span
+from archive import archive_call
+from sources import RSSAdapter, FeedStream, USER_AGENT, download, is_local
+from news_fetcher import build_news_sources, combine_news, rank_and_sort_news, select_profile
+from article_extractor import extract_text, article_targets, use_cached, store_text
+from post_generator import build_prompt, build_messages, check_candidate, record_usage
+from llm_dispatcher import estimate_tokens
+from link_preview import prefetch_previews, attach_preview
+from linkedin_poster import LocalSaver, checked_post, webhook_payload
+
+
+ASYNC_AVAILABLE = httpx is not None
+
+
+# to_thread() and contextlib.aclosing() are 3.9/3.10; these work on 3.8
+
+async def to_thread(func, *args, **kwargs):
+    """
+    func(*args, **kwargs) in the loop's default executor
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
+@asynccontextmanager
+async def aclosing(agen):
+    try:
+        yield agen
+    finally:
+        await agen.aclose()
+
+
+class AsyncPipeline:
+    """
+    Shared HTTP/LLM clients and per-stage limits for any number of jobs.
+    Use as `async with AsyncPipeline() as pipeline:`
+    """
+
+    def __init__(self, progress=None, limits=None, llm=None):
+        if httpx is None:
+            raise RuntimeError("httpx is not installed (pip install httpx)")
+        self.progress = progress
+        stage_limits = {**ASYNC_STAGE_LIMITS, **(limits or {})}
+        self.limits = {stage: asyncio.Semaphore(n) for stage, n in stage_limits.items()}
+        self.http = None
+        self.llm = llm
+        self._own_llm = llm is None
+        # Threads that wait for a turn in the sync LLMDispatcher (see _create)
+        self._llm_turns = ThreadPoolExecutor(max_workers=stage_limits["generate"],
+                                             thread_name_prefix="llm-turn")
+        self._corpora = {}   # feed set -> task fetching and ranking it (shared by jobs)
+
+    async def __aenter__(self):
+        connections = sum(ASYNC_STAGE_LIMITS.values())
+        self.http = httpx.AsyncClient(
+            headers={"User-Agent": USER_AGENT},
+            timeout=httpx.Timeout(15.0),
+            limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections),
+            follow_redirects=True,
+        )
+        if self.llm is None:
+            # Retries and pacing are done by the sync dispatcher (see _create).
+            # Same key/endpoint as the sync client (kept current by the settings store)
+            self.llm = AsyncGroq(api_key=post_generator.client.api_key,
+                                 base_url=post_generator.client.base_url, max_retries=0)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.http.aclose()
+        if self._own_llm:
+            await self.llm.close()
+        self._llm_turns.shutdown(wait=False)
+
+    def report(self, message):
+        print(f"⏳ {message}")
+        if self.progress:
+            self.progress(message)
+
+    # ---------- HTTP ----------
+
+    async def _iter_bytes(self, url, params=None, max_bytes=None):
+        """
+        Raw chunks of an http(s) URL or a local file (read in a worker thread)
+        """
+        if is_local(url):
+            yield await to_thread(download, url, max_bytes=max_bytes)
+            return
+        async with self.http.stream("GET", url, params=params) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                yield chunk
+
+    async def _read(self, url, max_bytes=None):
+        """
+        Body of url, stopping after max_bytes if given
+        """
+        data = bytearray()
+        async with aclosing(self._iter_bytes(url, max_bytes=max_bytes)) as chunks:
+            async for chunk in chunks:
+                data += chunk
+                if max_bytes is not None and len(data) >= max_bytes:
+                    break
+        return bytes(data if max_bytes is None else data[:max_bytes])
+
+    # ---------- fetch ----------
+
+    async def _stream_rss(self, adapter):
+        stream = FeedStream(adapter.accept, adapter.max_matches, adapter.max_bytes,
+                            adapter.keep_misses)
+        with span("feed_stream", feed=adapter.url, mode="async") as s:
+            async with aclosing(self._iter_bytes(adapter.url)) as chunks:
+                async for chunk in chunks:
+                    if stream.feed(chunk):
+                        break
+            for key, value in stream.stats.items():
+                s.add(key, value)
+            items = stream.items + stream.misses
+            s.add("entries_kept", len(items))
+
+        source = adapter.name or stream.feed_title or "Unknown"
+        for item in items:
+            item["source"] = source
+        return items
+
+    async def fetch_source(self, adapter):
+        """
+        Items of one source adapter
+        """
+        async with self.limits["fetch"]:
+            print(f"📡 Fetching: {adapter.url[:50]}...")
+            if type(adapter).fetch is not RSSAdapter.fetch:
+                # Paginated APIs (arXiv, Hacker News, JSON Feed) keep their own
+                # rate limits, so they run as they are in a worker thread
+                return await to_thread(list, adapter.fetch())
+
+            if adapter.stream:
+                try:
+                    return await self._stream_rss(adapter)
+                except ET.ParseError as e:
+                    print(f"⚠️ Streaming parse failed for {adapter.url[:50]} ({e}), using feedparser")
+
+            with span("feed_fetch", feed=adapter.url, kind=adapter.kind, mode="async") as s:
+                raw = await self._read(adapter.url, adapter.max_bytes)
+                s.add("bytes", len(raw))
+            return list(adapter.entries(adapter.parse(raw)))
+
+    async def fetch_news(self, feeds=None, sources=None):
+        """
+        Async fetch_latest_news(): all sources concurrently, then the usual
+        filter/dedup/budget. feeds/sources default to the config.
+        """
+        adapters = build_news_sources(feeds, EXTRA_SOURCES if sources is None else sources)
+        with span("fetch", mode="async") as run_span:
+            fetched = await asyncio.gather(*(self.fetch_source(a) for a in adapters),
+                                           return_exceptions=True)
+            results = []
+            for adapter, entries in zip(adapters, fetched):
+                if isinstance(entries, Exception):
+                    print(f"❌ Error fetching {adapter.url}: {entries}")
+                    entries = None
+                elif isinstance(entries, BaseException):
+                    raise entries
+                results.append((adapter, entries))
+            # Redirect resolution uses the cached, pooled resolver from url_canon
+            all_news = await to_thread(combine_news, results, run_span)
+
+        print(f"✅ Found {len(all_news)} news items")
+        archive_call("add_articles", all_news)
+        return all_news
+
+    # ---------- extract ----------
+
+    async def _article_text(self, url):
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        parts = []
+        received = 0
+        async with self.limits["extract"]:
+            async with aclosing(self._iter_bytes(url)) as chunks:
+                async for chunk in chunks:
+                    received += len(chunk)
+                    parts.append(decoder.decode(chunk))
+                    if received >= ARTICLE_MAX_BYTES:
+                        break
+        return extract_text("".join(parts))
+
+    async def extract(self, news_items, top_k=ARTICLE_TOP_K, deadline=ARTICLE_DEADLINE):
+        """
+        Async enrich_articles(): pages still loading at the deadline are cancelled
+        """
+        targets = article_targets(news_items, top_k)
+        if not targets:
+            return news_items
+
+        with span("extract", items=len(targets), mode="async") as s:
+            missing = use_cached(targets, s)
+            tasks = {asyncio.create_task(self._article_text(n["link"])): n for n in missing}
+            if tasks:
+                done, not_done = await asyncio.wait(tasks, timeout=deadline)
+                for task in not_done:
+                    task.cancel()
+                for task in done:
+                    news = tasks[task]
+                    try:
+                        text = task.result()
+                    except Exception as e:
+                        print(f"⚠️ Could not read article {news['link'][:60]}: {e}")
+                        s.add("errors")
+                        continue
+                    store_text(news, text, s)
+                s.add("timed_out", len(not_done))
+        return news_items
+
+    async def _fetch_and_rank(self, feeds, sources):
+        news = await self.fetch_news(feeds, sources)
+        return await to_thread(rank_and_sort_news, news)
+
+    async def ranked_corpus(self, feeds=None, sources=None):
+        """
+        Fetched and ranked news, once per feed set: jobs over the same feeds
+        (e.g. one per topic profile) share one fetch
+        """
+        key = (tuple(feeds or ()), json.dumps(sources, sort_keys=True))
+        if key not in self._corpora:
+            self._corpora[key] = asyncio.ensure_future(self._fetch_and_rank(feeds, sources))
+        # Shielded: cancelling one job must not cancel the fetch for the others
+        return await asyncio.shield(self._corpora[key])
+
+    async def fetch_ranked(self, feeds=None, sources=None):
+        """
+        Fetched, ranked news with article text for the best items (what the GUI shows)
+        """
+        self.report("Connecting to news sources...")
+        news = await self.fetch_news(feeds, sources)
+        self.report("Ranking by relevance...")
+        ranked = await to_thread(rank_and_sort_news, news)
+        self.report("Reading top articles...")
+        await self.extract(ranked)
+        self.report("Processing complete...")
+        return ranked
+
+    # ---------- generate ----------
+
+    async def _turn(self, dispatcher, ticket, tokens):
+        """
+        dispatcher.acquire() without blocking the loop; returns its window entry
+        """
+        future = self._llm_turns.submit(dispatcher.acquire, ticket, tokens)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # The turn may still be granted after we stopped waiting: give it back
+            def release(f):
+                if not f.cancelled() and f.exception() is None:
+                    dispatcher.release()
+            future.add_done_callback(release)
+            raise
+
+    async def _create(self, **request):
+        """
+        One completion, paced by the same LLMDispatcher as the sync code, so
+        sync and async calls (GUI chat included) share the rate-limit window,
+        the x-ratelimit-* budgets and the 429 back-off
+        """
+        dispatcher = post_generator.dispatcher
+        tokens = estimate_tokens(request)
+        ticket = dispatcher.new_ticket()
+        for attempt in range(dispatcher.max_retries + 1):
+            async with self.limits["generate"]:
+                entry = await self._turn(dispatcher, ticket, tokens)
+                try:
+                    raw = await self.llm.chat.completions.with_raw_response.create(**request)
+                except RateLimitError as e:
+                    if attempt == dispatcher.max_retries:
+                        raise
+                    dispatcher.rate_limited(e, attempt)
+                    continue
+                finally:
+                    dispatcher.release()
+            return dispatcher.completed(entry, raw.headers, await raw.parse())
+
+    async def complete(self, prompt):
+        """
+        One completion, falling back along LLM_MODELS on errors; returns (text, model)
+        """
+        error = None
+        for model in LLM_MODELS:
+            try:
+                with span("llm_call", model=model, mode="async") as s:
+                    response = await self._create(
+                        model=model,
+                        messages=build_messages(prompt),
+                        temperature=0.7,
+                        max_tokens=250,
+                        timeout=LLM_TIMEOUT
+                    )
+                    record_usage(s, response)
+                return response.choices[0].message.content, model
+            except Exception as e:
+                error = e
+                print(f"⚠️ {model} failed: {e}")
+        raise error
+
+    async def generate(self, news_item, count=POST_CANDIDATES):
+        """
+        Async generate_post_candidates(); the best candidate is archived as the draft
+        """
+        prompt = build_prompt(news_item)
+        prefetch_previews([news_item])
+        candidates = []
+
+        with span("generate_candidates", requested=count, mode="async") as s:
+            results = await asyncio.gather(*(self.complete(prompt) for _ in range(count)),
+                                           return_exceptions=True)
+            for result in results:
+                if isinstance(result, BaseException):
+                    print(f"❌ Error generating post: {result}")
+                    s.add("failed")
+                    continue
+                candidate = check_candidate(*result, news_item["link"])
+                if candidate is None:
+                    s.add("invalid")
+                    continue
+                candidates.append(candidate)
+            s.add("candidates", len(candidates))
+
+        attach_preview(news_item)
+        candidates.sort(key=lambda c: c["quality"], reverse=True)
+        if candidates:
+            archive_call("add_draft", news_item, candidates[0]["post"], model=candidates[0]["model"])
+        return candidates
+
+    # ---------- deliver ----------
+
+    async def deliver(self, content, news_item, webhook_url=None):
+        """
+        Async WebhookPoster.post_to_webhook()
+        """
+        webhook_url = webhook_url or linkedin_poster.WEBHOOK_URL
+        title = news_item["title"]
+        if not webhook_url:
+            print("❌ No webhook URL configured. Set WEBHOOK_URL in .env file.")
+            return False
+
+        content = checked_post(content, title, "webhook", news_item.get("link"))
+        if content is None:
+            return False
+
+        payload = webhook_payload(content, title, news_item.get("preview"))
+        try:
+            async with self.limits["deliver"]:
+                with span("delivery", target="webhook", mode="async") as s:
+                    response = await self.http.post(webhook_url, json=payload, timeout=10)
+                    s.set("http_status", response.status_code)
+        except httpx.HTTPError as e:
+            print(f"❌ Error posting to webhook: {e}")
+            archive_call("add_delivery", content, title, "webhook", False, str(e))
+            return False
+
+        if response.status_code in [200, 201, 202]:
+            print("✅ Post sent to webhook successfully!")
+            archive_call("add_delivery", content, title, "webhook", True, str(response.status_code))
+            return True
+        print(f"❌ Webhook error: {response.status_code} - {response.text}")
+        archive_call("add_delivery", content, title, "webhook", False,
+                     f"{response.status_code} {response.text[:200]}")
+        return False
+
+    # ---------- jobs ----------
+
+    async def _post_item(self, news_item, job):
+        candidates = await self.generate(news_item)
+        post = candidates[0]["post"] if candidates else None
+        delivered = False
+        if post and job.get("dry_run"):
+            print(f"🧪 [dry-run] Generated post for: {news_item['title'][:60]}")
+        elif post and job.get("local"):
+            delivered = bool(await to_thread(LocalSaver().save_post, post, news_item["title"]))
+        elif post:
+            delivered = await self.deliver(post, news_item, job.get("webhook_url"))
+        return {"job": job.get("name", "default"), "title": news_item["title"],
+                "link": news_item.get("link", ""), "post": post, "delivered": delivered}
+
+    async def run_job(self, job):
+        """
+        One account / feed set end to end. Job keys (all optional):
+        name, feeds, sources, topic, count, select(ranked) -> items, webhook_url,
+        local, dry_run. Jobs with the same feeds and sources share one fetch.
+        Returns [{"job", "title", "link", "post", "delivered"}]
+        """
+        name = job.get("name", "default")
+        self.report(f"[{name}] fetching")
+        ranked = await self.ranked_corpus(job.get("feeds"), job.get("sources"))
+
+        if job.get("select"):
+            selected = job["select"](ranked)
+        else:
+            items = select_profile(ranked, job["topic"]) if job.get("topic") else ranked
+            selected = items[:job.get("count", 1)]
+        if not selected:
+            print(f"❌ [{name}] No article matches the selection policy.")
+            return []
+
+        self.report(f"[{name}] generating {len(selected)} post(s)")
+        await self.extract(selected, top_k=len(selected))
+        return list(await asyncio.gather(*(self._post_item(n, job) for n in selected)))
+
+    async def run_many(self, jobs):
+        """
+        Run jobs concurrently; a failing job does not stop the others.
+        Returns the results of all jobs in one list.
+        """
+        outcomes = await asyncio.gather(*(self.run_job(job) for job in jobs),
+                                        return_exceptions=True)
+        results = []
+        for job, outcome in zip(jobs, outcomes):
+            if isinstance(outcome, BaseException):
+                print(f"❌ Job {job.get('name', 'default')} failed: {outcome}")
+                continue
+            results.extend(outcome)
+        return results
+
+
+def load_jobs(path):
+    """
+    Job list from a JSON file: [{"name": "...", "feeds": [...], "topic": "...", "webhook_url": "..."}]
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        jobs = json.load(f)
+    if not isinstance(jobs, list):
+        raise ValueError(f"{path}: expected a JSON list of jobs")
+    return jobs
+
+
+def run_pipeline(jobs, progress=None):
+    """
+    Run jobs on a new event loop and block until they are done (Ctrl+C cancels them)
+    """
+    async def main():
+        async with AsyncPipeline(progress=progress) as pipeline:
+            return await pipeline.run_many(jobs)
+    return asyncio.run(main())
+
+
+async def fetch_ranked_news(progress=None):
+    """
+    Coroutine for AsyncLoopThread.submit(): ranked news from the configured sources
+    """
+    async with AsyncPipeline(progress=progress) as pipeline:
+        return await pipeline.fetch_ranked()
+
+
+class AsyncLoopThread:
+    """
+    An event loop running in a daemon thread. submit() schedules a coroutine
+    from any thread and returns a concurrent.futures.Future; cancelling that
+    future cancels the task on the loop.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="async-loop", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+
+
+_loop_thread = None
+_loop_thread_lock = threading.Lock()
+
+
+def get_loop_thread():
+    global _loop_thread
+    with _loop_thread_lock:
+        if _loop_thread is None:
+            _loop_thread = AsyncLoopThread()
+        return _loop_thread
@@ -0,0 +1,471 @@
+# cli.py - Headless stage commands (fetch, rank, generate, publish, run, search, posts,
+#          semantic, engagement)
+#
+# Each stage reads JSON from --input (default: stdin) and writes JSON to
+# --output (default: stdout), so stages can be piped, scripted and timed alone:
+#
+#   python main.py fetch | python main.py rank --top 5 | \
+#       python main.py generate --policy top | python main.py publish --dry-run
+#
+# Progress messages go to stderr so stdout stays valid JSON.
+
+import json
+import sqlite3
+import sys
+from contextlib import redirect_stdout
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+from config import ENGAGEMENT_PORT
+
+
+# Exit codes
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_NO_ITEMS = 2
+EXIT_DELIVERY_FAILED = 3
+
+SELECTION_POLICIES = ("top", "fresh", "first")
+
+
+def read_json(path):
+    """
+    Read stage input from a file or stdin ("-")
+    """
+    if path == "-":
+        return json.load(sys.stdin)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_json(data, path):
+    """
+    Write stage output to a file or stdout ("-")
+    """
+    text = json.dumps(data, ensure_ascii=False, indent=2)
+    if path == "-":
+        sys.stdout.write(text + "\n")
+        sys.stdout.flush()
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+def _published_at(news):
+    """
+    Parse an RSS (RFC 822) or ISO 8601 date, oldest possible on failure
+    """
+    value = news.get("published") or ""
+    for parse in (parsedate_to_datetime, lambda v: datetime.fromisoformat(v.replace("Z", "+00:00"))):
+        try:
+            parsed = parse(value)
+            return parsed.timestamp()
+        except (TypeError, ValueError, IndexError):
+            continue
+    return 0.0
+
+
+def auto_select(news_items, policy="top", count=1, min_score=0, topic=None):
+    """
+    Pick articles without prompting (only those of one topic profile if given):
+    - top:   highest rank_score first
+    - fresh: most recently published first
+    - first: keep input order
+    """
+    candidates = [n for n in news_items if n.get("rank_score", 0) >= min_score]
+    if topic:
+        from news_fetcher import select_profile
+        from feed_config import get_feed_config
+
+        names = get_feed_config().current.profile_matcher.names
+        if topic not in names:
+            raise ValueError(f"Unknown topic profile: {topic} (have: {', '.join(names)})")
+        candidates = select_profile(candidates, topic)
+        if not candidates:
+            print(f"⚠️ No fetched article matches topic profile '{topic}' "
+                  f"(only the first max_matches entries per feed are read)", file=sys.stderr)
+
+    if policy == "top":
+        candidates.sort(key=lambda n: n.get("rank_score", 0), reverse=True)
+    elif policy == "fresh":
+        candidates.sort(key=_published_at, reverse=True)
+    elif policy != "first":
+        raise ValueError(f"Unknown selection policy: {policy}")
+
+    return candidates[:count]
+
+
+# ===================
+# STAGES
+# ===================
+
+def cmd_fetch(args):
+    from news_fetcher import fetch_latest_news
+
+    with redirect_stdout(sys.stderr):
+        news = fetch_latest_news()
+
+    write_json(news, args.output)
+    return EXIT_OK if news else EXIT_NO_ITEMS
+
+
+def cmd_rank(args):
+    from news_fetcher import rank_and_sort_news
+
+    news = read_json(args.input)
+    with redirect_stdout(sys.stderr):
+        ranked = rank_and_sort_news(news)
+
+    if args.top:
+        ranked = ranked[:args.top]
+
+    write_json(ranked, args.output)
+    return EXIT_OK if ranked else EXIT_NO_ITEMS
+
+
+def cmd_generate(args):
+    from post_generator import generate_linkedin_post
+    from link_preview import prefetch_previews
+    from article_extractor import enrich_articles
+
+    news = read_json(args.input)
+    selected = auto_select(news, args.policy, args.top or 1, args.min_score, args.topic)
+    if not selected:
+        print("❌ No article matches the selection policy.", file=sys.stderr)
+        write_json([], args.output)
+        return EXIT_NO_ITEMS
+
+    posts = []
+    with redirect_stdout(sys.stderr):
+        prefetch_previews(selected)
+        enrich_articles(selected)
+        for item in selected:
+            print(f"🤖 Generating post for: {item['title'][:50]}...")
+            post = generate_linkedin_post(item)
+            if post:
+                posts.append({"news": item, "post": post})
+
+    write_json(posts, args.output)
+    return EXIT_OK if posts else EXIT_ERROR
+
+
+def cmd_publish(args):
+    from linkedin_poster import WebhookPoster, LocalSaver
+    from post_validator import validate_post
+
+    posts = read_json(args.input)
+    if not posts:
+        write_json([], args.output)
+        return EXIT_NO_ITEMS
+
+    target = "local" if args.local else "webhook"
+    results = []
+    with redirect_stdout(sys.stderr):
+        for entry in posts:
+            title = entry["news"]["title"]
+            link = entry["news"].get("link") or None
+            if args.dry_run:
+                checked = validate_post(entry["post"], link)
+                print(f"🧪 [dry-run] Would send to {target}: {title[:60]}")
+                for problem in checked["fixes"] + checked["errors"]:
+                    print(f"   - {problem}")
+                delivered = False
+            elif args.local:
+                delivered = LocalSaver().save_post(entry["post"], title)
+            else:
+                delivered = WebhookPoster().post_to_webhook(entry["post"], title, link=link,
+                                                            preview=entry["news"].get("preview"))
+
+            results.append({
+                "title": title,
+                "link": entry["news"].get("link", ""),
+                "target": target,
+                "dry_run": args.dry_run,
+                "delivered": bool(delivered),
+            })
+
+    write_json(results, args.output)
+    if args.dry_run or all(r["delivered"] for r in results):
+        return EXIT_OK
+    return EXIT_DELIVERY_FAILED
+
+
+def cmd_run(args):
+    """
+    fetch -> rank -> generate -> publish in one process, no prompts
+    """
+    from news_fetcher import fetch_latest_news, rank_and_sort_news
+    from post_generator import generate_linkedin_post
+    from linkedin_poster import WebhookPoster, LocalSaver
+    from link_preview import prefetch_previews
+    from article_extractor import enrich_articles
+
+    if args.use_async or args.jobs:
+        return run_async(args)
+
+    with redirect_stdout(sys.stderr):
+        ranked = rank_and_sort_news(fetch_latest_news())
+        selected = auto_select(ranked, args.policy, args.top or 1, args.min_score, args.topic)
+        if not selected:
+            print("❌ No article matches the selection policy.")
+            write_json([], args.output)
+            return EXIT_NO_ITEMS
+
+        prefetch_previews(selected)
+        enrich_articles(selected)
+
+        results = []
+        for item in selected:
+            post = generate_linkedin_post(item)
+            if not post:
+                results.append({"title": item["title"], "link": item.get("link", ""),
+                                "post": None, "delivered": False})
+                continue
+
+            if args.dry_run:
+                print(f"🧪 [dry-run] Generated post for: {item['title'][:60]}")
+                delivered = False
+            elif args.local:
+                delivered = LocalSaver().save_post(post, item["title"])
+            else:
+                delivered = WebhookPoster().post_to_webhook(post, item["title"], link=item.get("link"),
+                                                            preview=item.get("preview"))
+
+            results.append({"title": item["title"], "link": item.get("link", ""),
+                            "post": post, "delivered": bool(delivered)})
+
+    write_json(results, args.output)
+    if not any(r["post"] for r in results):
+        return EXIT_ERROR
+    if args.dry_run or all(r["delivered"] for r in results if r["post"]):
+        return EXIT_OK
+    return EXIT_DELIVERY_FAILED
+
+
+def run_async(args):
+    """
+    cmd_run on one asyncio event loop (async_pipeline), optionally for several jobs
+    """
+    from async_pipeline import ASYNC_AVAILABLE, load_jobs, run_pipeline
+
+    if not ASYNC_AVAILABLE:
+        print("❌ --async needs httpx (pip install httpx)", file=sys.stderr)
+        return EXIT_ERROR
+
+    jobs = load_jobs(args.jobs) if args.jobs else [{}]
+    for job in jobs:
+        job.setdefault("local", args.local)
+        job.setdefault("dry_run", args.dry_run)
+        job["select"] = lambda ranked, job=job: auto_select(
+            ranked, args.policy, job.get("count", args.top or 1), args.min_score,
+            job.get("topic", args.topic)
+        )
+
+    with redirect_stdout(sys.stderr):
+        results = run_pipeline(jobs)
+
+    write_json(results, args.output)
+    if not any(r["post"] for r in results):
+        return EXIT_ERROR
+    if args.dry_run or all(r["delivered"] for r in results if r["post"]):
+        return EXIT_OK
+    return EXIT_DELIVERY_FAILED
+
+
+def cmd_search(args):
+    """
+    Query the local archive (articles by default, drafts with --drafts)
+    """
+    from archive import get_archive
+
+    archive = get_archive()
+    if archive is None:
+        print("❌ Archive is disabled (LINK_ARCHIVE=0).", file=sys.stderr)
+        return EXIT_ERROR
+
+    query = " ".join(args.query)
+    if args.drafts:
+        results = archive.search_drafts(query, args.since, args.until, args.limit)
+    else:
+        results = archive.search_articles(query, args.source, args.since, args.until, args.limit)
+
+    write_json(results, args.output)
+    return EXIT_OK if results else EXIT_NO_ITEMS
+
+
+def cmd_posts(args):
+    """
+    List recently saved posts, or compact the post store
+    """
+    from post_store import get_post_store
+
+    store = get_post_store()
+    if args.compact:
+        with redirect_stdout(sys.stderr):
+            merged = store.compact()
+        write_json({"compacted_segments": merged}, args.output)
+        return EXIT_OK
+
+    posts = store.recent(args.limit)
+    write_json(posts, args.output)
+    return EXIT_OK if posts else EXIT_NO_ITEMS
+
+
+def cmd_semantic(args):
+    """
+    Build or extend the semantic index of high-performing posts
+    """
+    from semantic import SemanticIndex, rebuild_index_from_archive
+
+    if args.rebuild:
+        from archive import get_archive
+        archive = get_archive()
+        if archive is None:
+            print("❌ Archive is disabled (LINK_ARCHIVE=0).", file=sys.stderr)
+            return EXIT_ERROR
+        count = rebuild_index_from_archive(archive)
+        print(f"🧠 Indexed {count} published posts", file=sys.stderr)
+
+    if args.add:
+        index = SemanticIndex()
+        for path in args.add:
+            with open(path, "r", encoding="utf-8") as f:
+                index.add(f"file:{path}", f.read(), weight=args.weight)
+        index.save()
+        print(f"🧠 Added {len(args.add)} example posts", file=sys.stderr)
+
+    index = SemanticIndex()
+    write_json({"path": index.path, "documents": len(index.docs)}, args.output)
+    return EXIT_OK
+
+
+def cmd_engagement(args):
+    """
+    Import post engagement, fit ranking weights from it, or serve the callback endpoint
+    """
+    import time
+    from archive import get_archive
+    from engagement import load_engagement_file, import_engagement, fit_from_archive, serve_callback
+    from ranking_model import load_weights
+
+    archive = get_archive()
+    if archive is None:
+        print("❌ Archive is disabled (LINK_ARCHIVE=0).", file=sys.stderr)
+        return EXIT_ERROR
+
+    with redirect_stdout(sys.stderr):
+        for path in args.import_files or []:
+            import_engagement(archive, load_engagement_file(path))
+
+        if args.fit:
+            fit_from_archive(archive)
+
+        if args.serve is not None:
+            server = serve_callback(archive, port=args.serve)
+            try:
+                while True:
+                    time.sleep(1)
+            except KeyboardInterrupt:
+                server.shutdown()
+
+    weights, version = load_weights()
+    write_json({"version": version, "weights": weights}, args.output)
+    return EXIT_OK
+
+
+def add_stage_commands(parser):
+    """
+    Register the headless subcommands on an argparse parser
+    """
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    def io_args(sub, has_input=True):
+        if has_input:
+            sub.add_argument("-i", "--input", default="-", help="JSON input file (default: stdin)")
+        sub.add_argument("-o", "--output", default="-", help="JSON output file (default: stdout)")
+
+    def selection_args(sub):
+        sub.add_argument("--policy", choices=SELECTION_POLICIES, default="top",
+                         help="auto-selection policy (default: top)")
+        sub.add_argument("--top", type=int, default=1, metavar="N",
+                         help="number of articles to generate posts for (default: 1)")
+        sub.add_argument("--min-score", type=int, default=0,
+                         help="skip articles ranked below this score")
+        sub.add_argument("--topic", metavar="NAME",
+                         help="only articles matching this topic profile (e.g. llm)")
+
+    sub = subparsers.add_parser("fetch", help="fetch and filter news items")
+    io_args(sub, has_input=False)
+    sub.set_defaults(func=cmd_fetch)
+
+    sub = subparsers.add_parser("rank", help="score and sort fetched items")
+    io_args(sub)
+    sub.add_argument("--top", type=int, default=0, metavar="N", help="keep only the N best items")
+    sub.set_defaults(func=cmd_rank)
+
+    sub = subparsers.add_parser("generate", help="generate posts for auto-selected items")
+    io_args(sub)
+    selection_args(sub)
+    sub.set_defaults(func=cmd_generate)
+
+    sub = subparsers.add_parser("publish", help="deliver generated posts")
+    io_args(sub)
+    sub.add_argument("--local", action="store_true", help="save locally instead of the webhook")
+    sub.add_argument("--dry-run", action="store_true", help="show what would be sent, send nothing")
+    sub.set_defaults(func=cmd_publish)
+
+    sub = subparsers.add_parser("run", help="fetch, rank, generate and publish without prompts")
+    io_args(sub, has_input=False)
+    selection_args(sub)
+    sub.add_argument("--local", action="store_true", help="save locally instead of the webhook")
+    sub.add_argument("--dry-run", action="store_true", help="generate but do not publish")
+    sub.add_argument("--async", dest="use_async", action="store_true",
+                     help="run on one asyncio event loop (httpx + AsyncGroq)")
+    sub.add_argument("--jobs", metavar="FILE",
+                     help="JSON list of jobs (accounts/feed sets) to run concurrently; implies --async")
+    sub.set_defaults(func=cmd_run)
+
+    sub = subparsers.add_parser("search", help="search archived articles or drafts")
+    io_args(sub, has_input=False)
+    sub.add_argument("query", nargs="*", help="keywords (prefix matched, all must match)")
+    sub.add_argument("--source", help="only articles whose source contains this text")
+    sub.add_argument("--since", metavar="YYYY-MM-DD", help="published/created on or after")
+    sub.add_argument("--until", metavar="YYYY-MM-DD", help="published/created on or before")
+    sub.add_argument("--drafts", action="store_true", help="search generated drafts instead")
+    sub.add_argument("--limit", type=int, default=50)
+    sub.set_defaults(func=cmd_search)
+
+    sub = subparsers.add_parser("posts", help="list saved posts or compact the post store")
+    io_args(sub, has_input=False)
+    sub.add_argument("--limit", type=int, default=20)
+    sub.add_argument("--compact", action="store_true", help="merge sealed segments, drop deleted posts")
+    sub.set_defaults(func=cmd_posts)
+
+    sub = subparsers.add_parser("semantic", help="build the semantic index of high-performing posts")
+    io_args(sub, has_input=False)
+    sub.add_argument("--rebuild", action="store_true", help="index every published post in the archive")
+    sub.add_argument("--add", nargs="+", metavar="FILE", help="add example posts (one post per file)")
+    sub.add_argument("--weight", type=float, default=1.0, help="weight for --add examples")
+    sub.set_defaults(func=cmd_semantic)
+
+    sub = subparsers.add_parser("engagement", help="learn ranking weights from post engagement")
+    io_args(sub, has_input=False)
+    sub.add_argument("--import", dest="import_files", nargs="+", metavar="FILE",
+                     help="engagement export(s), CSV or JSON")
+    sub.add_argument("--fit", action="store_true", help="fit and save new ranking weights")
+    sub.add_argument("--serve", type=int, nargs="?", const=ENGAGEMENT_PORT, metavar="PORT",
+                     help="run the engagement callback endpoint until Ctrl+C")
+    sub.set_defaults(func=cmd_engagement)
+
+    return subparsers
+
+
+def run_command(args):
+    """
+    Dispatch a parsed subcommand and return its exit code
+    """
+    try:
+        return args.func(args)
+    except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+        print(f"❌ {args.command} failed: {e}", file=sys.stderr)
+        return EXIT_ERROR
@@ -3,7 +3,10 @@
 import os
 from dotenv import load_dotenv
 
-load_dotenv()
+# Settings file read here at startup; the GUI edits it through
+# settings_store.py, which applies changes without a restart
+ENV_PATH = os.getenv("LINK_ENV_PATH", ".env")
+load_dotenv(ENV_PATH)
 
 # ===================
 # API KEYS
@@ -12,6 +15,29 @@ load_dotenv()
 # Get from: https://console.groq.com/keys
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
 
+# Optional: point the Groq client at another OpenAI-compatible endpoint
+# (e.g. a local stand-in server when profiling)
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None
+
+# Groq rate limits shared by post generation and GUI chat (see llm_dispatcher.py).
+# Defaults match the free tier of llama-3.1-8b-instant; the token limit is
+# updated from the API's x-ratelimit headers once responses come in.
+LLM_RPM = int(os.getenv("LLM_RPM", "30"))
+LLM_TPM = int(os.getenv("LLM_TPM", "6000"))
+LLM_MAX_IN_FLIGHT = 4     # concurrent requests (one is always kept for chat)
+LLM_MAX_RETRIES = 4       # retries after a 429, with backoff
+
+# Post generation tries these models in order, falling back on errors or
+# timeouts. With LLM_HEDGE_AFTER set (seconds), a request still running after
+# that long is raced against the next model and the first answer is used.
+LLM_MODELS = [
+    m.strip() for m in os.getenv(
+        "LLM_MODELS", "llama-3.1-8b-instant,llama-3.3-70b-versatile"
+    ).split(",") if m.strip()
+]
+LLM_TIMEOUT = 30.0        # seconds per request
+LLM_HEDGE_AFTER = float(os.getenv("LLM_HEDGE_AFTER", "0")) or None
+
 # Get from: Make.com webhook trigger
 WEBHOOK_URL = os.getenv("MAKE_WEBHOOK_URL", "").strip('"')
 
@@ -19,6 +45,11 @@ WEBHOOK_URL = os.getenv("MAKE_WEBHOOK_URL", "").strip('"')
 # RSS FEEDS (LLM NEWS ONLY)
 # ===================
 
+# Feeds, filter keywords and premium ranking keywords can be edited without
+# touching the code: in this JSON file or on the GUI Settings page (see
+# feed_config.py). RSS_FEEDS / LLM_KEYWORDS below are the defaults.
+FEED_CONFIG_PATH = os.getenv("LINK_FEED_CONFIG", "feeds.json")
+
 RSS_FEEDS = [
     "https://techcrunch.com/category/artificial-intelligence/feed/",
     "https://www.theverge.com/rss/ai-artificial-intelligence/index.xml",
@@ -27,6 +58,49 @@ RSS_FEEDS = [
     "https://blog.google/technology/ai/rss/",
 ]
 
+# Comma-separated override, e.g. local fixture files for reproducible runs:
+# LINK_RSS_FEEDS=fixtures/techcrunch.xml,fixtures/verge.xml
+if os.getenv("LINK_RSS_FEEDS"):
+    RSS_FEEDS = [url.strip() for url in os.getenv("LINK_RSS_FEEDS").split(",") if url.strip()]
+
+# Other source adapters (see sources.py), fetched in the same pool as RSS_FEEDS.
+# Any "url" may be a local file path for fixtures.
+EXTRA_SOURCES = [
+    # {"type": "arxiv", "query": "cat:cs.CL AND abs:\"language model\""},
+    # {"type": "hackernews", "query": "LLM"},
+    # {"type": "github_releases", "repo": "ollama/ollama"},
+    # {"type": "jsonfeed", "url": "https://example.com/feed.json"},
+]
+
+# Article links are canonicalized (tracking parameters removed, http and https
+# count as the same article) and links on these redirector hosts are resolved
+# with a HEAD request once, then cached, so duplicates across feeds are
+# dropped. None resolves every link.
+URL_RESOLVE_HOSTS = [
+    "feedburner.com", "feedproxy.google.com", "news.google.com",
+    "t.co", "bit.ly", "lnkd.in", "ow.ly", "buff.ly", "dlvr.it", "trib.al",
+]
+URL_RESOLVE_WORKERS = 8
+URL_CACHE_PATH = "url_cache.db"
+
+# Threads shared by all sources (each adapter type also has its own limit)
+FETCH_WORKERS = 8
+
+# Async pipeline (see async_pipeline.py, `python main.py run --async`):
+# one event loop with httpx + AsyncGroq; requests in flight per stage,
+# shared by every job (account / feed set) running on the loop
+ASYNC_STAGE_LIMITS = {
+    "fetch": 8,
+    "extract": 3,
+    "generate": 3,
+    "deliver": 4,
+}
+
+# Parse RSS/Atom incrementally while downloading: stop once enough matching
+# entries are found, and never read more than FEED_MAX_BYTES per feed
+STREAM_FEEDS = True
+FEED_MAX_BYTES = 2_000_000
+
 # ===================
 # LLM FILTERING
 # ===================
@@ -42,6 +116,33 @@ LLM_KEYWORDS = [
 # Enable/disable LLM filtering
 FILTER_LLM_ONLY = True
 
+# Further topic profiles, each selecting from the same fetched corpus (see
+# feed_config.py; "llm" is LLM_KEYWORDS). All profiles are matched in one
+# pass per article, items are tagged with profile_hits, and an item passes
+# the filter when any profile matches. Pick one with `--topic NAME`.
+TOPIC_PROFILES = {
+    # "robotics": ["robot", "robotics", "humanoid", "embodied ai"],
+    # "ai_policy": ["ai act", "regulation", "executive order", "copyright", "ai safety"],
+}
+
+# Optional semantic scoring (see semantic.py): articles are compared to an
+# index of past high-performing posts with hashed TF-IDF cosine similarity.
+# Build the index with: python main.py semantic --rebuild
+SEMANTIC_SCORING = False
+SEMANTIC_WEIGHT = 0.4            # share of rank_score coming from similarity
+SEMANTIC_MIN_SIMILARITY = 0.35   # keyword-less articles above this still pass the filter
+SEMANTIC_INDEX_PATH = "semantic_index.json"
+SEMANTIC_CACHE_PATH = "semantic_cache.db"
+SEMANTIC_DIM = 2 ** 18
+SEMANTIC_TOP_K = 3
+
+# Ranking weights learned from post engagement (see engagement.py) are saved
+# as versioned artifacts here; the newest one is loaded at startup
+RANKING_WEIGHTS_DIR = os.getenv("LINK_RANKING_WEIGHTS_DIR", "ranking_weights")
+RANKING_L2 = 5.0                 # how strongly fitted weights stay near the previous ones
+ENGAGEMENT_MIN_SAMPLES = 5       # don't fit on fewer matched posts than this
+ENGAGEMENT_PORT = 8765           # local callback endpoint: python main.py engagement --serve
+
 # ===================
 # SETTINGS
 # ===================
@@ -50,3 +151,85 @@ YOUR_NAME = "Your Name"
 YOUR_STYLE = "professional but friendly, add emojis, include engaging CTAs"
 MAX_NEWS_ITEMS = 5
 
+# Background threads of the desktop app (fetch, generate, chat, profile, publish);
+# further requests wait in the queue instead of starting new threads
+GUI_MAX_THREADS = 4
+
+# Posts generated per article; the best one by local quality checks
+# (word count, hook, emojis, hashtags, closing question) is used
+POST_CANDIDATES = 3
+
+# Posts are normalized before publishing (see post_validator.py):
+# markdown bold -> unicode bold, hashtags removed, link kept last, length capped
+LINKEDIN_MAX_CHARS = 3000
+
+# Open Graph previews (see link_preview.py) are fetched in the background
+# while posts are generated and sent along with the webhook/Buffer payload
+PREVIEW_ENABLED = os.getenv("LINK_PREVIEWS", "1") != "0"
+PREVIEW_CACHE_PATH = "preview_cache.db"
+PREVIEW_TTL = 24 * 3600       # seconds a cached preview stays valid
+PREVIEW_MAX_BYTES = 256_000   # stop reading a page after this much if </head> never came
+PREVIEW_WORKERS = 4
+
+# Full article text for the top-ranked items (see article_extractor.py),
+# given to the LLM instead of the RSS teaser alone
+ARTICLE_TEXT_ENABLED = os.getenv("LINK_ARTICLE_TEXT", "1") != "0"
+ARTICLE_TOP_K = 3              # only this many of the best-ranked items
+ARTICLE_WORKERS = 3
+ARTICLE_MAX_BYTES = 1_000_000  # per page
+ARTICLE_DEADLINE = 8.0         # seconds for the whole stage
+ARTICLE_MAX_CHARS = 3000       # extracted text kept per article
+ARTICLE_CACHE_PATH = "article_cache.db"
+
+# Fetch budget: every source contributes at most SOURCE_QUOTA items
+# (override per source URL in SOURCE_QUOTAS), interleaved round-robin,
+# and a run never keeps more than NEWS_BUDGET_TOTAL items
+SOURCE_QUOTA = MAX_NEWS_ITEMS
+SOURCE_QUOTAS = {
+    # "https://www.technologyreview.com/feed/": 2,
+}
+NEWS_BUDGET_TOTAL = MAX_NEWS_ITEMS * 4
+# Matches of each topic profile that the quotas or the total cut are added
+# back, up to PROFILE_RESERVE per profile, so `--topic NAME` still has
+# candidates when busier profiles fill the budget
+PROFILE_RESERVE = 3
+
+
+# ===================
+# METRICS
+# ===================
+
+# Pipeline timing spans are appended to METRICS_DIR/spans.jsonl and
+# aggregated into METRICS_DIR/link.prom (Prometheus textfile format)
+METRICS_ENABLED = os.getenv("LINK_METRICS", "1") != "0"
+METRICS_DIR = os.getenv("LINK_METRICS_DIR", "metrics")
+
+# cProfile/tracemalloc artifacts written by --profile
+PROFILE_DIR = os.getenv("LINK_PROFILE_DIR", "profiles")
+
+# ===================
+# ARCHIVE
+# ===================
+
+# Every fetched article, score, draft and delivery is kept in a
+# full-text searchable SQLite database
+ARCHIVE_ENABLED = os.getenv("LINK_ARCHIVE", "1") != "0"
+ARCHIVE_PATH = os.getenv("LINK_ARCHIVE_PATH", "link_archive.db")
+
+# ===================
+# RUN JOURNAL
+# ===================
+
+# run_automation checkpoints each stage (fetched items, ranking, selected
+# article, draft, delivery) under a run ID; `python main.py --resume`
+# continues the last unfinished run from the first missing stage
+RUN_JOURNAL_DIR = os.getenv("LINK_RUN_JOURNAL_DIR", "runs")
+RUN_JOURNAL_KEEP = 50   # newest journals kept
+
+# ===================
+# POST STORAGE
+# ===================
+
+# Saved posts (LocalSaver + GUI SAVE) go to rotating JSONL segments
+POST_STORE_DIR = os.getenv("LINK_POST_STORE_DIR", "saved_posts")
+POST_STORE_SEGMENT_SIZE = 1000  # posts per segment before rotating
@@ -0,0 +1,148 @@
+# engagement.py - Feed post engagement back into the ranker
+#
+# 1. Import engagement (CSV/JSON export, or POSTs to the local callback endpoint)
+#    into the archive, matched to the article each post was written about.
+# 2. Fit ranking weights on those articles' features (ranking_model.fit_weights).
+# 3. Save them as the next versioned artifact; news_fetcher loads it at startup.
+#
+# Accepted fields per post (CSV header or JSON keys, case-insensitive):
+#   post_ref / post_url / post_id       which post (defaults to link or title)
+#   link / url / article_link           the article the post was about
+#   title, content / text               fallbacks for matching
+#   impressions, reactions / likes, comments, shares / reposts, clicks
+
+import csv
+import json
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import ENGAGEMENT_MIN_SAMPLES, ENGAGEMENT_PORT
+from ranking_model import (
+    extract_features, engagement_target, scale_targets, fit_weights, save_weights
+)
+from feed_config import get_feed_config
+
+
+ALIASES = {
+    "post_url": "post_ref", "post_id": "post_ref", "urn": "post_ref",
+    "url": "link", "article_link": "link", "article_url": "link",
+    "text": "content", "post": "content", "post_text": "content",
+    "likes": "reactions", "reposts": "shares",
+}
+TEXT_FIELDS = ("post_ref", "link", "title", "content")
+
+
+def normalize_record(raw):
+    """
+    Map one exported row onto {post_ref, link, title, content, metrics}
+    """
+    record = {"metrics": {}}
+    for key, value in raw.items():
+        if key is None:
+            continue
+        key = key.strip().lower().replace(" ", "_")
+        key = ALIASES.get(key, key)
+        if key in TEXT_FIELDS:
+            record[key] = str(value).strip() if value is not None else ""
+            continue
+        try:
+            record["metrics"][key] = float(str(value).replace(",", ""))
+        except (TypeError, ValueError):
+            continue  # dates and other non-numeric columns
+
+    record["post_ref"] = record.get("post_ref") or record.get("link") or record.get("title")
+    if not record["post_ref"]:
+        raise ValueError(f"engagement record has no post_ref, link or title: {raw}")
+    return record
+
+
+def load_engagement_file(path):
+    """
+    Read a CSV or JSON (list of objects) engagement export
+    """
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if path.lower().endswith(".json"):
+            rows = json.load(f)
+            if isinstance(rows, dict):
+                rows = [rows]
+        else:
+            rows = list(csv.DictReader(f))
+    return [normalize_record(row) for row in rows]
+
+
+def import_engagement(archive, records):
+    """
+    Store records in the archive, returns (stored, matched)
+    """
+    matched = archive.add_engagement(records)
+    print(f"📈 Imported engagement for {len(records)} posts ({matched} matched to articles)")
+    return len(records), matched
+
+
+def fit_from_archive(archive, min_samples=ENGAGEMENT_MIN_SAMPLES):
+    """
+    Fit ranking weights on archived articles with engagement and save them.
+    Returns the artifact path, or None when there is not enough data yet.
+    """
+    articles = archive.engagement_articles()
+    if len(articles) < min_samples:
+        print(f"⚠️ Only {len(articles)} posts with engagement, need {min_samples} to fit")
+        return None
+
+    # Freshness is measured from when the article was fetched, as it was at ranking time;
+    # keywords and prior are the ones ranking uses now (feed_config.py)
+    current = get_feed_config().current
+    features = [
+        extract_features(a, current.premium_matcher, now=datetime.fromisoformat(a["fetched_at"]))
+        for a in articles
+    ]
+    targets = scale_targets([engagement_target(a["metrics"]) for a in articles])
+
+    prior, version = current.weights, current.weights_version
+    weights, info = fit_weights(list(zip(features, targets)), prior=prior)
+    info["based_on"] = version
+    path = save_weights(weights, info)
+    get_feed_config().reload()
+    print(f"🧮 Fitted ranking weights on {info['n_samples']} posts (R² {info['r2']}) -> {path}")
+    return path
+
+
+def serve_callback(archive, port=ENGAGEMENT_PORT, host="127.0.0.1"):
+    """
+    Local endpoint for automation tools (e.g. Make.com) to push engagement:
+    POST /engagement with a JSON object or list of objects
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path.rstrip("/") != "/engagement":
+                self.send_response(404)
+                self.end_headers()
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"[]")
+                if isinstance(payload, dict):
+                    payload = [payload]
+                stored, matched = import_engagement(
+                    archive, [normalize_record(row) for row in payload]
+                )
+                body = json.dumps({"stored": stored, "matched": matched}).encode("utf-8")
+                self.send_response(200)
+            except (ValueError, AttributeError) as e:
+                body = json.dumps({"error": str(e)}).encode("utf-8")
+                self.send_response(400)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    print(f"📈 Engagement callback at http://{host}:{server.server_address[1]}/engagement")
+    return server
@@ -0,0 +1,213 @@
+# feed_config.py - Feeds and keyword lists in a user-editable JSON file
+#
+# FEED_CONFIG_PATH holds the RSS feeds, the LLM filter keywords, further
+# topic profiles and the premium ranking keywords with their points; whatever
+# is missing falls back to the defaults in config.py / ranking_model.py. The lists are compiled
+# into KeywordMatchers and ranking weights once per edit, on a background
+# thread, and the result is swapped in as one object: a fetch in progress
+# keeps the snapshot it started with, the next one gets the new lists.
+#
+#   {
+#     "rss_feeds": ["https://techcrunch.com/category/artificial-intelligence/feed/"],
+#     "llm_keywords": ["llm", "language model"],
+#     "topic_profiles": {"robotics": ["robot", "humanoid"]},
+#     "premium_keywords": {"reasoning": 12, "new model": 12}
+#   }
+
+import json
+import os
+import threading
+
+from config import FEED_CONFIG_PATH, RSS_FEEDS, LLM_KEYWORDS, TOPIC_PROFILES
+from keyword_matcher import KeywordMatcher, ProfileMatcher
+from ranking_model import PREMIUM_KEYWORDS, load_weights
+
+
+def default_feed_config():
+    return {
+        "rss_feeds": list(RSS_FEEDS),
+        "llm_keywords": list(LLM_KEYWORDS),
+        "topic_profiles": {name: list(keywords) for name, keywords in TOPIC_PROFILES.items()},
+        "premium_keywords": dict(PREMIUM_KEYWORDS),
+    }
+
+
+def _keyword_list(key, value):
+    if not isinstance(value, list):
+        raise ValueError(f"{key} must be a list")
+    return [str(v).strip() for v in value if str(v).strip()]
+
+
+def _points(keyword, value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"points for {keyword!r} must be a number")
+    return int(value) if value.is_integer() else value
+
+
+def clean_feed_config(raw):
+    """
+    Validated copy of raw (defaults for missing keys); raises ValueError
+    """
+    config = default_feed_config()
+    for key, value in (raw or {}).items():
+        if key not in config:
+            continue
+        if key == "premium_keywords":
+            if not isinstance(value, dict):
+                raise ValueError("premium_keywords must map keyword -> points")
+            config[key] = {str(k).strip().lower(): _points(k, v) for k, v in value.items()
+                           if str(k).strip()}
+        elif key == "topic_profiles":
+            if not isinstance(value, dict):
+                raise ValueError("topic_profiles must map profile name -> keyword list")
+            config[key] = {str(name).strip(): _keyword_list(f"topic_profiles.{name}", keywords)
+                           for name, keywords in value.items() if str(name).strip()}
+        else:
+            config[key] = _keyword_list(key, value)
+
+    # "llm" is the name of the llm_keywords profile; a topic profile of that
+    # name would silently replace them, so its keywords are added instead
+    reserved = config["topic_profiles"].pop("llm", None)
+    if reserved is not None:
+        print('⚠️ Topic profile "llm" is reserved for llm_keywords; its keywords were added there')
+        config["llm_keywords"] = list(dict.fromkeys(config["llm_keywords"] + reserved))
+    return config
+
+
+def ranking_weights(premium_keywords):
+    """
+    Learned weights if any were fitted (keywords they don't know get their
+    configured points), else the defaults with the configured points
+    """
+    weights, version = load_weights()
+    points = {f"kw:{keyword}": value for keyword, value in premium_keywords.items()}
+    if version:
+        return {**points, **weights}, version
+    base = {name: value for name, value in weights.items() if not name.startswith("kw:")}
+    return {**base, **points}, version
+
+
+class CompiledFeedConfig:
+    """
+    Immutable snapshot: the lists plus their compiled matchers and weights.
+    profiles are "llm" (llm_keywords) and the topic profiles, in one matcher.
+    """
+
+    def __init__(self, config):
+        self.rss_feeds = tuple(config["rss_feeds"])
+        self.llm_keywords = tuple(config["llm_keywords"])
+        self.topic_profiles = {name: tuple(keywords)
+                               for name, keywords in config["topic_profiles"].items()}
+        self.premium_keywords = dict(config["premium_keywords"])
+        self.profile_matcher = ProfileMatcher({"llm": self.llm_keywords, **self.topic_profiles})
+        self.premium_matcher = KeywordMatcher(self.premium_keywords)
+        self.weights, self.weights_version = ranking_weights(self.premium_keywords)
+
+    def as_dict(self):
+        return {
+            "rss_feeds": list(self.rss_feeds),
+            "llm_keywords": list(self.llm_keywords),
+            "topic_profiles": {name: list(keywords) for name, keywords in self.topic_profiles.items()},
+            "premium_keywords": dict(self.premium_keywords),
+        }
+
+
+class FeedConfigStore:
+    """
+    The feed config file, compiled; update() writes it and recompiles in the background
+    """
+
+    def __init__(self, path=FEED_CONFIG_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._subscribers = []
+        self.current = CompiledFeedConfig(self.load())
+
+    def load(self):
+        """
+        Cleaned file contents, defaults if the file is missing or invalid
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return clean_feed_config(json.load(f))
+        except FileNotFoundError:
+            return default_feed_config()
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not load feed config {self.path}: {e}")
+            return default_feed_config()
+
+    def subscribe(self, callback):
+        """
+        callback(compiled) after each swap (called on the compile thread)
+        """
+        self._subscribers.append(callback)
+
+    def reload(self, wait=False):
+        """
+        Recompile from the file (edited by hand, or new ranking weights were fitted)
+        """
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        return self._start(self.load(), generation, wait)
+
+    def update(self, raw, wait=False):
+        """
+        Validate and write raw atomically, then compile and swap it in on a
+        background thread (wait=True compiles inline). Raises ValueError if invalid.
+        """
+        config = clean_feed_config(raw)
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(config, f, indent=2)
+            os.replace(tmp_path, self.path)
+        return self._start(config, generation, wait)
+
+    def _start(self, config, generation, wait):
+        thread = threading.Thread(target=self._compile, args=(config, generation), daemon=True)
+        if wait:
+            thread.run()
+        else:
+            thread.start()
+        return thread
+
+    def _compile(self, config, generation):
+        try:
+            compiled = CompiledFeedConfig(config)
+        except Exception as e:
+            print(f"❌ Feed config not applied: {e}")
+            return
+        with self._lock:
+            # A newer edit may have finished first; never swap back to an older one
+            if generation < self._generation:
+                return
+            self.current = compiled
+        print(f"🔁 Feed config applied: {len(compiled.rss_feeds)} feeds, "
+              f"{len(compiled.profile_matcher.names)} topic profiles "
+              f"({len(compiled.profile_matcher)} keywords), {len(compiled.premium_matcher)} premium keywords")
+        for callback in list(self._subscribers):
+            try:
+                callback(compiled)
+            except Exception as e:
+                print(f"⚠️ Feed config subscriber failed: {e}")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_feed_config():
+    """
+    Shared store for FEED_CONFIG_PATH
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = FeedConfigStore()
+        return _store
@@ -3,7 +3,7 @@
 
 import sys
 from datetime import datetime
-from PyQt5.QtCore import QThread, QTimer
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton, QTextEdit, QListWidget, QListWidgetItem,
@@ -12,90 +12,161 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QFont, QColor, QFontDatabase, QPalette, QIcon
+import hashlib
 import html
 
 try:
+    from archive import get_archive, parse_search, archive_call
+except ImportError:
+    get_archive = None
+    parse_search = None
+    archive_call = None
+
+try:
+    from post_validator import validate_post
+except ImportError:
+    validate_post = None
+
+try:
+    from linkedin_poster import WebhookPoster
+except ImportError:
+    WebhookPoster = None
+
+try:
+    from article_extractor import enrich_articles
+except ImportError:
+    enrich_articles = None
+
+from task_manager import TaskManager, PRIORITY_HIGH
+from settings_store import get_settings
+from feed_config import get_feed_config, clean_feed_config
+
+try:
+    from async_pipeline import ASYNC_AVAILABLE, fetch_ranked_news
+except ImportError:
+    ASYNC_AVAILABLE = False
+
+try:
+    import news_fetcher
     from news_fetcher import fetch_latest_news, rank_and_sort_news
-    from post_generator import generate_linkedin_post, client as groq_client
+    from post_generator import generate_linkedin_post, dispatcher as llm_dispatcher
+    from llm_dispatcher import PRIORITY_INTERACTIVE
 except ImportError:
     print("Warning: Could not import news modules")
+    news_fetcher = None
     fetch_latest_news = None
     rank_and_sort_news = None
     generate_linkedin_post = None
-    groq_client = None
+    llm_dispatcher = None
 
 
-class NewsWorker(QThread):
-    """Worker thread for fetching news"""
-    progress = pyqtSignal(str)
-    finished = pyqtSignal(list)
-    error = pyqtSignal(str)
-    
-    def run(self):
-        """Fetch news in background"""
-        try:
-            if not fetch_latest_news:
-                raise Exception("news_fetcher module not available")
-            
-            self.progress.emit("Connecting to news sources...")
-            news = fetch_latest_news()
-            
-            self.progress.emit("Ranking by relevance...")
-            ranked_news = rank_and_sort_news(news)
-            
-            self.progress.emit("Processing complete...")
-            self.finished.emit(ranked_news)
-        except Exception as e:
-            self.error.emit(str(e))
+def premium_keywords_text(premium_keywords):
+    """Premium keywords as editable lines: keyword = points"""
+    return "\n".join(f"{keyword} = {points}" for keyword, points in premium_keywords.items())
+
+
+def parse_premium_keywords(text):
+    """Lines of keyword = points back to a dict (ValueError on a bad line)"""
+    premium = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        keyword, sep, points = line.rpartition("=")
+        if not sep or not keyword.strip():
+            raise ValueError(f"Expected 'keyword = points': {line.strip()}")
+        premium[keyword.strip()] = points.strip()
+    return premium
+
+
+def topic_profiles_text(topic_profiles):
+    """Topic profiles as editable lines: name: keyword, keyword"""
+    return "\n".join(f"{name}: {', '.join(keywords)}" for name, keywords in topic_profiles.items())
+
 
+def parse_topic_profiles(text):
+    """Lines of name: keyword, keyword back to a dict (ValueError on a bad line)"""
+    profiles = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        name, sep, keywords = line.partition(":")
+        if not sep or not name.strip():
+            raise ValueError(f"Expected 'name: keyword, keyword': {line.strip()}")
+        profiles[name.strip()] = [k.strip() for k in keywords.split(",") if k.strip()]
+    return profiles
 
-class PostGeneratorWorker(QThread):
-    """Worker thread for generating posts"""
-    finished = pyqtSignal(str)
-    error = pyqtSignal(str)
+
+def fetch_news_task(task):
+    """Fetch, rank and read the top articles (runs in the task pool)"""
+    if not fetch_latest_news:
+        raise Exception("news_fetcher module not available")
     
-    def __init__(self, news_item):
-        super().__init__()
-        self.news_item = news_item
+    task.report("Connecting to news sources...")
+    news = fetch_latest_news()
+    task.check()
     
-    def run(self):
-        """Generate post in background"""
-        try:
-            if not generate_linkedin_post:
-                raise Exception("post_generator module not available")
-            
-            post = generate_linkedin_post(self.news_item)
-            self.finished.emit(post)
-        except Exception as e:
-            self.error.emit(str(e))
+    task.report("Ranking by relevance...")
+    ranked_news = rank_and_sort_news(news)
+    task.check()
+    
+    if enrich_articles:
+        task.report("Reading top articles...")
+        enrich_articles(ranked_news)
+    
+    task.report("Processing complete...")
+    return ranked_news
 
 
-class ChatWorker(QThread):
-    """Worker to call Groq chat API off the main thread"""
-    finished = pyqtSignal(str)
-    error = pyqtSignal(str)
+async def fetch_news_async(task):
+    """Same as fetch_news_task on the shared asyncio loop (httpx installed)"""
+    return await fetch_ranked_news(task.report)
 
-    def __init__(self, context, user_text, groq_client):
-        super().__init__()
-        self.context = context
-        self.user_text = user_text
-        self.groq_client = groq_client
 
-    def run(self):
-        try:
-            response = self.groq_client.chat.completions.create(
-                model="llama-3.1-8b-instant",
-                messages=[
-                    {"role": "system", "content": "You are an expert assistant that discusses AI news articles concisely and helpfully."},
-                    {"role": "user", "content": self.context + "User: " + self.user_text}
-                ],
-                temperature=0.7,
-                max_tokens=300
-            )
-            ai_reply = response.choices[0].message.content
-            self.finished.emit(ai_reply)
-        except Exception as e:
-            self.error.emit(str(e))
+def generate_post_task(task, news_item):
+    """Generate a post for one article"""
+    if not generate_linkedin_post:
+        raise Exception("post_generator module not available")
+    
+    # Candidates still waiting for their LLM turn are dropped once cancelled
+    post = generate_linkedin_post(news_item, cancelled=lambda: task.cancelled)
+    task.check()
+    if not post:
+        raise Exception("no valid post was generated")
+    return post
+
+
+def profile_task(task):
+    """Run main.run_automation under cProfile, returns the summary path"""
+    from main import run_profiled
+    _, summary_path = run_profiled(post_online=False)
+    return summary_path
+
+
+def publish_task(task, webhook_url, post_text, title, link, preview):
+    """Send one post to the webhook (pooled connection), returns the title"""
+    if not WebhookPoster:
+        raise Exception("linkedin_poster module not available")
+    
+    task.report(f"Sending: {title[:40]}...")
+    poster = WebhookPoster(webhook_url)
+    if not poster.post_to_webhook(post_text, title, link=link, preview=preview):
+        raise Exception(poster.last_result or "delivery failed")
+    return title
+
+
+def chat_task(task, context, user_text):
+    """Call Groq chat through the interactive lane of the dispatcher"""
+    response = llm_dispatcher.create(
+        priority=PRIORITY_INTERACTIVE,
+        model="llama-3.1-8b-instant",
+        messages=[
+            {"role": "system", "content": "You are an expert assistant that discusses AI news articles concisely and helpfully."},
+            {"role": "user", "content": context + "User: " + user_text}
+        ],
+        temperature=0.7,
+        max_tokens=300
+    )
+    return response.choices[0].message.content
 
 
 class TerminalColors:
@@ -238,13 +309,13 @@ class NewsItemWidget(QFrame):
     """Custom news item widget"""
     clicked = pyqtSignal(int)
     
-    def __init__(self, index, score, title, source, parent=None):
+    def __init__(self, index, score, title, source, topics=(), parent=None):
         super().__init__(parent)
         self.index = index
         self.is_selected = False
-        self.setup_ui(score, title, source)
+        self.setup_ui(score, title, source, topics)
     
-    def setup_ui(self, score, title, source):
+    def setup_ui(self, score, title, source, topics=()):
         self.setFixedHeight(70)
         self.setCursor(Qt.PointingHandCursor)
         
@@ -294,7 +365,8 @@ class NewsItemWidget(QFrame):
         title_label.setStyleSheet(f"color: {TerminalColors.TEXT_WHITE};")
         title_label.setWordWrap(True)
         
-        meta_label = QLabel(f"<span style='color: {TerminalColors.TEXT_CYAN};'>{source}</span> • #{str(self.index + 1).zfill(3)}")
+        tags = "".join(f" <span style='color: {TerminalColors.TEXT_YELLOW};'>[{html.escape(t)}]</span>" for t in topics)
+        meta_label = QLabel(f"<span style='color: {TerminalColors.TEXT_CYAN};'>{source}</span> • #{str(self.index + 1).zfill(3)}{tags}")
         meta_label.setFont(QFont("JetBrains Mono", 8))
         meta_label.setStyleSheet(f"color: {TerminalColors.TEXT_GRAY};")
         
@@ -351,6 +423,8 @@ class LinkedInTerminalApp(QMainWindow):
         self.nav_buttons = []
         self.settings = {}  # Store settings
         self.chat_messages = []  # store (role, text) tuples for chat history
+        # Every background job (fetch, generate, chat, profile) runs here
+        self.tasks = TaskManager(parent=self)
         
         self.init_fonts()
         self.load_settings()
@@ -367,21 +441,21 @@ class LinkedInTerminalApp(QMainWindow):
             self.mono_font = self.mono_font_fallback
     
     def load_settings(self):
-        """Load settings from .env file"""
+        """Load settings from the shared settings store (.env, read once)"""
         try:
-            from dotenv import load_dotenv, dotenv_values
             import os
             
-            load_dotenv()
-            env_values = dotenv_values('.env')
-            
+            store = get_settings()
             self.settings = {
-                'api_key': os.getenv('GROQ_API_KEY', ''),
-                'webhook_url': os.getenv('MAKE_WEBHOOK_URL', ''),
+                'api_key': store.get('GROQ_API_KEY', os.getenv('GROQ_API_KEY', '')),
+                'webhook_url': store.get('MAKE_WEBHOOK_URL', os.getenv('MAKE_WEBHOOK_URL', '')),
                 'scanline': True,
                 'glow': True,
                 'contrast': False
             }
+            # Keep the dict current when the store changes (e.g. SAVE below)
+            self.unsubscribe_settings = store.subscribe(
+                self.on_settings_changed, keys={'GROQ_API_KEY', 'MAKE_WEBHOOK_URL'})
         except Exception as e:
             print(f"Error loading settings: {e}")
             self.settings = {
@@ -392,39 +466,43 @@ class LinkedInTerminalApp(QMainWindow):
                 'contrast': False
             }
     
+    def on_settings_changed(self, changed):
+        """Settings store updated: refresh the values used by publishing"""
+        if 'GROQ_API_KEY' in changed:
+            self.settings['api_key'] = changed['GROQ_API_KEY'] or ''
+        if 'MAKE_WEBHOOK_URL' in changed:
+            self.settings['webhook_url'] = changed['MAKE_WEBHOOK_URL'] or ''
+    
     def save_settings_clicked(self):
         """Save settings when button is clicked"""
         try:
-            import os
-            from pathlib import Path
-            
             # Get values from inputs
             api_key = self.api_key_input.text()
             webhook_url = self.webhook_input.text()
             
-            # Read existing .env or create new
-            env_file = '.env'
-            env_content = {}
-            
-            if os.path.exists(env_file):
-                with open(env_file, 'r') as f:
-                    for line in f:
-                        if '=' in line and not line.startswith('#'):
-                            key, value = line.strip().split('=', 1)
-                            env_content[key] = value
-            
-            # Update with new values
+            # Only the changed lines of .env are rewritten (atomically); the
+            # Groq client, posters and this window pick the values up from the store
+            changes = {}
             if api_key:
-                env_content['GROQ_API_KEY'] = api_key
+                changes['GROQ_API_KEY'] = api_key
             if webhook_url:
-                env_content['MAKE_WEBHOOK_URL'] = webhook_url
+                changes['MAKE_WEBHOOK_URL'] = webhook_url
+            get_settings().update(changes)
             
-            # Save to .env
-            with open(env_file, 'w') as f:
-                for key, value in env_content.items():
-                    f.write(f"{key}={value}\n")
+            # Written (only if edited), compiled in the background and used
+            # from the next fetch. A read-only feed editor shows LINK_RSS_FEEDS,
+            # which must not end up in the file.
+            feed_config = get_feed_config().current
+            edited = clean_feed_config({
+                'rss_feeds': (list(feed_config.rss_feeds) if self.feeds_input.isReadOnly()
+                              else self.feeds_input.toPlainText().splitlines()),
+                'llm_keywords': self.keywords_input.toPlainText().splitlines(),
+                'topic_profiles': parse_topic_profiles(self.topics_input.toPlainText()),
+                'premium_keywords': parse_premium_keywords(self.premium_input.toPlainText()),
+            })
+            if edited != feed_config.as_dict():
+                get_feed_config().update(edited)
             
-            # Update settings dict
             self.settings['scanline'] = self.scanline_cb.isChecked()
             self.settings['glow'] = self.glow_cb.isChecked()
             self.settings['contrast'] = self.contrast_cb.isChecked()
@@ -752,6 +830,22 @@ class LinkedInTerminalApp(QMainWindow):
         action_layout.addStretch()
         layout.addLayout(action_layout)
         
+        # Archive search
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search archive... (keywords  source:verge  since:2026-01-01  until:2026-02-01)")
+        self.search_input.setFont(self.mono_font)
+        self.search_input.setStyleSheet(f"""
+            QLineEdit {{
+                background-color: {TerminalColors.BG_INPUT};
+                color: {TerminalColors.TEXT_WHITE};
+                border: 1px solid {TerminalColors.BORDER};
+                border-radius: 4px;
+                padding: 8px;
+            }}
+        """)
+        self.search_input.returnPressed.connect(self.search_archive)
+        layout.addWidget(self.search_input)
+        
         # Progress bar
         self.progress_bar = QProgressBar()
         self.progress_bar.setFixedHeight(6)
@@ -1185,6 +1279,46 @@ class LinkedInTerminalApp(QMainWindow):
         
         layout.addWidget(display_card)
         
+        # Feeds & keywords card (feed_config.py; applied without a restart)
+        feeds_card = QFrame()
+        feeds_card.setMaximumWidth(600)
+        feeds_card.setStyleSheet(f"""
+            QFrame {{
+                background-color: {TerminalColors.BG_HEADER};
+                border: 1px solid {TerminalColors.BORDER};
+                border-radius: 4px;
+            }}
+        """)
+        feeds_layout = QVBoxLayout(feeds_card)
+        feeds_layout.setContentsMargins(20, 20, 20, 20)
+        feeds_layout.setSpacing(15)
+        
+        feeds_header = QLabel("[FEEDS & KEYWORDS]")
+        feeds_header.setFont(QFont(self.mono_font.family(), 11, QFont.Bold))
+        feeds_header.setStyleSheet(f"color: {TerminalColors.TEXT_YELLOW};")
+        feeds_layout.addWidget(feeds_header)
+        
+        feed_config = get_feed_config().current
+        # LINK_RSS_FEEDS replaces the file's feeds: show it instead, read-only
+        feeds_override = news_fetcher.FEEDS_OVERRIDE if news_fetcher else None
+        if feeds_override:
+            self.feeds_input = self.create_config_editor(
+                feeds_layout, "RSS feeds (set by LINK_RSS_FEEDS, read-only)", "\n".join(feeds_override))
+            self.feeds_input.setReadOnly(True)
+        else:
+            self.feeds_input = self.create_config_editor(
+                feeds_layout, "RSS feeds (one URL per line)", "\n".join(feed_config.rss_feeds))
+        self.keywords_input = self.create_config_editor(
+            feeds_layout, "Filter keywords (one per line)", "\n".join(feed_config.llm_keywords))
+        self.topics_input = self.create_config_editor(
+            feeds_layout, "Topic profiles (name: keyword, keyword)",
+            topic_profiles_text(feed_config.topic_profiles))
+        self.premium_input = self.create_config_editor(
+            feeds_layout, "Premium keywords (keyword = points)",
+            premium_keywords_text(feed_config.premium_keywords))
+        
+        layout.addWidget(feeds_card)
+        
         # Save button
         save_btn = TerminalButton("SAVE SETTINGS", TerminalColors.TEXT_GREEN)
         save_btn.setMinimumWidth(220)
@@ -1202,6 +1336,30 @@ class LinkedInTerminalApp(QMainWindow):
         
         return page
     
+    def create_config_editor(self, parent_layout, label_text, text):
+        """Labelled multi-line editor on the settings page"""
+        label = QLabel(label_text)
+        label.setFont(QFont(self.mono_font.family(), 9))
+        label.setStyleSheet(f"color: {TerminalColors.TEXT_GRAY};")
+        parent_layout.addWidget(label)
+        
+        editor = QTextEdit()
+        editor.setAcceptRichText(False)
+        editor.setMinimumHeight(120)
+        editor.setFont(QFont(self.mono_font.family(), 9))
+        editor.setPlainText(text)
+        editor.setStyleSheet(f"""
+            QTextEdit {{
+                background-color: {TerminalColors.BG_INPUT};
+                color: {TerminalColors.TEXT_WHITE};
+                border: 1px solid {TerminalColors.BORDER};
+                border-radius: 4px;
+                padding: 10px;
+            }}
+        """)
+        parent_layout.addWidget(editor)
+        return editor
+    
     def create_chat_page(self):
         """Create the AI chat page for discussing selected article"""
         page = QFrame()
@@ -1316,7 +1474,7 @@ class LinkedInTerminalApp(QMainWindow):
             news = self.selected_news
             context = f"Article Title: {news.get('title')}\nSummary: {news.get('summary')}\nLink: {news.get('link')}\n\n"
 
-        if not groq_client:
+        if not llm_dispatcher:
             # Replace placeholder with error
             if self.chat_messages and self.chat_messages[-1][0] == 'assistant':
                 self.chat_messages[-1] = ('assistant', 'Groq client not available (import error).')
@@ -1332,11 +1490,10 @@ class LinkedInTerminalApp(QMainWindow):
         except Exception:
             pass
 
-        # Start background worker
-        self.chat_worker = ChatWorker(context, user_text, groq_client)
-        self.chat_worker.finished.connect(self.on_chat_finished)
-        self.chat_worker.error.connect(self.on_chat_error)
-        self.chat_worker.start()
+        # Chat jumps ahead of queued fetch/generate work
+        self.tasks.submit("chat", chat_task, context, user_text,
+                          on_result=self.on_chat_finished, on_error=self.on_chat_error,
+                          priority=PRIORITY_HIGH)
 
     def on_chat_finished(self, ai_reply):
         # Replace the last assistant placeholder with the real reply
@@ -1350,10 +1507,6 @@ class LinkedInTerminalApp(QMainWindow):
             self.chat_send_btn.setDisabled(False)
         except Exception:
             pass
-        try:
-            self.chat_worker.quit()
-        except Exception:
-            pass
 
     def on_chat_error(self, err_msg):
         err_text = f"Error contacting Groq API: {err_msg}"
@@ -1367,10 +1520,6 @@ class LinkedInTerminalApp(QMainWindow):
             self.chat_send_btn.setDisabled(False)
         except Exception:
             pass
-        try:
-            self.chat_worker.quit()
-        except Exception:
-            pass
 
     def create_about_page(self):
         """Create the about page"""
@@ -1556,13 +1705,15 @@ class LinkedInTerminalApp(QMainWindow):
         
         if command == "help":
             QMessageBox.information(self, "Help", 
-                "Commands: fetch, generate, clear, news, generator, settings, about")
+                "Commands: fetch, generate, profile, clear, news, generator, settings, about")
         elif command == "fetch":
             self.show_page(0)
             self.fetch_news()
         elif command == "generate":
             self.show_page(1)
             self.generate_post()
+        elif command == "profile":
+            self.run_profile()
         elif command == "clear":
             self.clear_news()
         elif command == "news":
@@ -1577,6 +1728,30 @@ class LinkedInTerminalApp(QMainWindow):
             QMessageBox.warning(self, "Unknown Command", 
                 'Unknown command. Type "help" for available commands.')
     
+    def run_profile(self):
+        """Profile one automation run (auto-selects the top article, saves locally)"""
+        if self.tasks.is_running("profile"):
+            QMessageBox.information(self, "Profile", "A profiled run is already in progress.")
+            return
+        
+        self.news_status.setText("● Profiling run...")
+        self.news_status.setStyleSheet(f"color: {TerminalColors.TEXT_YELLOW};")
+        
+        self.tasks.submit("profile", profile_task,
+                          on_result=self.on_profile_finished, on_error=self.on_profile_error)
+    
+    def on_profile_finished(self, summary_path):
+        """Handle finished profile run"""
+        self.news_status.setText("● Profile complete")
+        self.news_status.setStyleSheet(f"color: {TerminalColors.TEXT_GREEN};")
+        QMessageBox.information(self, "Profile", f"Hotspot summary written to:\n{summary_path}")
+    
+    def on_profile_error(self, error_msg):
+        """Handle profile run error"""
+        self.news_status.setText(f"● Error: {error_msg}")
+        self.news_status.setStyleSheet(f"color: {TerminalColors.TEXT_YELLOW};")
+        QMessageBox.warning(self, "Profile Error", f"Profiled run failed: {error_msg}")
+    
     def keyPressEvent(self, event):
         """Handle keyboard shortcuts"""
         if self.command_input.hasFocus():
@@ -1607,17 +1782,13 @@ class LinkedInTerminalApp(QMainWindow):
         self.progress_label.setVisible(True)
         self.progress_bar.setValue(0)
         
-        # Use QThread to fetch news asynchronously
-        self.fetch_thread = QThread()
-        self.fetch_worker = NewsWorker()
-        self.fetch_worker.moveToThread(self.fetch_thread)
-        
-        self.fetch_worker.progress.connect(self.update_fetch_progress_real)
-        self.fetch_worker.finished.connect(self.on_news_fetched_real)
-        self.fetch_worker.error.connect(self.on_fetch_error)
-        self.fetch_thread.started.connect(self.fetch_worker.run)
-        
-        self.fetch_thread.start()
+        # A fetch while one is running joins it instead of starting another
+        callbacks = dict(on_result=self.on_news_fetched_real, on_error=self.on_fetch_error,
+                         on_progress=self.update_fetch_progress_real)
+        if ASYNC_AVAILABLE:
+            self.tasks.submit_async("fetch", fetch_news_async, **callbacks)
+        else:
+            self.tasks.submit("fetch", fetch_news_task, **callbacks)
     
     def update_fetch_progress_real(self, message):
         """Update fetch progress from worker"""
@@ -1626,14 +1797,20 @@ class LinkedInTerminalApp(QMainWindow):
     
     def on_news_fetched_real(self, news_list):
         """Handle real fetched news"""
-        if self.fetch_thread:
-            self.fetch_thread.quit()
-            self.fetch_thread.wait()
-        
-        self.current_news_items = news_list
         self.progress_bar.setValue(100)
         self.progress_label.setText("Complete!")
         
+        self.display_news(news_list)
+        self.news_status.setText(f"● Ready - {len(news_list)} articles loaded")
+        self.news_status.setStyleSheet(f"color: {TerminalColors.TEXT_GREEN};")
+        
+        # Hide progress after delay
+        QTimer.singleShot(500, lambda: (self.progress_bar.setVisible(False), self.progress_label.setVisible(False)))
+    
+    def display_news(self, news_list):
+        """Show a list of news items in the feed"""
+        self.current_news_items = news_list
+        
         # Clear existing items
         self.clear_news_list()
         
@@ -1643,22 +1820,39 @@ class LinkedInTerminalApp(QMainWindow):
         # Add news items
         for i, news in enumerate(news_list):
             score = news.get('rank_score', 0)
-            widget = NewsItemWidget(i, score, news['title'], news['source'])
+            widget = NewsItemWidget(i, score, news['title'], news['source'],
+                                    list(news.get('profile_hits', {})))
             widget.clicked.connect(self.on_news_selected)
             self.news_widgets.append(widget)
             self.news_list_layout.insertWidget(i, widget)
         
         self.news_count_label.setText(f"{len(news_list)} items")
-        self.news_status.setText(f"● Ready - {len(news_list)} articles loaded")
-        self.news_status.setStyleSheet(f"color: {TerminalColors.TEXT_GREEN};")
+    
+    def search_archive(self):
+        """Search archived articles (indexed keyword/source/date lookup)"""
+        text = self.search_input.text().strip()
+        archive = get_archive() if get_archive else None
+        if archive is None:
+            QMessageBox.warning(self, "Search", "Archive is not available.")
+            return
         
-        # Hide progress after delay
-        QTimer.singleShot(500, lambda: (self.progress_bar.setVisible(False), self.progress_label.setVisible(False)))
+        try:
+            filters = parse_search(text)
+            results = archive.search_articles(
+                filters['query'], filters['source'], filters['since'], filters['until']
+            )
+        except Exception as e:
+            QMessageBox.warning(self, "Search Error", f"Search failed: {str(e)}")
+            return
+        
+        self.display_news(results)
+        if not results:
+            self.empty_state.setVisible(True)
+        self.news_status.setText(f"● Archive - {len(results)} matches")
+        self.news_status.setStyleSheet(f"color: {TerminalColors.TEXT_CYAN};")
     
     def on_fetch_error(self, error_msg):
         """Handle fetch error"""
-        if self.fetch_thread:
-            self.fetch_thread.quit()
         self.progress_bar.setVisible(False)
         self.progress_label.setVisible(False)
         self.news_status.setText(f"● Error: {error_msg}")
@@ -1691,7 +1885,7 @@ class LinkedInTerminalApp(QMainWindow):
         news = self.selected_news
         self.selected_title.setText(news['title'])
         self.selected_details.setText(
-            f"Score: {news['score']}/100 | Source: {news['source']}\n\n{news['summary']}"
+            f"Score: {news.get('rank_score', 0)}/100 | Source: {news['source']}\n\n{news['summary']}"
         )
         self.post_output.clear()
         self.current_post = None
@@ -1707,23 +1901,14 @@ class LinkedInTerminalApp(QMainWindow):
         self.gen_status.setStyleSheet(f"color: {TerminalColors.TEXT_YELLOW};")
         self.post_output.setText("Analyzing article with AI...")
         
-        # Use QThread for AI generation
-        self.gen_thread = QThread()
-        self.gen_worker = PostGeneratorWorker(self.selected_news)
-        self.gen_worker.moveToThread(self.gen_thread)
-        
-        self.gen_worker.finished.connect(self.on_post_generated_real)
-        self.gen_worker.error.connect(self.on_generate_error)
-        self.gen_thread.started.connect(self.gen_worker.run)
-        
-        self.gen_thread.start()
+        # One generation per article; picking another article cancels the old one
+        key = f"generate:{self.selected_news.get('link') or self.selected_news['title']}"
+        self.tasks.cancel_prefix("generate:", keep=key)
+        self.tasks.submit(key, generate_post_task, self.selected_news,
+                          on_result=self.on_post_generated_real, on_error=self.on_generate_error)
     
     def on_post_generated_real(self, post_text):
         """Handle AI-generated post"""
-        if self.gen_thread:
-            self.gen_thread.quit()
-            self.gen_thread.wait()
-        
         self.current_post = post_text
         self.post_output.setText(post_text)
         self.char_count.setText(f"{len(post_text)} characters")
@@ -1732,8 +1917,6 @@ class LinkedInTerminalApp(QMainWindow):
     
     def on_generate_error(self, error_msg):
         """Handle generation error"""
-        if self.gen_thread:
-            self.gen_thread.quit()
         self.post_output.setText("")
         self.gen_status.setText(f"Error: {error_msg}")
         self.gen_status.setStyleSheet(f"color: {TerminalColors.TEXT_YELLOW};")
@@ -1747,62 +1930,76 @@ class LinkedInTerminalApp(QMainWindow):
             return
         
         try:
-            import os
-            from datetime import datetime
+            from post_store import get_post_store
             
-            # Create posts directory if it doesn't exist
-            posts_dir = "saved_posts"
-            if not os.path.exists(posts_dir):
-                os.makedirs(posts_dir)
+            store = get_post_store()
+            title = self.selected_news['title'] if self.selected_news else ""
+            post_id = store.save(post_text, title)
             
-            # Save with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{posts_dir}/post_{timestamp}.txt"
-            
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(post_text)
+            if archive_call:
+                archive_call("add_delivery", post_text, title, "local", True, post_id)
             
             self.post_count += 1
             self.post_count_label.setText(str(self.post_count))
-            QMessageBox.information(self, "Success", f"Post saved to {filename}")
+            QMessageBox.information(self, "Success", f"Post saved to {store.directory} (id {post_id})")
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to save post: {str(e)}")
     
     def post_to_linkedin(self):
-        """Post to LinkedIn via webhook"""
-        if not self.post_output.toPlainText().strip():
+        """Post to LinkedIn via webhook in the background (several posts may be in flight)"""
+        post_text = self.post_output.toPlainText()
+        if not post_text.strip():
             QMessageBox.warning(self, "Warning", "Please generate a post first!")
             return
         
-        try:
-            import requests
-            from dotenv import load_dotenv
-            import os
-            
-            load_dotenv()
-            webhook_url = os.getenv('MAKE_WEBHOOK_URL')
-            
-            if not webhook_url:
-                QMessageBox.warning(self, "Error", "MAKE_WEBHOOK_URL not configured in .env")
+        # Loaded once at startup / on save, not re-read from .env per click
+        webhook_url = self.settings.get('webhook_url')
+        if not webhook_url:
+            QMessageBox.warning(self, "Error", "MAKE_WEBHOOK_URL not configured in .env")
+            return
+        
+        news = self.selected_news or {}
+        link = news.get('link')
+        
+        # Fix markdown bold, hashtags, missing link and length before sending
+        if validate_post:
+            checked = validate_post(post_text, link)
+            if checked["errors"]:
+                QMessageBox.warning(self, "Error", "Post not sent: " + ", ".join(checked["errors"]))
                 return
-            
-            # Get the edited post text
-            post_text = self.post_output.toPlainText()
-            
-            payload = {
-                "content": post_text
-            }
-            
-            response = requests.post(webhook_url, json=payload, timeout=10)
-            
-            if response.status_code in [200, 201]:
-                QMessageBox.information(self, "Success", "Post sent to LinkedIn webhook!")
-                self.post_count += 1
-                self.post_count_label.setText(str(self.post_count))
-            else:
-                QMessageBox.warning(self, "Error", f"Webhook returned status {response.status_code}")
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Failed to post: {str(e)}")
+            post_text = checked["post"]
+        
+        # Same text clicked twice joins the delivery already in flight
+        key = "publish:" + hashlib.sha1(post_text.encode("utf-8")).hexdigest()
+        self.tasks.submit(key, publish_task, webhook_url, post_text, news.get('title', ''),
+                          link, news.get('preview'),
+                          on_result=self.on_post_published, on_error=self.on_publish_error,
+                          on_progress=self.show_publish_status)
+        self.show_publish_status("Queued for publishing")
+    
+    def show_publish_status(self, message):
+        """Publishing progress in the generator status line"""
+        in_flight = self.tasks.count("publish:")
+        suffix = f" ({in_flight} in flight)" if in_flight > 1 else ""
+        self.gen_status.setText(message + suffix)
+        self.gen_status.setStyleSheet(f"color: {TerminalColors.TEXT_YELLOW};")
+    
+    def on_post_published(self, title):
+        """Handle a finished webhook delivery"""
+        self.post_count += 1
+        self.post_count_label.setText(str(self.post_count))
+        remaining = self.tasks.count("publish:")
+        status = f"Post sent to LinkedIn webhook: {title[:40]}"
+        if remaining:
+            status += f" ({remaining} still sending)"
+        self.gen_status.setText(status)
+        self.gen_status.setStyleSheet(f"color: {TerminalColors.TEXT_GREEN};")
+    
+    def on_publish_error(self, error_msg):
+        """Handle a failed webhook delivery"""
+        self.gen_status.setText(f"Publish failed: {error_msg[:60]}")
+        self.gen_status.setStyleSheet(f"color: {TerminalColors.TEXT_YELLOW};")
+        QMessageBox.warning(self, "Error", f"Failed to post: {error_msg}")
     
     def copy_post(self):
         """Copy post to clipboard"""
@@ -1814,6 +2011,13 @@ class LinkedInTerminalApp(QMainWindow):
         clipboard = QApplication.clipboard()
         clipboard.setText(post_text)
         QMessageBox.information(self, "Success", "Post copied to clipboard!")
+    
+    def closeEvent(self, event):
+        """Cancel background tasks and wait for their threads before closing"""
+        self.tasks.shutdown()
+        if getattr(self, 'unsubscribe_settings', None):
+            self.unsubscribe_settings()
+        super().closeEvent(event)
 
 
 def main():
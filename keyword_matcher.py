@@ -0,0 +1,87 @@
+# keyword_matcher.py - Many substring keywords matched with one compiled regex
+#
+# Built once per keyword list (see feed_config.py), then used for every
+# article. hits() returns exactly the keywords that `keyword in text` would
+# find: a lookahead alternation (longest alternative first) yields the
+# longest keyword starting at each position, and every keyword contained in
+# a match is found through a table computed at build time. ProfileMatcher
+# does the same for several named keyword sets (topic profiles) at once.
+
+import re
+
+
+def normalize_keywords(keywords):
+    """
+    Stripped, lowercased, non-empty keywords without duplicates, in order
+    """
+    return tuple(dict.fromkeys(k.strip().lower() for k in keywords if k.strip()))
+
+
+class KeywordMatcher:
+    """
+    Compiled, read-only matcher for a set of lowercase keywords
+    """
+
+    def __init__(self, keywords):
+        self.keywords = normalize_keywords(keywords)
+        ordered = sorted(self.keywords, key=len, reverse=True)
+        self._regex = (re.compile("(?=(" + "|".join(map(re.escape, ordered)) + "))")
+                       if ordered else None)
+        # keyword -> every keyword occurring inside it (itself included)
+        self._contained = {k: [other for other in self.keywords if other in k]
+                           for k in self.keywords}
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def search(self, text):
+        """
+        True if any keyword occurs in text (already lowercased)
+        """
+        return self._regex is not None and self._regex.search(text) is not None
+
+    def hits(self, text):
+        """
+        Set of keywords occurring in text (already lowercased)
+        """
+        if self._regex is None:
+            return set()
+        found = set()
+        for longest in {match.group(1) for match in self._regex.finditer(text)}:
+            found.update(self._contained[longest])
+        return found
+
+
+class ProfileMatcher:
+    """
+    Keyword sets of several topic profiles, matched in one pass:
+    the union of all keywords is compiled once, and each hit is mapped
+    back to the profiles that list it
+    """
+
+    def __init__(self, profiles):
+        self.names = tuple(profiles)
+        self.matcher = KeywordMatcher(k for keywords in profiles.values() for k in keywords)
+        self._profiles_of = {}
+        for name, keywords in profiles.items():
+            for keyword in normalize_keywords(keywords):
+                self._profiles_of.setdefault(keyword, []).append(name)
+
+    def __len__(self):
+        return len(self.matcher)
+
+    def search(self, text):
+        """
+        True if any profile matches text (already lowercased)
+        """
+        return self.matcher.search(text)
+
+    def hits(self, text):
+        """
+        {profile: sorted matching keywords} for the profiles matching text
+        """
+        hits = {}
+        for keyword in self.matcher.hits(text):
+            for name in self._profiles_of[keyword]:
+                hits.setdefault(name, []).append(keyword)
+        return {name: sorted(hits[name]) for name in self.names if name in hits}
@@ -0,0 +1,228 @@
+# link_preview.py - Open Graph metadata for article links, prefetched and cached
+#
+# LinkedIn builds the post preview from the article's Open Graph tags, and
+# Buffer/Make.com can attach og:image. Previews are fetched in a small
+# background pool while posts are being generated: only the <head> is
+# parsed (reading stops at </head>, <body> or PREVIEW_MAX_BYTES), and results
+# are cached in SQLite by URL for PREVIEW_TTL seconds. Publishing only uses
+# previews that are already available; it never waits for one.
+
+import codecs
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+
+from config import (
+    PREVIEW_ENABLED, PREVIEW_CACHE_PATH, PREVIEW_TTL, PREVIEW_MAX_BYTES, PREVIEW_WORKERS
+)
+from metrics import span
+from sources import iter_chunks
+
+
+# og:* first, twitter:* / <title> / meta description as fallbacks
+PREVIEW_TAGS = {
+    "og:title": "title", "twitter:title": "title",
+    "og:description": "description", "twitter:description": "description",
+    "description": "description",
+    "og:image": "image", "og:image:url": "image", "og:image:secure_url": "image",
+    "twitter:image": "image", "twitter:image:src": "image",
+    "og:site_name": "site_name",
+}
+ERROR_TTL = 3600  # retry failed pages after an hour
+
+
+class _HeadParser(HTMLParser):
+    """
+    Collects <meta> and <title> until the head ends
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.og = {}
+        self.fallback = {}
+        self.title = None
+        self.done = False
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "body":
+            self.done = True
+        elif tag == "meta":
+            attrs = dict(attrs)
+            key = (attrs.get("property") or attrs.get("name") or "").lower()
+            field = PREVIEW_TAGS.get(key)
+            content = (attrs.get("content") or "").strip()
+            if field and content:
+                target = self.og if key.startswith("og:") else self.fallback
+                target.setdefault(field, content)
+        elif tag == "title":
+            self._in_title = True
+
+    def handle_endtag(self, tag):
+        if tag == "head":
+            self.done = True
+        elif tag == "title":
+            self._in_title = False
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title = (self.title or "") + data
+
+    def preview(self):
+        result = {**self.fallback, **self.og}
+        if "title" not in result and self.title:
+            result["title"] = self.title.strip()
+        result["has_og"] = bool(self.og.get("title") or self.og.get("image"))
+        return result
+
+
+def fetch_preview(url, max_bytes=PREVIEW_MAX_BYTES):
+    """
+    Download just enough of the page to read its <head>, returns the preview dict
+    """
+    parser = _HeadParser()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    received = 0
+
+    with span("preview_fetch") as s:
+        chunks = iter_chunks(url, chunk_size=8192, timeout=10)
+        try:
+            for chunk in chunks:
+                received += len(chunk)
+                parser.feed(decoder.decode(chunk))
+                if parser.done or received >= max_bytes:
+                    break
+        finally:
+            chunks.close()
+        s.add("bytes", received)
+
+    return parser.preview()
+
+
+class PreviewCache:
+    """
+    url -> preview dict with a fetch time, in SQLite
+    """
+
+    def __init__(self, path=PREVIEW_CACHE_PATH, ttl=PREVIEW_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS previews (url TEXT PRIMARY KEY, data TEXT, fetched_at REAL)"
+        )
+        self.conn.commit()
+
+    def get(self, url):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT data, fetched_at FROM previews WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        data = json.loads(row[0])
+        ttl = ERROR_TTL if "error" in data else self.ttl
+        if time.time() - row[1] > ttl:
+            return None
+        return data
+
+    def put(self, url, data):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO previews (url, data, fetched_at) VALUES (?, ?, ?)",
+                (url, json.dumps(data), time.time())
+            )
+
+
+class LinkPreviewer:
+    """
+    Background prefetching on top of the cache
+    """
+
+    def __init__(self, cache=None, workers=PREVIEW_WORKERS):
+        self.cache = cache or PreviewCache()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="preview")
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def _load(self, url):
+        data = self.cache.get(url)
+        if data is not None:
+            return data
+        try:
+            data = fetch_preview(url)
+        except Exception as e:
+            data = {"error": str(e)[:200]}
+        self.cache.put(url, data)
+        return data
+
+    def prefetch(self, urls):
+        """
+        Start fetching previews for urls not already in flight
+        """
+        with self._lock:
+            for url in urls:
+                future = self._futures.get(url)
+                # A finished future may be past its TTL; _load re-checks the cache
+                if url and (future is None or future.done()):
+                    self._futures[url] = self._executor.submit(self._load, url)
+
+    def get(self, url, timeout=0):
+        """
+        Preview for url if it is ready within timeout seconds, else None
+        """
+        with self._lock:
+            future = self._futures.get(url)
+        if future is None:
+            data = self.cache.get(url)
+        else:
+            try:
+                data = future.result(timeout=timeout)
+            except Exception:
+                return None
+        return None if data is None or "error" in data else data
+
+
+_previewer = None
+_previewer_lock = threading.Lock()
+
+
+def get_previewer():
+    """
+    Shared previewer (None when previews are disabled)
+    """
+    global _previewer
+    if not PREVIEW_ENABLED:
+        return None
+    with _previewer_lock:
+        if _previewer is None:
+            _previewer = LinkPreviewer()
+        return _previewer
+
+
+def prefetch_previews(news_items):
+    """
+    Kick off preview fetches for these articles; returns immediately
+    """
+    previewer = get_previewer()
+    if previewer is not None:
+        previewer.prefetch([n.get("link") for n in news_items])
+
+
+def attach_preview(news_item, timeout=0):
+    """
+    Set news_item['preview'] if it is available (never blocks longer than timeout)
+    """
+    previewer = get_previewer()
+    if previewer is None or not news_item.get("link"):
+        return None
+    preview = previewer.get(news_item["link"], timeout=timeout)
+    if preview:
+        news_item["preview"] = preview
+        if not preview.get("has_og"):
+            print("⚠️ Article has no Open Graph tags; the LinkedIn preview may be empty")
+    return preview
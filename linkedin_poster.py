@@ -3,7 +3,79 @@
 import requests
 import json
 import os
+import threading
+from datetime import datetime
+from requests.adapters import HTTPAdapter
 from config import WEBHOOK_URL
+from metrics import span
+from archive import archive_call
+from post_store import get_post_store
+from post_validator import validate_post
+from settings_store import get_settings
+
+
+def apply_webhook_settings(changed):
+    """
+    Default webhook for new posters when MAKE_WEBHOOK_URL changes in the settings store
+    """
+    global WEBHOOK_URL
+    WEBHOOK_URL = (changed["MAKE_WEBHOOK_URL"] or "").strip('"')
+
+
+get_settings().subscribe(apply_webhook_settings, keys={"MAKE_WEBHOOK_URL"})
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Shared requests session, so repeated deliveries reuse pooled connections
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+
+def checked_post(content, title, target, link=None):
+    """
+    Normalize a post before it leaves the machine; None (and a failed
+    delivery record) when it cannot be published
+    """
+    result = validate_post(content, link)
+    if result["errors"]:
+        print(f"❌ Post not sent: {', '.join(result['errors'])}")
+        archive_call("add_delivery", content, title, target, False,
+                     "invalid: " + ", ".join(result["errors"]))
+        return None
+    if result["fixes"]:
+        print(f"🔧 Fixed post: {', '.join(result['fixes'])}")
+    return result["post"]
+
+
+def webhook_payload(content, post_title="", preview=None, idempotency_key=None):
+    """
+    JSON body sent to the webhook (shared with the async pipeline);
+    idempotency_key (the run ID) lets the receiving scenario drop a repeat
+    """
+    payload = {
+        "title": post_title,
+        "text": content,
+        "content": content,
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+    if idempotency_key:
+        payload["idempotency_key"] = idempotency_key
+    if preview:
+        payload["preview"] = {k: preview.get(k, "") for k in ("title", "description", "image")}
+        payload["image_url"] = preview.get("image", "")
+    return payload
 
 
 class WebhookPoster:
@@ -13,39 +85,50 @@ class WebhookPoster:
     
     def __init__(self, webhook_url=None):
         self.webhook_url = webhook_url or WEBHOOK_URL
+        self.last_result = None  # status code or error of the last delivery
     
-    def post_to_webhook(self, content, post_title=""):
+    def post_to_webhook(self, content, post_title="", link=None, preview=None,
+                        idempotency_key=None):
         """
         Send post to webhook endpoint
+        (validated first; pass link to make sure the article URL is included,
+        and the article's Open Graph preview to forward title/description/image)
         """
         if not self.webhook_url:
             print("❌ No webhook URL configured. Set WEBHOOK_URL in .env file.")
+            self.last_result = "no webhook URL configured"
             return False
         
-        payload = {
-            "title": post_title,
-            "text": content,
-            "content": content,
-            "timestamp": self._get_timestamp()
-        }
+        content = checked_post(content, post_title, "webhook", link)
+        if content is None:
+            self.last_result = "invalid post"
+            return False
+        
+        payload = webhook_payload(content, post_title, preview, idempotency_key)
         
         try:
-            response = requests.post(self.webhook_url, json=payload, timeout=10)
+            with span("delivery", target="webhook") as s:
+                response = get_session().post(self.webhook_url, json=payload, timeout=10)
+                s.add("bytes", len(response.request.body or b""))
+                s.set("http_status", response.status_code)
             
+            self.last_result = f"{response.status_code} {response.text[:200]}".strip()
             if response.status_code in [200, 201, 202]:
                 print("✅ Post sent to webhook successfully!")
+                archive_call("add_delivery", content, post_title, "webhook", True,
+                             str(response.status_code))
                 return True
             else:
                 print(f"❌ Webhook error: {response.status_code} - {response.text}")
+                archive_call("add_delivery", content, post_title, "webhook", False,
+                             f"{response.status_code} {response.text[:200]}")
                 return False
                 
         except Exception as e:
             print(f"❌ Error posting to webhook: {e}")
+            self.last_result = str(e)
+            archive_call("add_delivery", content, post_title, "webhook", False, str(e))
             return False
-    
-    def _get_timestamp(self):
-        from datetime import datetime
-        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 
 class BufferPoster:
@@ -67,7 +150,7 @@ class BufferPoster:
         params = {"access_token": self.access_token}
         
         try:
-            response = requests.get(url, params=params)
+            response = get_session().get(url, params=params)
             profiles = response.json()
             
             print("\n📱 Your Buffer Profiles:")
@@ -85,9 +168,9 @@ class BufferPoster:
             return []
     
     
-    def post_to_buffer(self, content, profile_id=None):
+    def post_to_buffer(self, content, profile_id=None, link=None, preview=None):
         """
-        Add post to Buffer queue
+        Add post to Buffer queue (with the article preview as link media when available)
         """
         if profile_id is None:
             profile_id = self.profile_id
@@ -96,6 +179,10 @@ class BufferPoster:
             print("❌ No LinkedIn profile found. Run get_profiles() first.")
             return False
         
+        content = checked_post(content, "", "buffer")
+        if content is None:
+            return False
+        
         url = f"{self.base_url}/updates/create.json"
         
         data = {
@@ -103,16 +190,26 @@ class BufferPoster:
             "profile_ids[]": [profile_id],
             "text": content,
         }
+        if link and preview:
+            data["media[link]"] = link
+            data["media[title]"] = preview.get("title", "")
+            data["media[description]"] = preview.get("description", "")
+            if preview.get("image"):
+                data["media[picture]"] = preview["image"]
         
         try:
-            response = requests.post(url, data=data)
+            with span("delivery", target="buffer") as s:
+                response = get_session().post(url, data=data)
+                s.set("http_status", response.status_code)
             result = response.json()
             
             if result.get("success"):
                 print("✅ Post added to Buffer queue!")
+                archive_call("add_delivery", content, "", "buffer", True)
                 return True
             else:
                 print(f"❌ Buffer error: {result}")
+                archive_call("add_delivery", content, "", "buffer", False, str(result)[:200])
                 return False
                 
         except Exception as e:
@@ -124,31 +221,24 @@ class LocalSaver:
     """
     Alternative: Save posts locally for manual posting
     (Use this if you don't want Buffer)
+    Posts go to the shared PostStore (atomic, id per post, safe across processes)
     """
     
-    def __init__(self, filename="generated_posts.txt"):
-        self.filename = filename
+    def __init__(self, store=None):
+        self.store = store or get_post_store()
     
     
     def save_post(self, post_content, news_title):
         """
-        Save post to local file
+        Save post to the local post store, returns the post id
         """
-        with open(self.filename, "a", encoding="utf-8") as f:
-            f.write("\n" + "="*60 + "\n")
-            f.write(f"📰 Based on: {news_title}\n")
-            f.write(f"📅 Generated: {self._get_timestamp()}\n")
-            f.write("-"*60 + "\n\n")
-            f.write(post_content)
-            f.write("\n\n")
+        with span("delivery", target="local") as s:
+            post_id = self.store.save(post_content, news_title)
+            s.add("bytes", len(post_content.encode("utf-8")))
         
-        print(f"💾 Post saved to {self.filename}")
-        return True
-    
-    
-    def _get_timestamp(self):
-        from datetime import datetime
-        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"💾 Post saved to {self.store.directory} (id {post_id})")
+        archive_call("add_delivery", post_content, news_title, "local", True, post_id)
+        return post_id
 
 
 # Test
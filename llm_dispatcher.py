@@ -0,0 +1,325 @@
+# llm_dispatcher.py - Shared, rate-limit-aware gate in front of the Groq client
+#
+# Post generation (batch) and GUI chat (interactive) use the same account.
+# Every chat completion goes through one LLMDispatcher, which:
+#   - orders waiting requests by lane (interactive before batch, then FIFO)
+#   - keeps requests/tokens inside a sliding one-minute window (LLM_RPM/LLM_TPM)
+#   - spaces batch requests evenly instead of bursting into the limit
+#   - reads the x-ratelimit-* response headers to follow the real limits
+#   - backs off and retries on 429, honouring retry-after
+#   - falls back along a model chain on errors/timeouts and can hedge slow
+#     requests with a second model (create_with_fallback)
+
+import heapq
+import itertools
+import random
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from groq import RateLimitError
+
+from config import LLM_RPM, LLM_TPM, LLM_MAX_IN_FLIGHT, LLM_MAX_RETRIES
+from metrics import span
+
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+LANES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BATCH: "batch"}
+
+WINDOW = 60.0
+CANCEL_POLL = 0.5   # how often a queued request checks whether it was cancelled
+HEDGE_POLL = 0.1    # how often create_with_fallback checks whether its request was sent
+DURATION_RE = re.compile(r"([\d.]+)(ms|h|m|s)")
+
+
+def parse_duration(value):
+    """
+    Groq reset headers ('7.66s', '2m59.56s', '120ms') or plain seconds -> seconds
+    """
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    parts = DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(number) * units[unit] for number, unit in parts)
+
+
+class RequestCancelled(Exception):
+    """
+    Raised instead of starting a queued request whose caller gave up
+    """
+
+
+def estimate_tokens(request):
+    """
+    Rough token cost of a chat request: ~4 characters per token plus the completion budget
+    """
+    chars = sum(len(m.get("content") or "") for m in request.get("messages", []))
+    return chars // 4 + request.get("max_tokens", 256)
+
+
+class LLMDispatcher:
+    """
+    Queues chat completion calls by priority and releases them within the rate limits
+    """
+
+    def __init__(self, client, rpm=LLM_RPM, tpm=LLM_TPM, max_in_flight=LLM_MAX_IN_FLIGHT,
+                 max_retries=LLM_MAX_RETRIES):
+        self.client = client
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+
+        self._cond = threading.Condition()
+        self._waiting = []              # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._window = deque()          # [start_time, tokens] of recent requests
+        self._last_batch_start = 0.0
+        self._blocked_until = 0.0       # set by 429s and exhausted header budgets
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="llm")
+
+    # ---------- scheduling ----------
+
+    def _prune(self, now):
+        while self._window and now - self._window[0][0] >= WINDOW:
+            self._window.popleft()
+
+    def _ready_at(self, ticket, priority, tokens, now):
+        """
+        When this ticket may start (<= now means immediately), None if it must
+        wait for another request to finish or leave the queue first
+        """
+        if self._waiting[0] != ticket:
+            return None
+        # Batch never takes the last slot, so chat always has one free
+        slots = self.max_in_flight if priority == PRIORITY_INTERACTIVE else max(1, self.max_in_flight - 1)
+        if self._in_flight >= slots:
+            return None
+
+        self._prune(now)
+        ready = self._blocked_until
+        if len(self._window) >= self.rpm:
+            ready = max(ready, self._window[0][0] + WINDOW)
+
+        used = sum(t for _, t in self._window)
+        if used + tokens > self.tpm:
+            # Wait until enough of the window expires
+            freed = 0
+            for start, spent in self._window:
+                freed += spent
+                if used - freed + tokens <= self.tpm:
+                    ready = max(ready, start + WINDOW)
+                    break
+
+        if priority == PRIORITY_BATCH:
+            ready = max(ready, self._last_batch_start + WINDOW / self.rpm)
+        return ready
+
+    def _acquire(self, ticket, tokens, cancelled=None):
+        priority = ticket[0]
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            while True:
+                if cancelled is not None and cancelled():
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                    self._cond.notify_all()
+                    raise RequestCancelled()
+                now = time.monotonic()
+                ready = self._ready_at(ticket, priority, tokens, now)
+                if ready is not None and ready <= now:
+                    heapq.heappop(self._waiting)
+                    self._in_flight += 1
+                    entry = [now, tokens]
+                    self._window.append(entry)
+                    if priority == PRIORITY_BATCH:
+                        self._last_batch_start = now
+                    self._cond.notify_all()
+                    return entry
+                timeout = None if ready is None else ready - now
+                if cancelled is not None:
+                    timeout = CANCEL_POLL if timeout is None else min(timeout, CANCEL_POLL)
+                self._cond.wait(timeout)
+
+    def _release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    # ---------- limits from the API ----------
+
+    def _update_from_headers(self, headers):
+        limit_tokens = headers.get("x-ratelimit-limit-tokens")
+        if limit_tokens and limit_tokens.isdigit():
+            self.tpm = int(limit_tokens)
+
+        now = time.monotonic()
+        blocked = 0.0
+        for kind in ("requests", "tokens"):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+            if remaining is not None and remaining.isdigit() and int(remaining) == 0 and reset:
+                blocked = max(blocked, now + reset)
+
+        retry_after = parse_duration(headers.get("retry-after"))
+        if retry_after:
+            blocked = max(blocked, now + retry_after)
+
+        if blocked:
+            with self._cond:
+                self._blocked_until = max(self._blocked_until, blocked)
+                self._cond.notify_all()
+
+    def _back_off(self, error, attempt):
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        if headers.get("retry-after") is None:
+            delay = min(60.0, 2 ** attempt) * (1 + random.random() / 2)
+            with self._cond:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+        self._update_from_headers(headers)
+
+    # ---------- for callers that send the request themselves ----------
+    # async_pipeline.py makes its calls with AsyncGroq but takes its turns
+    # here, so both paths share one window, one back-off and one set of limits.
+
+    def new_ticket(self, priority=PRIORITY_BATCH):
+        """
+        Queue position for one request (its retries reuse it)
+        """
+        return (priority, next(self._seq))
+
+    def acquire(self, ticket, tokens):
+        """
+        Block until the request may start; returns its window entry.
+        Every acquire() must be followed by release()
+        """
+        return self._acquire(ticket, tokens)
+
+    def release(self):
+        self._release()
+
+    def completed(self, entry, headers, response):
+        """
+        Follow the limits in the response headers and count the real token usage
+        """
+        self._update_from_headers(headers)
+        usage = getattr(response, "usage", None)
+        if usage is not None and getattr(usage, "total_tokens", None):
+            with self._cond:
+                entry[1] = usage.total_tokens  # replace the estimate
+        return response
+
+    def rate_limited(self, error, attempt):
+        """
+        Block everyone until a 429 has passed (retry-after or exponential back-off)
+        """
+        self._back_off(error, attempt)
+
+    # ---------- public ----------
+
+    def create(self, priority=PRIORITY_BATCH, cancelled=None, on_send=None, **request):
+        """
+        Same arguments as client.chat.completions.create(); blocks until the
+        request is allowed to run and returns the parsed completion.
+        cancelled: callable, polled while queued; raises RequestCancelled once it returns True
+        on_send: called with time.monotonic() whenever the request leaves the queue
+        """
+        tokens = estimate_tokens(request)
+        ticket = (priority, next(self._seq))  # retries keep their place in the queue
+        with span("llm_queue", lane=LANES.get(priority, str(priority))) as s:
+            for attempt in range(self.max_retries + 1):
+                started = time.perf_counter()
+                entry = self._acquire(ticket, tokens, cancelled)
+                s.add("wait_ms", round((time.perf_counter() - started) * 1000))
+                if on_send is not None:
+                    on_send(time.monotonic())
+                try:
+                    raw = self.client.chat.completions.with_raw_response.create(**request)
+                except RateLimitError as e:
+                    s.add("rate_limited")
+                    if attempt == self.max_retries:
+                        raise
+                    self._back_off(e, attempt)
+                    continue
+                finally:
+                    self._release()
+
+                return self.completed(entry, raw.headers, raw.parse())
+
+    def create_with_fallback(self, models, hedge_after=None, priority=PRIORITY_BATCH, cancelled=None,
+                             **request):
+        """
+        Try models in order until one succeeds (errors and timeouts fall through
+        to the next). With hedge_after (seconds), a request the provider has
+        not answered that long after it was sent (time spent queued does not
+        count) is raced against the next model; the first answer wins.
+        Returns (response, model)
+        """
+        models = list(models)
+        pending = {}
+        sent = {}                   # model -> when its request left the queue
+        errors = []
+        next_model = 0
+        hedged = False
+        settled = threading.Event()  # set once there is an answer: losers leave the queue
+
+        def stop():
+            return settled.is_set() or (cancelled is not None and cancelled())
+
+        def launch():
+            nonlocal next_model
+            model = models[next_model]
+            next_model += 1
+            future = self._executor.submit(self.create, priority=priority, cancelled=stop,
+                                           on_send=lambda at: sent.__setitem__(model, at),
+                                           model=model, **request)
+            pending[future] = model
+
+        launch()
+        while pending:
+            timeout = None
+            if hedge_after and not hedged and next_model < len(models):
+                started = sent.get(next(iter(pending.values())))
+                timeout = (HEDGE_POLL if started is None
+                           else max(0.0, started + hedge_after - time.monotonic()))
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                model = next(iter(pending.values()))
+                started = sent.get(model)
+                if started is not None and time.monotonic() - started >= hedge_after:
+                    print(f"⏱ {model} is slow, hedging with {models[next_model]}")
+                    hedged = True
+                    launch()
+                continue
+
+            for future in done:
+                model = pending.pop(future)
+                try:
+                    response = future.result()
+                except RequestCancelled:
+                    settled.set()
+                    raise
+                except Exception as e:
+                    errors.append(e)
+                    print(f"⚠️ {model} failed: {e}")
+                    if not pending and next_model < len(models):
+                        print(f"↪️ Falling back to {models[next_model]}")
+                        launch()
+                    continue
+                # A losing hedge still queued is dropped; one already sent
+                # can't be recalled, so its answer is ignored
+                settled.set()
+                return response, model
+
+        settled.set()
+        raise errors[-1]
@@ -1,14 +1,21 @@
 # main.py
 
+import argparse
 import schedule
 import time
 from datetime import datetime
 
 # Import your helper modules
-from news_fetcher import get_top_news
-from post_generator import generate_linkedin_post
+from news_fetcher import get_top_news, fetch_latest_news, rank_and_sort_news
+from post_generator import generate_linkedin_post, generate_post_candidates
 # We changed BufferPoster to WebhookPoster here:
 from linkedin_poster import WebhookPoster, LocalSaver
+from metrics import metrics
+from archive import archive_call
+from link_preview import prefetch_previews
+from article_extractor import enrich_articles
+from run_journal import RunJournal
+from cli import add_stage_commands, run_command
 
 def select_news_article(news_items):
     """
@@ -31,10 +38,16 @@ def select_news_article(news_items):
         print(f"   Summary: {news['summary'][:100]}...")
     
     print("\n" + "="*80)
-    choice = input(f"\nChoose article (1-{len(news_items)}) or 0 to exit: ").strip()
     
-    try:
-        choice_num = int(choice)
+    while True:
+        choice = input(f"\nChoose article (1-{len(news_items)}) or 0 to exit: ").strip()
+        
+        try:
+            choice_num = int(choice)
+        except ValueError:
+            print("❌ Invalid input. Please enter a number.")
+            continue  # Ask again
+        
         if choice_num == 0:
             print("⏭ Skipped.")
             return None
@@ -44,45 +57,87 @@ def select_news_article(news_items):
             return selected
         else:
             print(f"❌ Invalid choice. Please enter 1-{len(news_items)}")
-            return select_news_article(news_items)  # Ask again
-    except ValueError:
-        print("❌ Invalid input. Please enter a number.")
-        return select_news_article(news_items)  # Ask again
 
 
-def run_automation(post_online=False):
+def run_automation(post_online=False, auto_select=False, resume=None):
     """
     Main automation function
+    auto_select=True picks the top-ranked article without prompting
+    Each stage is checkpointed in a run journal (see run_journal.py);
+    resume=<RunJournal> continues that run from its first missing stage.
+    Returns the run's status: "complete", "no_news", "skipped", or "running"
+    if a stage failed (the run can be resumed)
     """
+    journal = resume or RunJournal.start({"post_online": post_online, "auto_select": auto_select})
+    post_online = journal.options["post_online"]
+    auto_select = journal.options["auto_select"]
+    
     print("\n" + "="*60)
     print(f"🚀 LinkedIn AI Automation Started")
     print(f"⏰ Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"📒 Run: {journal.run_id}")
     print("="*60)
     
     # Step 1: Fetch latest news
-    print("\n📰 STEP 1: Fetching latest LLM news...")
-    news_items = get_top_news(count=5)  # Get top 5 news
+    if journal.done("fetch"):
+        fetched = journal.get("fetch")
+        print(f"\n📰 STEP 1: {len(fetched)} news items from the run journal")
+    else:
+        print("\n📰 STEP 1: Fetching latest LLM news...")
+        fetched = journal.checkpoint("fetch", fetch_latest_news())
     
-    if not news_items:
+    if not fetched:
         print("❌ No news found. Exiting.")
-        return
+        journal.finish("no_news")
+        return journal.status
+    
+    # Rank, then read the top 5 articles
+    if journal.done("rank"):
+        news_items = journal.get("rank")
+    else:
+        news_items = rank_and_sort_news(fetched)[:5]
+        enrich_articles(news_items)
+        journal.checkpoint("rank", news_items)
+    
+    # Link previews load in the background while you choose / the post generates
+    prefetch_previews(news_items)
     
     # Step 1b: Let user choose which article
-    print("\n🔍 STEP 1b: Choose an article to post")
-    news = select_news_article(news_items)
+    if journal.done("select"):
+        news = journal.get("select")
+        print("\n🔍 STEP 1b: Selected earlier in this run")
+    elif auto_select:
+        news = news_items[0]
+        print(f"\n🔍 STEP 1b: Auto-selected top article (score {news.get('rank_score', 0)}/100)")
+    else:
+        print("\n🔍 STEP 1b: Choose an article to post")
+        news = select_news_article(news_items)
     
     if not news:
-        return
+        journal.finish("skipped")
+        return journal.status
+    if not journal.done("select"):
+        journal.checkpoint("select", news)
     
     print(f"\n✅ Selected: {news['title'][:60]}...")
     
     # Step 2: Generate LinkedIn post
-    print("\n🤖 STEP 2: Generating LinkedIn post with AI...")
-    post_content = generate_linkedin_post(news)
-    
-    if not post_content:
-        print("❌ Failed to generate post. Exiting.")
-        return
+    if journal.done("draft"):
+        draft = journal.get("draft")
+        post_content = draft["post"]
+        if draft.get("preview"):
+            news["preview"] = draft["preview"]
+        print("\n🤖 STEP 2: Using the post generated earlier in this run")
+    else:
+        print("\n🤖 STEP 2: Generating LinkedIn post with AI...")
+        post_content = generate_linkedin_post(news)
+        
+        if not post_content:
+            print("❌ Failed to generate post. Exiting.")
+            journal.fail("draft", "no post generated")
+            print(f"↩️ Retry with: python main.py --resume {journal.run_id}")
+            return journal.status
+        journal.checkpoint("draft", {"post": post_content, "preview": news.get("preview")})
     
     print("\n📝 Generated Post:")
     print("-"*40)
@@ -92,17 +147,158 @@ def run_automation(post_online=False):
     # Step 3: Post or Save
     print("\n📤 STEP 3: Publishing post...")
     
-    if post_online:
+    if journal.done("delivery"):
+        print("✅ Already delivered in this run; not sending again.")
+    elif post_online:
         # Use the WebhookPoster to send to Make.com
         poster = WebhookPoster()
-        poster.post_to_webhook(post_content, news['title'])
+        delivered = poster.post_to_webhook(post_content, news['title'], link=news.get('link'),
+                                           preview=news.get('preview'),
+                                           idempotency_key=journal.run_id)
+        if not delivered:
+            journal.fail("delivery", poster.last_result)
+            print(f"↩️ Retry the delivery only with: python main.py --resume {journal.run_id}")
+            return journal.status
+        journal.checkpoint("delivery", {"target": "webhook", "result": poster.last_result})
     else:
         # Save locally for manual posting
         saver = LocalSaver()
-        saver.save_post(post_content, news['title'])
+        post_id = saver.save_post(post_content, news['title'])
+        journal.checkpoint("delivery", {"target": "local", "result": post_id})
     
+    journal.finish()
     print("\n✅ AUTOMATION COMPLETE!")
     print("="*60)
+    
+    prom_path = metrics.export_prometheus()
+    if prom_path:
+        print(f"📊 Stage timings: {metrics.jsonl_path} | {prom_path}")
+    return journal.status
+
+
+def resume_run(run_id=None):
+    """
+    Continue a journaled run_automation (the newest unfinished one by default).
+    True once the run is finished, False if there was none or a stage failed again
+    """
+    journal = RunJournal.load(run_id)
+    if journal is None:
+        print(f"❌ No {'run ' + run_id if run_id else 'unfinished run'} to resume.")
+        return False
+    if journal.finished:
+        print(f"✅ Run {journal.run_id} is already {journal.data['status']}.")
+        return True
+    
+    error = journal.data.get("error")
+    print(f"↩️ Resuming run {journal.run_id} at stage: {journal.next_stage()}"
+          + (f" (last error: {error['message']})" if error else ""))
+    if run_automation(resume=journal) == "running":
+        print(f"❌ Run {journal.run_id} is still unfinished.")
+        return False
+    return True
+
+
+class ApprovalSession:
+    """
+    Interactive review loop over one fetch: the ranked list, selected article
+    and generated candidates stay in memory, so regenerating, moving to the
+    next article or changing the prompt never refetches the feeds.
+    
+    States: select -> generate -> review -> (generate | select | done)
+    """
+    
+    def __init__(self, news_items):
+        self.news_items = news_items
+        self.index = None          # position of the selected article
+        self.instructions = None   # extra prompt instructions ("edit prompt")
+        self.candidates = []       # unused generated posts, best first
+        self.post = None
+        self.state = "select"
+    
+    @property
+    def news(self):
+        return self.news_items[self.index]
+    
+    def run(self):
+        while self.state != "done":
+            self.state = getattr(self, f"on_{self.state}")()
+    
+    def on_select(self):
+        news = select_news_article(self.news_items)
+        if not news:
+            return "done"
+        self.index = self.news_items.index(news)
+        self.candidates = []
+        return "generate"
+    
+    def on_generate(self):
+        # Unused candidates from the last call come first: no API call at all
+        if not self.candidates:
+            print(f"\n🤖 Generating post for: {self.news['title'][:50]}...")
+            self.candidates = generate_post_candidates(self.news, instructions=self.instructions)
+        if not self.candidates:
+            print("❌ Failed to generate post.")
+            return self.ask_after_failure()
+        
+        self.post = self.candidates.pop(0)["post"]
+        return "review"
+    
+    def ask_after_failure(self):
+        choice = input("\nTry again (r), choose another article (c) or quit (q)? ").strip().lower()
+        if choice == "r":
+            return "generate"
+        if choice == "c":
+            return "select"
+        return "done"
+    
+    def on_review(self):
+        # Show post
+        print("\n📝 Generated Post:")
+        print("-"*40)
+        print(self.post)
+        print("-"*40)
+        
+        # Ask for approval
+        print("\n🤔 What would you like to do?")
+        print("1. Save to file (for manual posting)")
+        print("2. Post to LinkedIn (via Make.com)")
+        print(f"3. Regenerate{f' ({len(self.candidates)} more ready)' if self.candidates else ''}")
+        print("4. Next article")
+        print("5. Edit prompt")
+        print("6. Choose another article")
+        print("7. Skip")
+        
+        choice = input("\nEnter choice (1-7): ").strip()
+        
+        if choice in ("1", "2"):
+            archive_call("add_draft", self.news, self.post)
+            if choice == "1":
+                LocalSaver().save_post(self.post, self.news['title'])
+            else:
+                WebhookPoster().post_to_webhook(self.post, self.news['title'], link=self.news.get('link'),
+                                                preview=self.news.get('preview'))
+            return "done"
+        if choice == "3":
+            return "generate"
+        if choice == "4":
+            if self.index + 1 >= len(self.news_items):
+                print("❌ That was the last article.")
+                return "review"
+            self.index += 1
+            self.candidates = []
+            print(f"➡️ Next article: {self.news['title'][:70]}")
+            return "generate"
+        if choice == "5":
+            print(f"Current instructions: {self.instructions or '(none)'}")
+            text = input("Extra instructions for the AI (empty to clear): ").strip()
+            self.instructions = text or None
+            self.candidates = []
+            return "generate"
+        if choice == "6":
+            return "select"
+        
+        print("⏭ Skipped.")
+        return "done"
 
 
 def run_with_approval():
@@ -113,50 +309,16 @@ def run_with_approval():
     print(f"🚀 LinkedIn AI Automation (With Approval)")
     print("="*60)
     
-    # Fetch and let user choose
+    # Fetch once; the session reuses this list for every action
     print("\n📰 Fetching latest LLM news...")
     news_items = get_top_news(count=5)
     if not news_items:
         print("❌ No news found.")
         return
+    prefetch_previews(news_items)
     
     print("\n🔍 Choose an article to post")
-    news = select_news_article(news_items)
-    
-    if not news:
-        return
-    
-    post_content = generate_linkedin_post(news)
-    
-    if not post_content:
-        print("❌ Failed to generate post.")
-        return
-    
-    # Show post
-    print("\n📝 Generated Post:")
-    print("-"*40)
-    print(post_content)
-    print("-"*40)
-    
-    # Ask for approval
-    print("\n🤔 What would you like to do?")
-    print("1. Save to file (for manual posting)")
-    print("2. Post to LinkedIn (via Make.com)")
-    print("3. Regenerate")
-    print("4. Skip")
-    
-    choice = input("\nEnter choice (1-4): ").strip()
-    
-    if choice == "1":
-        saver = LocalSaver()
-        saver.save_post(post_content, news['title'])
-    elif choice == "2":
-        poster = WebhookPoster()
-        poster.post_to_webhook(post_content, news['title'])
-    elif choice == "3":
-        run_with_approval()  # Recursively regenerate
-    else:
-        print("⏭ Skipped.")
+    ApprovalSession(news_items).run()
 
 
 def run_scheduled(hour=9, minute=0):
@@ -173,14 +335,70 @@ def run_scheduled(hour=9, minute=0):
     
     while True:
         schedule.run_pending()
+        metrics.export_prometheus()
         time.sleep(60)
 
 
+def run_profiled(post_online=False, top_n=25, stub_llm=False):
+    """
+    Run one non-interactive automation pass under cProfile + tracemalloc
+    """
+    from profiler import profile_call, StubLLMServer
+    
+    stub = None
+    if stub_llm:
+        import post_generator
+        from groq import Groq
+        stub = StubLLMServer().start()
+        post_generator.client = Groq(api_key="stub", base_url=stub.base_url)
+        post_generator.dispatcher.client = post_generator.client
+    
+    try:
+        _, prof_path, summary_path = profile_call(
+            run_automation, post_online=post_online, auto_select=True,
+            label="run_automation", top_n=top_n
+        )
+    finally:
+        if stub:
+            stub.stop()
+    
+    return prof_path, summary_path
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="LinkedIn AI news automation")
+    parser.add_argument("--profile", action="store_true",
+                        help="run once under cProfile/tracemalloc (auto-selects the top article)")
+    parser.add_argument("--post", action="store_true",
+                        help="with --profile: send to the webhook instead of saving locally")
+    parser.add_argument("--top-n", type=int, default=25,
+                        help="number of hotspots in the profile summary")
+    parser.add_argument("--stub-llm", action="store_true",
+                        help="with --profile: answer LLM calls from a local stand-in endpoint")
+    parser.add_argument("--resume", nargs="?", const="", metavar="RUN_ID",
+                        help="continue an interrupted run from its last completed stage "
+                             "(default: the newest unfinished run)")
+    add_stage_commands(parser)
+    return parser
+
+
 # ===================
 # RUN THE SCRIPT
 # ===================
 
 if __name__ == "__main__":
+    args = build_parser().parse_args()
+    
+    if args.command:
+        raise SystemExit(run_command(args))
+    
+    if args.profile:
+        run_profiled(post_online=args.post, top_n=args.top_n, stub_llm=args.stub_llm)
+        raise SystemExit(0)
+    
+    if args.resume is not None:
+        raise SystemExit(0 if resume_run(args.resume or None) else 1)
+    
     print("\n🤖 LINKEDIN AI AUTOMATION")
     print("="*40)
     print("1. Run once (save to file)")
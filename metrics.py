@@ -0,0 +1,223 @@
+# metrics.py
+
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from config import METRICS_ENABLED, METRICS_DIR
+
+
+def label_value(value):
+    """
+    Label value with backslashes, double quotes and newlines escaped (Prometheus text format)
+    """
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Span:
+    """
+    One timed pipeline stage (feed fetch, parse, filter, rank, LLM call, delivery)
+    """
+
+    def __init__(self, name, **labels):
+        self.name = name
+        self.labels = labels
+        self.counts = {}
+        self.attrs = {}
+        self.status = "ok"
+        self.error = None
+        self.started_at = None
+        self.duration = 0.0
+
+    def add(self, key, value=1):
+        """
+        Increment a counter on this span (items, bytes, tokens...)
+        """
+        self.counts[key] = self.counts.get(key, 0) + value
+
+    def set(self, key, value):
+        """
+        Attribute of this span (http_status, model...): exported as a label,
+        never summed like the add() counters
+        """
+        self.attrs[key] = value
+
+    def to_dict(self):
+        return {
+            "ts": self.started_at,
+            "stage": self.name,
+            "labels": self.labels,
+            "duration_ms": round(self.duration * 1000, 3),
+            "counts": self.counts,
+            "attrs": self.attrs,
+            "status": self.status,
+            "error": self.error,
+        }
+
+
+class MetricsRecorder:
+    """
+    Collect spans, append them as JSON lines and aggregate them for Prometheus
+    """
+
+    def __init__(self, directory=METRICS_DIR, enabled=METRICS_ENABLED):
+        self.directory = directory
+        self.enabled = enabled
+        self.jsonl_path = os.path.join(directory, "spans.jsonl")
+        self.prom_path = os.path.join(directory, "link.prom")
+        self._lock = threading.Lock()
+        # (stage, status) -> [count, total seconds]
+        self._durations = {}
+        # (stage, counter) -> total
+        self._counters = {}
+        # (stage, attribute, value) -> number of spans
+        self._attrs = {}
+
+    @contextmanager
+    def span(self, name, **labels):
+        """
+        Time a block of code:
+
+            with metrics.span("llm_call", model="...") as s:
+                s.add("tokens_prompt", 120)
+        """
+        s = Span(name, **labels)
+        s.started_at = datetime.now().isoformat(timespec="milliseconds")
+        start = time.perf_counter()
+        try:
+            yield s
+        except BaseException as e:
+            s.status = "error"
+            s.error = str(e)[:200]
+            raise
+        finally:
+            s.duration = time.perf_counter() - start
+            self.record(s)
+
+    def timed(self, name, **labels):
+        """
+        Decorator version of span()
+        """
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record(self, s):
+        if not self.enabled:
+            return
+
+        with self._lock:
+            key = (s.name, s.status)
+            entry = self._durations.setdefault(key, [0, 0.0])
+            entry[0] += 1
+            entry[1] += s.duration
+            for counter, value in s.counts.items():
+                if isinstance(value, (int, float)):
+                    ckey = (s.name, counter)
+                    self._counters[ckey] = self._counters.get(ckey, 0) + value
+            for attr, value in s.attrs.items():
+                akey = (s.name, attr, str(value))
+                self._attrs[akey] = self._attrs.get(akey, 0) + 1
+
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(s.to_dict(), ensure_ascii=False) + "\n")
+            except OSError as e:
+                print(f"⚠️ Could not write metrics: {e}")
+
+    def prometheus_text(self):
+        """
+        Render aggregated spans in the Prometheus text exposition format
+        """
+        lines = [
+            "# HELP link_stage_duration_seconds Time spent in each pipeline stage",
+            "# TYPE link_stage_duration_seconds summary",
+        ]
+        with self._lock:
+            durations = sorted(self._durations.items())
+            counters = sorted(self._counters.items())
+            attrs = sorted(self._attrs.items())
+
+        for (stage, status), (count, total) in durations:
+            labels = f'stage="{label_value(stage)}",status="{label_value(status)}"'
+            lines.append(f"link_stage_duration_seconds_sum{{{labels}}} {total:.6f}")
+            lines.append(f"link_stage_duration_seconds_count{{{labels}}} {count}")
+
+        lines.append("# HELP link_stage_total Counters recorded by pipeline stages (items, bytes, tokens)")
+        lines.append("# TYPE link_stage_total counter")
+        for (stage, counter), value in counters:
+            labels = f'stage="{label_value(stage)}",counter="{label_value(counter)}"'
+            lines.append(f"link_stage_total{{{labels}}} {value}")
+
+        lines.append("# HELP link_stage_spans_total Spans per attribute value (e.g. http_status)")
+        lines.append("# TYPE link_stage_spans_total counter")
+        for (stage, attr, value), count in attrs:
+            labels = (f'stage="{label_value(stage)}",attr="{label_value(attr)}",'
+                      f'value="{label_value(value)}"')
+            lines.append(f"link_stage_spans_total{{{labels}}} {count}")
+
+        return "\n".join(lines) + "\n"
+
+    def export_prometheus(self):
+        """
+        Write the Prometheus textfile (atomic replace so scrapers never see half a file)
+        """
+        if not self.enabled:
+            return None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = self.prom_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.prometheus_text())
+            os.replace(tmp_path, self.prom_path)
+            return self.prom_path
+        except OSError as e:
+            print(f"⚠️ Could not export metrics: {e}")
+            return None
+
+    def serve(self, port=9464, host="127.0.0.1"):
+        """
+        Expose /metrics over HTTP from a daemon thread
+        """
+        recorder = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = recorder.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = HTTPServer((host, port), Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        print(f"📊 Metrics available at http://{host}:{port}/metrics")
+        return server
+
+
+# Shared recorder used by every module
+metrics = MetricsRecorder()
+span = metrics.span
+timed = metrics.timed
+
+atexit.register(metrics.export_prometheus)
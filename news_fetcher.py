@@ -1,81 +1,92 @@
 # news_fetcher.py
 
-import feedparser
-from datetime import datetime, timedelta
-from config import RSS_FEEDS, MAX_NEWS_ITEMS, LLM_KEYWORDS, FILTER_LLM_ONLY
+import os
 
+from config import (
+    EXTRA_SOURCES, FETCH_WORKERS, STREAM_FEEDS, FEED_MAX_BYTES,
+    MAX_NEWS_ITEMS, SOURCE_QUOTA, SOURCE_QUOTAS, NEWS_BUDGET_TOTAL, PROFILE_RESERVE,
+    FILTER_LLM_ONLY, SEMANTIC_SCORING, SEMANTIC_WEIGHT,
+    SEMANTIC_MIN_SIMILARITY
+)
+from metrics import span
+from settings_store import get_settings
+from archive import archive_call
+from sources import build_sources, fetch_all
+from article_extractor import enrich_articles
+from url_canon import canonicalize_items, dedup_key
+from ranking_model import extract_features, dot
+from feed_config import get_feed_config
 
-def is_llm_related(title, summary):
+
+def feed_list(value):
+    return [url.strip() for url in (value or "").split(",") if url.strip()]
+
+
+# LINK_RSS_FEEDS (e.g. local fixtures) replaces the feeds of the feed config
+FEEDS_OVERRIDE = feed_list(os.getenv("LINK_RSS_FEEDS"))
+
+
+def is_llm_related(title, summary, hits=None, semantic=True):
     """
-    Check if news is related to LLMs using keyword filtering
+    Check if news is related to LLMs (or another topic profile) using keyword
+    filtering; all profiles' keywords are compiled into one matcher.
+    hits: the item's profile_hits when already computed (skips the scan)
+    semantic=False skips the similarity fallback for keyword misses
+    (combine_news scores those in one batch)
     """
     if not FILTER_LLM_ONLY:
         return True
     
-    text = (title + " " + summary).lower()
-    return any(keyword in text for keyword in LLM_KEYWORDS)
+    if hits is None:
+        hits = get_feed_config().current.profile_matcher.search((title + " " + summary).lower())
+    if hits:
+        return True
+    
+    # Catch relevant stories that use none of the keywords
+    if SEMANTIC_SCORING and semantic:
+        from semantic import get_scorer
+        return get_scorer().score(title, summary) >= SEMANTIC_MIN_SIMILARITY
+    return False
 
 
-def rank_news_article(news_item):
+def matches_keywords(title, summary):
+    """
+    Keyword-only is_llm_related(), the filter of streamed feeds
+    """
+    return is_llm_related(title, summary, semantic=False)
+
+
+def tag_profiles(news_item, compiled=None):
+    """
+    news_item['profile_hits'] = {profile: [keywords]}, from one pass over
+    title + summary for all topic profiles
+    """
+    compiled = compiled or get_feed_config().current
+    text = (news_item["title"] + " " + news_item["summary"]).lower()
+    news_item["profile_hits"] = compiled.profile_matcher.hits(text)
+    return news_item["profile_hits"]
+
+
+def select_profile(news_items, profile):
+    """
+    Items matching a topic profile, in their current (ranked) order.
+    Only fetched items are searched: streamed feeds stop reading after
+    max_matches entries of any profile (see build_news_sources)
+    """
+    return [n for n in news_items
+            if profile in (n["profile_hits"] if "profile_hits" in n else tag_profiles(n))]
+
+
+def rank_news_article(news_item, compiled=None):
     """
     Rank a news article based on relevance and quality signals
+    (keywords, freshness, length, source) weighted by the ranking model
+    (learned weights if any were fitted, see engagement.py)
     Returns a score between 0-100
     """
-    score = 0
-    title = news_item['title'].lower()
-    summary = news_item['summary'].lower()
-    text = title + " " + summary
-    
-    # High-value LLM keywords (stronger signals)
-    premium_keywords = {
-        "gpt": 10,
-        "claude": 10,
-        "gemini": 8,
-        "llama": 8,
-        "deepseek": 8,
-        "reasoning": 12,
-        "breakthrough": 15,
-        "release": 8,
-        "announcement": 7,
-        "new model": 12,
-        "fine-tune": 6,
-        "state-of-the-art": 12,
-        "sota": 10,
-        "performance": 5,
-        "training": 6,
-        "inference": 5,
-    }
-    
-    # Count premium keyword matches
-    for keyword, points in premium_keywords.items():
-        if keyword in text:
-            score += points
-    
-    # Bonus for title matches (title is more important than summary)
-    for keyword in premium_keywords.keys():
-        if keyword in title:
-            score += 3
-    
-    # Penalty for older articles (freshness bonus for recent ones)
-    try:
-        if news_item['published']:
-            pub_date = datetime.fromisoformat(news_item['published'].replace('Z', '+00:00'))
-            days_old = (datetime.now(pub_date.tzinfo) - pub_date).days
-            if days_old <= 1:
-                score += 20  # Very recent
-            elif days_old <= 3:
-                score += 10  # Recent
-            elif days_old <= 7:
-                score += 5   # This week
-    except:
-        pass  # If date parsing fails, no bonus/penalty
-    
-    # Length bonus (longer, more detailed articles tend to be better)
-    if len(news_item['summary']) > 300:
-        score += 5
-    
-    # Cap score at 100
-    return min(score, 100)
+    compiled = compiled or get_feed_config().current
+    score = dot(extract_features(news_item, compiled.premium_matcher), compiled.weights)
+    return max(0, min(round(score), 100))
 
 
 def rank_and_sort_news(news_items):
@@ -83,65 +94,218 @@ def rank_and_sort_news(news_items):
     Rank all news items and sort by score
     Returns list of news with scores attached
     """
-    ranked_news = []
-    for news in news_items:
-        score = rank_news_article(news)
-        news['rank_score'] = score
-        ranked_news.append(news)
+    with span("rank") as s:
+        similarities = None
+        if SEMANTIC_SCORING and news_items:
+            from semantic import get_scorer
+            similarities = get_scorer().score_batch(news_items)
+        
+        # One snapshot for the whole batch, even if the config is swapped meanwhile
+        compiled = get_feed_config().current
+        ranked_news = []
+        for i, news in enumerate(news_items):
+            score = rank_news_article(news, compiled)
+            if similarities is not None:
+                news['semantic_score'] = round(similarities[i] * 100)
+                score = round((1 - SEMANTIC_WEIGHT) * score + SEMANTIC_WEIGHT * news['semantic_score'])
+            news['rank_score'] = min(score, 100)
+            ranked_news.append(news)
+        
+        # Sort by score descending
+        ranked_news.sort(key=lambda x: x['rank_score'], reverse=True)
+        s.add("items", len(ranked_news))
     
-    # Sort by score descending
-    ranked_news.sort(key=lambda x: x['rank_score'], reverse=True)
+    archive_call("update_scores", ranked_news)
     return ranked_news
 
 
-def fetch_latest_news():
+def dedupe_news(groups):
+    """
+    Drop repeated articles (same canonical link, http or https) within and across sources;
+    the first occurrence in config order wins.
+    groups: list of (source_key, items)
+    """
+    seen = set()
+    unique_groups = []
+    for key, items in groups:
+        unique = []
+        for news in items:
+            identity = dedup_key(news.get("link")) or news["title"].strip().lower()
+            if identity not in seen:
+                seen.add(identity)
+                unique.append(news)
+        unique_groups.append((key, unique))
+    return unique_groups
+
+
+def budget_news(groups, quota=SOURCE_QUOTA, quotas=SOURCE_QUOTAS, total=NEWS_BUDGET_TOTAL):
     """
-    Fetch latest LLM news from RSS feeds
-    Returns list of news items filtered for LLM content
+    Combine per-source item lists fairly:
+    each source contributes at most its quota, items are interleaved
+    round-robin (1st of every source, then 2nd...) and the result stops at total.
+    groups: list of (source_key, items) in config order
     """
-    all_news = []
+    limited = [items[:quotas.get(key, quota)] for key, items in groups]
     
-    for feed_url in RSS_FEEDS:
-        try:
-            print(f"📡 Fetching: {feed_url[:50]}...")
-            feed = feedparser.parse(feed_url)
-            
-            for entry in feed.entries[:MAX_NEWS_ITEMS * 3]:  # Fetch more to account for filtering
-                title = entry.get("title", "")
-                summary = entry.get("summary", "")[:500]
-                
-                # Filter for LLM-related content
-                if is_llm_related(title, summary):
-                    news_item = {
-                        "title": title,
-                        "summary": summary,
-                        "link": entry.get("link", ""),
-                        "source": feed.feed.get("title", "Unknown"),
-                        "published": entry.get("published", "")
-                    }
-                    all_news.append(news_item)
-                    
-                    if len(all_news) >= MAX_NEWS_ITEMS * 2:
-                        break  # Stop fetching from this feed if we have enough
-                
-        except Exception as e:
-            print(f"❌ Error fetching {feed_url}: {e}")
+    budgeted = []
+    for news in round_robin(limited):
+        budgeted.append(news)
+        if len(budgeted) >= total:
+            break
+    return budgeted
+
+
+def round_robin(lists):
+    """
+    1st item of every list, then the 2nd...
+    """
+    depth = max((len(items) for items in lists), default=0)
+    for i in range(depth):
+        for items in lists:
+            if i < len(items):
+                yield items[i]
+
+
+def reserve_profiles(budgeted, groups, profiles, reserve=PROFILE_RESERVE):
+    """
+    Add back items of each profile that budget_news() cut, until every
+    profile has reserve items (or none are left), in the same round-robin
+    order. Returns the number of items added.
+    """
+    kept = {id(news) for news in budgeted}
+    cut = [news for news in round_robin([items for _, items in groups]) if id(news) not in kept]
+    added = 0
+    for profile in profiles:
+        have = sum(1 for news in budgeted if profile in news.get("profile_hits", ()))
+        for news in cut:
+            if have >= reserve:
+                break
+            if profile in news.get("profile_hits", ()) and id(news) not in kept:
+                budgeted.append(news)
+                kept.add(id(news))
+                have += 1
+                added += 1
+    return added
+
+
+def apply_feed_settings(changed):
+    """
+    LINK_RSS_FEEDS changed in the settings store: use the new list from the next fetch
+    """
+    global FEEDS_OVERRIDE
+    FEEDS_OVERRIDE = feed_list(changed["LINK_RSS_FEEDS"])
+
+
+get_settings().subscribe(apply_feed_settings, keys={"LINK_RSS_FEEDS"})
+
+
+def build_news_sources(rss_feeds=None, extra_sources=EXTRA_SOURCES):
+    """
+    Adapters for the configured sources
+    """
+    # Fetch more than needed to account for filtering; streamed feeds
+    # filter while parsing and stop once they can fill their quota. Keyword
+    # misses are kept for the semantic fallback, which combine_news() batches.
+    max_matches = max([SOURCE_QUOTA, *SOURCE_QUOTAS.values()])
+    return build_sources(
+        rss_feeds or FEEDS_OVERRIDE or list(get_feed_config().current.rss_feeds), extra_sources, max_items=MAX_NEWS_ITEMS * 3,
+        stream=STREAM_FEEDS, accept=matches_keywords,
+        max_matches=max_matches,
+        max_bytes=FEED_MAX_BYTES,
+        keep_misses=max_matches if SEMANTIC_SCORING else 0
+    )
+
+
+def combine_news(results, run_span):
+    """
+    Filter, dedupe and budget per-source results into one list
+    results: [(adapter, items)] in config order; items is None if the source failed
+    """
+    groups = []
+    misses = []     # keyword misses, for one batched semantic score below
+    compiled = get_feed_config().current
+    
+    for adapter, entries in results:
+        if entries is None:
+            run_span.add("feed_errors")
             continue
+        
+        with span("filter", feed=adapter.url) as s:
+            matches = []
+            for news_item in entries:
+                s.add("items_in")
+                
+                # Tag with topic profiles, keep LLM-related (or other profile) content
+                hits = tag_profiles(news_item, compiled)
+                if is_llm_related(news_item["title"], news_item["summary"], hits, semantic=False):
+                    matches.append(news_item)
+                    s.add("items_out")
+                elif SEMANTIC_SCORING:
+                    matches.append(news_item)  # kept or dropped by the semantic filter
+                    misses.append(news_item)
+            groups.append((adapter.url, matches))
+    
+    if misses:
+        # Catch relevant stories that use none of the keywords
+        from semantic import get_scorer
+        with span("semantic_filter") as s:
+            scores = get_scorer().score_batch(misses)
+            dropped = {id(news) for news, score in zip(misses, scores)
+                       if score < SEMANTIC_MIN_SIMILARITY}
+            groups = [(key, [news for news in items if id(news) not in dropped])
+                      for key, items in groups]
+            s.add("items_in", len(misses))
+            s.add("items_out", len(misses) - len(dropped))
+    
+    with span("dedup") as s:
+        # Feedburner redirects, utm_* tags etc. -> one link per article
+        canonicalize_items([news for _, items in groups for news in items])
+        s.add("items_in", sum(len(items) for _, items in groups))
+        groups = dedupe_news(groups)
+        s.add("items_out", sum(len(items) for _, items in groups))
+    
+    with span("budget") as s:
+        all_news = budget_news(groups)
+        s.add("reserved", reserve_profiles(all_news, groups, compiled.profile_matcher.names))
+        s.add("items_in", sum(len(items) for _, items in groups))
+        s.add("items_out", len(all_news))
+        s.add("sources", sum(1 for _, items in groups if items))
+    
+    run_span.add("items", len(all_news))
+    return all_news
+
+
+def fetch_latest_news():
+    """
+    Fetch latest LLM news from all configured sources (RSS + extra adapters)
+    Returns list of news items filtered for LLM content, budgeted across sources
+    """
+    with span("fetch") as run_span:
+        adapters = build_news_sources()
+        all_news = combine_news(fetch_all(adapters, max_workers=FETCH_WORKERS), run_span)
     
     print(f"✅ Found {len(all_news)} news items")
+    archive_call("add_articles", all_news)
     return all_news
 
 
-def get_top_news(count=1):
+def get_top_news(count=1, profile=None):
     """
-    Get the best ranked news items
+    Get the best ranked news items (of one topic profile if given)
     """
     news = fetch_latest_news()
     
     # Rank and sort by quality score
     ranked_news = rank_and_sort_news(news)
+    if profile:
+        ranked_news = select_profile(ranked_news, profile)
+        if not ranked_news:
+            print(f"⚠️ No fetched article matches topic profile '{profile}'")
     
-    return ranked_news[:count]
+    # Full text for the best few only, within a fixed time budget
+    top_news = ranked_news[:count]
+    enrich_articles(top_news)
+    return top_news
 
 
 # Test
@@ -1,19 +1,64 @@
 # post_generator.py
 
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 from groq import Groq
-from config import GROQ_API_KEY, YOUR_NAME, YOUR_STYLE
+from config import (
+    GROQ_API_KEY, GROQ_BASE_URL, YOUR_NAME, YOUR_STYLE,
+    LLM_MODELS, LLM_TIMEOUT, LLM_HEDGE_AFTER, POST_CANDIDATES
+)
+from metrics import span
+from archive import archive_call
+from llm_dispatcher import LLMDispatcher, RequestCancelled
+from post_quality import score_post
+from post_validator import validate_post
+from link_preview import prefetch_previews, attach_preview
+from settings_store import get_settings
+
 
+PROMPT_BODY_CHARS = 1500
 
-# Initialize Groq client
-client = Groq(api_key=GROQ_API_KEY)
+# Initialize Groq client; all calls go through the shared rate-limit-aware
+# dispatcher, which does its own 429 backoff (so the SDK's retries are off)
+client = Groq(api_key=GROQ_API_KEY, base_url=GROQ_BASE_URL, max_retries=0)
+dispatcher = LLMDispatcher(client)
 
 
-def generate_linkedin_post(news_item):
+def apply_api_settings(changed):
     """
-    Use AI to generate a LinkedIn post from news
+    New Groq client when the key or endpoint is changed in the settings store
+    (values are mirrored into the environment before subscribers run)
     """
-    
-    prompt = f"""
+    global client
+    client = Groq(api_key=os.getenv("GROQ_API_KEY", ""),
+                  base_url=os.getenv("GROQ_BASE_URL") or None, max_retries=0)
+    dispatcher.client = client
+
+
+get_settings().subscribe(apply_api_settings, keys={"GROQ_API_KEY", "GROQ_BASE_URL"})
+
+
+def record_usage(s, response):
+    """
+    Copy token usage from a chat completion onto a metrics span
+    """
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    s.add("tokens_prompt", getattr(usage, "prompt_tokens", 0) or 0)
+    s.add("tokens_completion", getattr(usage, "completion_tokens", 0) or 0)
+    s.add("tokens_total", getattr(usage, "total_tokens", 0) or 0)
+
+
+def build_prompt(news_item, instructions=None):
+    """
+    Generation prompt for one news item, with optional extra instructions
+    """
+    extra = f"\nADDITIONAL INSTRUCTIONS:\n{instructions}\n" if instructions else ""
+    # Full article text (article_extractor) when available, capped to keep the prompt small
+    body = f"ARTICLE TEXT:\n{news_item['body'][:PROMPT_BODY_CHARS]}\n" if news_item.get('body') else ""
+    return f"""
 You are a LinkedIn content creator specializing in AI and technology news.
 
 Create a SHORT, professional LinkedIn post based on this news. Make it visually appealing with emojis.
@@ -21,7 +66,7 @@ Create a SHORT, professional LinkedIn post based on this news. Make it visually
 TITLE: {news_item['title']}
 SUMMARY: {news_item['summary']}
 SOURCE: {news_item['source']}
-
+{body}
 REQUIREMENTS:
 - Start with 2-3 relevant emojis that represent the topic
 - Add emoji + Bold Hook (max 10 words)
@@ -31,7 +76,7 @@ REQUIREMENTS:
 - Clean, professional, easy to scan
 - End with ONE engaging question
 - Use relevant emojis throughout to break up text (2-3 total)
-
+{extra}
 Example format:
 🚀💡 **Your Bold Hook Here**
 Short summary. 🤖 Second sentence with emoji. ...more
@@ -41,34 +86,117 @@ What are your thoughts?
 Write the post now:
 """
 
-    try:
-        response = client.chat.completions.create(
-            model="llama-3.1-8b-instant",  # Free and fast
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert LinkedIn content creator focusing on AI/ML topics."
-                },
-                {
-                    "role": "user", 
-                    "content": prompt
-                }
-            ],
+
+def build_messages(prompt):
+    """
+    Chat messages for a generation prompt
+    """
+    return [
+        {
+            "role": "system",
+            "content": "You are an expert LinkedIn content creator focusing on AI/ML topics."
+        },
+        {
+            "role": "user", 
+            "content": prompt
+        }
+    ]
+
+
+def generate_completion(prompt, cancelled=None):
+    """
+    One completion through the model chain, returns (text, model)
+    """
+    with span("llm_call", model=LLM_MODELS[0]) as s:
+        response, model = dispatcher.create_with_fallback(
+            LLM_MODELS,
+            hedge_after=LLM_HEDGE_AFTER,
+            cancelled=cancelled,
+            messages=build_messages(prompt),
             temperature=0.7,
-            max_tokens=250
+            max_tokens=250,
+            timeout=LLM_TIMEOUT
         )
-        
-        post_content = response.choices[0].message.content
-        
-        # Format: Put link at END to trigger preview generation
-        # LinkedIn works better when link is after the text
-        full_post = f"{post_content}\n\n{news_item['link']}"
-        
-        return full_post
-        
-    except Exception as e:
-        print(f"❌ Error generating post: {e}")
+        s.labels["model"] = model
+        record_usage(s, response)
+    return response.choices[0].message.content, model
+
+
+def check_candidate(post_content, model, link):
+    """
+    Score and normalize one generated post; None if it cannot be published
+    """
+    quality, details = score_post(post_content)
+    # Format: Put link at END to trigger preview generation
+    # LinkedIn works better when link is after the text
+    checked = validate_post(post_content, link)
+    if checked["errors"]:
+        print(f"⚠️ Discarding candidate: {', '.join(checked['errors'])}")
+        return None
+    return {
+        "post": checked["post"],
+        "model": model,
+        "quality": quality,
+        "issues": details["issues"],
+        "fixes": checked["fixes"],
+    }
+
+
+def generate_post_candidates(news_item, count=POST_CANDIDATES, instructions=None, cancelled=None):
+    """
+    Generate several posts in parallel (Groq only supports n=1, so one call each)
+    and score them locally. Returns candidates best first:
+    [{"post", "model", "quality", "issues", "fixes"}]
+    Posts are already normalized by post_validator (bold, hashtags, link, length).
+    cancelled: callable; candidates still queued for the LLM are dropped once it returns True
+    """
+    prompt = build_prompt(news_item, instructions)
+    candidates = []
+    prefetch_previews([news_item])  # fetched while the LLM calls run
+    
+    with span("generate_candidates", requested=count) as s:
+        with ThreadPoolExecutor(max_workers=count) as pool:
+            futures = [pool.submit(generate_completion, prompt, cancelled) for _ in range(count)]
+            for future in futures:
+                try:
+                    post_content, model = future.result()
+                except RequestCancelled:
+                    s.add("cancelled")
+                    continue
+                except Exception as e:
+                    print(f"❌ Error generating post: {e}")
+                    s.add("failed")
+                    continue
+                
+                candidate = check_candidate(post_content, model, news_item['link'])
+                if candidate is None:
+                    s.add("invalid")
+                    continue
+                candidates.append(candidate)
+        s.add("candidates", len(candidates))
+    
+    attach_preview(news_item)
+    candidates.sort(key=lambda c: c["quality"], reverse=True)
+    return candidates
+
+
+def generate_linkedin_post(news_item, cancelled=None):
+    """
+    Use AI to generate a LinkedIn post from news
+    (best of POST_CANDIDATES by local quality score)
+    """
+    candidates = generate_post_candidates(news_item, cancelled=cancelled)
+    if cancelled is not None and cancelled():
+        return None
+    if not candidates:
         return None
+    
+    best = candidates[0]
+    if len(candidates) > 1:
+        print(f"🏅 Picked best of {len(candidates)} candidates (quality {best['quality']}/100)")
+    
+    archive_call("add_draft", news_item, best["post"], model=best["model"])
+    return best["post"]
 
 
 def generate_multiple_posts(news_items):
@@ -76,17 +204,20 @@ def generate_multiple_posts(news_items):
     Generate posts for multiple news items
     """
     posts = []
+    prefetch_previews(news_items)
     
-    for item in news_items:
-        print(f"\n🤖 Generating post for: {item['title'][:50]}...")
-        post = generate_linkedin_post(item)
-        
-        if post:
-            posts.append({
-                "news": item,
-                "post": post
-            })
-            print("✅ Post generated!")
+    with span("generate_batch") as s:
+        for item in news_items:
+            print(f"\n🤖 Generating post for: {item['title'][:50]}...")
+            post = generate_linkedin_post(item)
+            
+            if post:
+                posts.append({
+                    "news": item,
+                    "post": post
+                })
+                s.add("posts")
+                print("✅ Post generated!")
     
     return posts
 
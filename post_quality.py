@@ -0,0 +1,76 @@
+# post_quality.py - Fast local checks of a generated post against the prompt's rules
+#
+# Used to pick the best of several candidates without another API call or a
+# human "Regenerate". Each rule contributes points; score_post returns 0-100.
+
+import re
+
+
+EMOJI_RE = re.compile(
+    "[\U0001F300-\U0001FAFF\U0001F1E6-\U0001F1FF\u2600-\u27BF\u2B00-\u2BFF\u2300-\u23FF]"
+)
+# A tag starts with a letter: "#1" or "#2024" are numbers, not hashtags
+HASHTAG_RE = re.compile(r"(?<![\w&])#[^\W\d_]\w*")
+URL_RE = re.compile(r"https?://\S+")
+WORD_RE = re.compile(r"[A-Za-z0-9][\w'’\-]*")
+MARKUP_RE = re.compile(r"\*\*|__")
+
+MIN_WORDS, MAX_WORDS = 50, 80
+MIN_EMOJIS, MAX_EMOJIS = 3, 6
+MAX_HOOK_WORDS = 10
+
+# rule -> points
+WEIGHTS = {
+    "length": 30,
+    "hook": 20,
+    "question": 20,
+    "no_hashtags": 15,
+    "emojis": 10,
+    "more": 5,
+}
+
+
+def _lines(text):
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def score_post(text):
+    """
+    Score a post (link excluded) against the generation rules.
+    Returns (score 0-100, details) where details maps rule -> measured value
+    and "issues" lists the rules that were missed.
+    """
+    body = URL_RE.sub("", text).strip()
+    lines = _lines(body)
+    hook = MARKUP_RE.sub("", lines[0]) if lines else ""
+
+    words = len(WORD_RE.findall(MARKUP_RE.sub("", body)))
+    hook_words = len(WORD_RE.findall(hook))
+    emojis = len(EMOJI_RE.findall(body))
+    hashtags = len(HASHTAG_RE.findall(body))
+
+    points = {}
+    # Partial credit for being close to the word range
+    if MIN_WORDS <= words <= MAX_WORDS:
+        points["length"] = 1.0
+    else:
+        distance = MIN_WORDS - words if words < MIN_WORDS else words - MAX_WORDS
+        points["length"] = max(0.0, 1 - distance / 30)
+    points["hook"] = 1.0 if 0 < hook_words <= MAX_HOOK_WORDS else 0.0
+    # The closing question may be followed by an emoji
+    closing = EMOJI_RE.sub("", lines[-1]).rstrip(" \ufe0f\u200d") if lines else ""
+    points["question"] = 1.0 if closing.endswith("?") else 0.0
+    points["no_hashtags"] = 1.0 if hashtags == 0 else 0.0
+    points["emojis"] = 1.0 if MIN_EMOJIS <= emojis <= MAX_EMOJIS else 0.5 if emojis else 0.0
+    points["more"] = 1.0 if "...more" in body or "…more" in body else 0.0
+
+    score = round(sum(WEIGHTS[rule] * value for rule, value in points.items()))
+    details = {
+        "words": words,
+        "hook_words": hook_words,
+        "emojis": emojis,
+        "hashtags": hashtags,
+        "issues": [rule for rule, value in points.items() if value < 1.0],
+    }
+    return score, details
+
@@ -0,0 +1,454 @@
+# post_store.py - Append-only, crash-safe storage for saved posts
+#
+# Layout of POST_STORE_DIR:
+#   manifest.json          segment list with id ranges (replaced atomically)
+#   posts-000001.jsonl     one JSON record per line, sealed once it is full
+#   posts-000002.jsonl     active segment
+#   .lock                  cross-process lock (GUI + scheduler may run at once)
+#
+# A single writer thread drains a queue, appends whole batches under the
+# lock and fsyncs once per batch. Post ids start with a UTC timestamp so
+# they sort by time and a lookup only has to open one segment.
+#
+# A crash can leave the active segment ahead of the manifest (records
+# fsynced, manifest not yet replaced) or end it in a torn line. Loading the
+# manifest recounts the active segment when its size is not the one last
+# recorded, and the next batch first cuts the torn line.
+
+import atexit
+import json
+import os
+import queue
+import threading
+import uuid
+from datetime import datetime, timezone
+
+from config import POST_STORE_DIR, POST_STORE_SEGMENT_SIZE
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+MANIFEST = "manifest.json"
+LOCK_FILE = ".lock"
+
+
+def new_post_id():
+    """
+    Unique, time-sortable post id: 20260118T091502123456-1a2b3c4d
+    """
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    return f"{stamp}-{uuid.uuid4().hex[:8]}"
+
+
+def atomic_write(path, data):
+    """
+    Write bytes to path via a fsynced temp file + os.replace
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class _FileLock:
+    """
+    Exclusive lock on a file, shared between processes
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.handle = None
+
+    def __enter__(self):
+        self.handle = open(self.path, "a+b")
+        if os.name == "nt":
+            self.handle.seek(0)
+            msvcrt.locking(self.handle.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            fcntl.flock(self.handle.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if os.name == "nt":
+                self.handle.seek(0)
+                msvcrt.locking(self.handle.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self.handle.fileno(), fcntl.LOCK_UN)
+        finally:
+            self.handle.close()
+            self.handle = None
+
+
+class PostStore:
+    """
+    Saved posts with per-post ids, batched durable writes and segment rotation
+    """
+
+    def __init__(self, directory=POST_STORE_DIR, segment_size=POST_STORE_SEGMENT_SIZE,
+                 batch_size=64):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.batch_size = batch_size
+        os.makedirs(directory, exist_ok=True)
+        self._lock = _FileLock(os.path.join(directory, LOCK_FILE))
+        self._queue = queue.Queue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._closed = False
+
+    # ---------- manifest ----------
+
+    def _manifest_path(self):
+        return os.path.join(self.directory, MANIFEST)
+
+    def _load_manifest(self):
+        try:
+            with open(self._manifest_path(), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return {"version": 1, "next_segment": 1, "segments": []}
+
+        segments = manifest["segments"]
+        if segments and not segments[-1]["sealed"]:
+            segment = segments[-1]
+            try:
+                size = os.path.getsize(os.path.join(self.directory, segment["file"]))
+            except OSError:
+                size = 0
+            if size != segment.get("bytes", 0):
+                self._recount(segment, size)
+        return manifest
+
+    def _save_manifest(self, manifest):
+        data = json.dumps(manifest, indent=1).encode("utf-8")
+        atomic_write(self._manifest_path(), data)
+
+    def _allocate_segment(self, manifest):
+        number = manifest["next_segment"]
+        manifest["next_segment"] = number + 1
+        return {"file": f"posts-{number:06d}.jsonl", "count": 0,
+                "first_id": None, "last_id": None, "sealed": False}
+
+    def _new_segment(self, manifest):
+        segment = self._allocate_segment(manifest)
+        manifest["segments"].append(segment)
+        return segment
+
+    def _recount(self, segment, size):
+        """
+        count and id range of a segment from its contents (the manifest may
+        not have recorded the last batch before a crash)
+        """
+        records = list(self._read_segment(segment["file"]))
+        segment.update(count=len(records), first_id=None, last_id=None, bytes=size)
+        if records:
+            self._extend_range(segment, records)
+
+    def _repair_tail(self, path):
+        """
+        A crash mid-write can leave the last line without its newline: a
+        complete record gets the newline, a torn one is cut, so the next
+        batch starts on a line of its own. Returns True if the file changed.
+        """
+        try:
+            f = open(path, "rb+")
+        except FileNotFoundError:
+            return False
+        with f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return False
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return False
+
+            start, tail = size, b""
+            while start > 0:
+                step = min(4096, start)
+                start -= step
+                f.seek(start)
+                tail = f.read(step) + tail
+                newline = tail.rfind(b"\n")
+                if newline >= 0:
+                    start += newline + 1
+                    tail = tail[newline + 1:]
+                    break
+
+            try:
+                json.loads(tail.decode("utf-8"))
+                f.seek(size)
+                f.write(b"\n")
+            except ValueError:
+                f.truncate(start)
+            f.flush()
+            os.fsync(f.fileno())
+        return True
+
+    @staticmethod
+    def _extend_range(segment, records):
+        ids = [r["id"] for r in records]
+        if segment["first_id"] is not None:
+            ids += [segment["first_id"], segment["last_id"]]
+        segment["first_id"] = min(ids)
+        segment["last_id"] = max(ids)
+
+    # ---------- writing ----------
+
+    def save(self, content, title="", meta=None, wait=True):
+        """
+        Queue a post for the writer thread; returns its id.
+        With wait=True, returns only after the batch containing it is fsynced.
+        """
+        if self._closed:
+            raise RuntimeError("PostStore is closed")
+
+        record = {
+            "id": new_post_id(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "title": title,
+            "content": content,
+        }
+        if meta:
+            record["meta"] = meta
+
+        done = threading.Event()
+        result = {}
+        self._ensure_writer()
+        self._queue.put((record, done, result))
+
+        if wait:
+            done.wait()
+            if "error" in result:
+                raise result["error"]
+        return record["id"]
+
+    def delete(self, post_id, wait=True):
+        """
+        Append a tombstone; the record disappears on the next compaction
+        """
+        done = threading.Event()
+        result = {}
+        self._ensure_writer()
+        self._queue.put(({"id": post_id, "deleted": True}, done, result))
+        if wait:
+            done.wait()
+            if "error" in result:
+                raise result["error"]
+
+    def _ensure_writer(self):
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._write_loop, daemon=True,
+                                                name="PostStoreWriter")
+                self._writer.start()
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)  # stop after this batch
+                    break
+                batch.append(item)
+
+            try:
+                self._append_batch([record for record, _, _ in batch])
+            except Exception as e:
+                print(f"❌ Error saving posts: {e}")
+                for _, _, result in batch:
+                    result["error"] = e
+            finally:
+                for _, done, _ in batch:
+                    done.set()
+
+    def _append_batch(self, records):
+        with self._lock:
+            manifest = self._load_manifest()
+            segments = manifest["segments"]
+            segment = segments[-1] if segments and not segments[-1]["sealed"] else None
+            if segment is not None:
+                path = os.path.join(self.directory, segment["file"])
+                if self._repair_tail(path):
+                    self._recount(segment, os.path.getsize(path))
+                if segment["count"] >= self.segment_size:
+                    segment["sealed"] = True  # filled by a batch the manifest missed
+                    segment = None
+
+            pending = list(records)
+            while pending:
+                if segment is None:
+                    segment = self._new_segment(manifest)
+                    path = os.path.join(self.directory, segment["file"])
+                    # Record the file before writing to it, and drop what a
+                    # crashed compaction may have left under the same name
+                    if os.path.exists(path):
+                        os.remove(path)
+                    self._save_manifest(manifest)
+
+                room = self.segment_size - segment["count"]
+                chunk, pending = pending[:room], pending[room:]
+                data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in chunk)
+
+                path = os.path.join(self.directory, segment["file"])
+                with open(path, "ab") as f:
+                    f.write(data.encode("utf-8"))
+                    f.flush()
+                    os.fsync(f.fileno())
+                    segment["bytes"] = f.tell()
+
+                segment["count"] += len(chunk)
+                self._extend_range(segment, chunk)
+
+                if segment["count"] >= self.segment_size:
+                    segment["sealed"] = True  # rotate
+                    segment = None
+
+            self._save_manifest(manifest)
+
+    def close(self):
+        """
+        Flush queued posts and stop the writer
+        """
+        self._closed = True
+        with self._writer_lock:
+            writer = self._writer
+        if writer is not None and writer.is_alive():
+            self._queue.put(None)
+            writer.join()
+
+    # ---------- reading ----------
+
+    def _read_segment(self, filename):
+        path = os.path.join(self.directory, filename)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn line from a crash mid-write
+        except FileNotFoundError:
+            return
+
+    def get(self, post_id):
+        """
+        Look up one post; only segments whose id range covers it are read
+        """
+        found = None
+        for segment in self._load_manifest()["segments"]:
+            if segment["first_id"] is None:
+                continue
+            # Tombstones carry the id they delete, so they fall in the same ranges
+            if segment["first_id"] <= post_id <= segment["last_id"]:
+                for record in self._read_segment(segment["file"]):
+                    if record["id"] == post_id:
+                        found = None if record.get("deleted") else record
+        return found
+
+    def recent(self, limit=20):
+        """
+        Newest posts first, reading segments backwards until limit is reached
+        """
+        results = []
+        deleted = set()
+        for segment in reversed(self._load_manifest()["segments"]):
+            records = list(self._read_segment(segment["file"]))
+            for record in reversed(records):
+                if record.get("deleted"):
+                    deleted.add(record["id"])
+                elif record["id"] not in deleted:
+                    results.append(record)
+                    if len(results) >= limit:
+                        return results
+        return results
+
+    def compact(self, target_size=None):
+        """
+        Merge sealed segments, dropping deleted posts, so the store stays
+        a handful of large files. Safe to run while other processes write.
+        """
+        target_size = target_size or self.segment_size * 10
+        with self._lock:
+            manifest = self._load_manifest()
+            sealed = [s for s in manifest["segments"] if s["sealed"]]
+            active = [s for s in manifest["segments"] if not s["sealed"]]
+            if len(sealed) < 2:
+                return 0
+
+            tombstones = set()
+            for segment in manifest["segments"]:
+                for record in self._read_segment(segment["file"]):
+                    if record.get("deleted"):
+                        tombstones.add(record["id"])
+
+            new_segments = []
+            buffer = []
+            compacted_ids = set()
+
+            def flush():
+                segment = self._allocate_segment(manifest)
+                data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in buffer)
+                atomic_write(os.path.join(self.directory, segment["file"]), data.encode("utf-8"))
+                segment.update(count=len(buffer), sealed=True)
+                self._extend_range(segment, buffer)
+                new_segments.append(segment)
+                buffer.clear()
+
+            for segment in sealed:
+                for record in self._read_segment(segment["file"]):
+                    if record.get("deleted"):
+                        continue
+                    compacted_ids.add(record["id"])
+                    if record["id"] in tombstones:
+                        continue
+                    buffer.append(record)
+                    if len(buffer) >= target_size:
+                        flush()
+
+            # Keep tombstones for posts that still live in the active segment
+            buffer.extend({"id": post_id, "deleted": True}
+                          for post_id in sorted(tombstones - compacted_ids))
+            if buffer:
+                flush()
+
+            manifest["segments"] = new_segments + active
+            self._save_manifest(manifest)
+
+            for segment in sealed:
+                try:
+                    os.remove(os.path.join(self.directory, segment["file"]))
+                except OSError:
+                    pass
+
+            print(f"🗜 Compacted {len(sealed)} segments into {len(new_segments)}")
+            return len(sealed)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_post_store():
+    """
+    Shared store instance used by LocalSaver and the GUI
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PostStore()
+            atexit.register(_store.close)
+        return _store
@@ -0,0 +1,112 @@
+# post_validator.py - Normalize and validate a post before it is published
+#
+# LinkedIn shows markdown literally, cuts posts at 3000 characters and only
+# builds a link preview when the article URL is in the text. Every rule here
+# is a precompiled regex or translation table, so a bad post is fixed (or
+# rejected) locally instead of after an LLM + webhook round trip.
+
+import re
+
+from config import LINKEDIN_MAX_CHARS
+from post_quality import HASHTAG_RE, URL_RE
+
+
+BOLD_RE = re.compile(r"\*\*(.+?)\*\*|__(.+?)__", re.DOTALL)
+HASHTAG_LINE_RE = re.compile(r"^[ \t]*(?:#[^\W\d_]\w*[ \t]*)+$", re.MULTILINE)
+TRAILING_SPACE_RE = re.compile(r"[ \t]+$", re.MULTILINE)
+BLANK_LINES_RE = re.compile(r"\n{3,}")
+SENTENCE_END_RE = re.compile(r"[.!?…](?=\s)")
+
+# Mathematical sans-serif bold, the "bold" LinkedIn users paste in
+BOLD_TABLE = str.maketrans(
+    {**{chr(ord("A") + i): chr(0x1D5D4 + i) for i in range(26)},
+     **{chr(ord("a") + i): chr(0x1D5EE + i) for i in range(26)},
+     **{chr(ord("0") + i): chr(0x1D7EC + i) for i in range(10)}}
+)
+
+
+def to_unicode_bold(text):
+    return text.translate(BOLD_TABLE)
+
+
+def _outside_urls(text, func):
+    """
+    Apply func to the text between URLs only (URLs may contain '#' or '**')
+    """
+    parts = []
+    last = 0
+    for match in URL_RE.finditer(text):
+        parts.append(func(text[last:match.start()]))
+        parts.append(match.group(0))
+        last = match.end()
+    parts.append(func(text[last:]))
+    return "".join(parts)
+
+
+def _bold(segment):
+    return BOLD_RE.sub(lambda m: to_unicode_bold(m.group(1) or m.group(2)), segment)
+
+
+def _strip_hashtags(segment):
+    segment = HASHTAG_LINE_RE.sub("", segment)
+    return HASHTAG_RE.sub(lambda m: m.group(0)[1:], segment)
+
+
+def _truncate(body, limit):
+    """
+    Cut body to at most limit characters, at a sentence end when possible
+    """
+    if len(body) <= limit:
+        return body
+    cut = body[:max(0, limit - 1)]
+    ends = [m.end() for m in SENTENCE_END_RE.finditer(cut + " ")]
+    if ends and ends[-1] > limit * 0.6:
+        return cut[:ends[-1]]
+    space = cut.rfind(" ")
+    if space > limit * 0.6:
+        cut = cut[:space]
+    return cut.rstrip() + "…"
+
+
+def validate_post(text, link=None, max_chars=LINKEDIN_MAX_CHARS):
+    """
+    Fix what can be fixed and report the rest.
+    Returns {"post": fixed text, "fixes": [...], "errors": [...]};
+    the post is publishable when errors is empty.
+    """
+    fixes, errors = [], []
+    post = (text or "").strip()
+    if not post:
+        return {"post": "", "fixes": fixes, "errors": ["empty post"]}
+
+    fixed = _outside_urls(post, _bold)
+    if fixed != post:
+        fixes.append("markdown bold -> unicode bold")
+        post = fixed
+
+    fixed = _outside_urls(post, _strip_hashtags)
+    if fixed != post:
+        fixes.append("removed hashtags")
+        post = fixed
+
+    post = BLANK_LINES_RE.sub("\n\n", TRAILING_SPACE_RE.sub("", post)).strip()
+
+    # Keep the article link last so LinkedIn builds the preview from it
+    body, tail = post, ""
+    if link:
+        if post.endswith(link):
+            body, tail = post[:-len(link)].rstrip(), f"\n\n{link}"
+        elif link not in post:
+            fixes.append("added article link")
+            tail = f"\n\n{link}"
+
+    if len(body) + len(tail) > max_chars:
+        body = _truncate(body, max_chars - len(tail))
+        fixes.append(f"shortened to {max_chars} characters")
+    post = body + tail
+
+    if not body.strip():
+        errors.append("empty post")
+    if len(post) > max_chars:
+        errors.append(f"longer than {max_chars} characters")
+    return {"post": post, "fixes": fixes, "errors": errors}
@@ -0,0 +1,135 @@
+# profiler.py
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from config import PROFILE_DIR
+
+
+def profile_call(func, *args, label="run", top_n=25, **kwargs):
+    """
+    Run func under cProfile with tracemalloc enabled.
+    Writes a .prof artifact (open with snakeviz / pstats) and a top-N hotspot summary.
+    Returns (result, prof_path, summary_path)
+    """
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    base = os.path.join(PROFILE_DIR, f"{label}_{stamp}")
+    prof_path = base + ".prof"
+    summary_path = base + "_summary.txt"
+
+    profiler = cProfile.Profile()
+    tracemalloc.start(25)
+    start = time.perf_counter()
+    result = None
+    error = None
+
+    profiler.enable()
+    try:
+        result = func(*args, **kwargs)
+    except Exception as e:
+        error = e
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - start
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    profiler.dump_stats(prof_path)
+
+    with open(summary_path, "w", encoding="utf-8") as f:
+        f.write(f"Profile: {label}\n")
+        f.write(f"Started: {stamp}\n")
+        f.write(f"Wall time: {elapsed:.3f}s\n")
+        f.write(f"Peak traced memory: {peak / 1024:.1f} KB\n")
+        if error:
+            f.write(f"Error: {error!r}\n")
+
+        for sort_key in ("cumulative", "tottime"):
+            buffer = io.StringIO()
+            stats = pstats.Stats(profiler, stream=buffer)
+            stats.strip_dirs().sort_stats(sort_key).print_stats(top_n)
+            f.write("\n" + "=" * 60 + "\n")
+            f.write(f"Top {top_n} functions sorted by {sort_key}\n")
+            f.write("=" * 60 + "\n")
+            f.write(buffer.getvalue())
+
+        f.write("\n" + "=" * 60 + "\n")
+        f.write(f"Top {top_n} allocation sites (tracemalloc)\n")
+        f.write("=" * 60 + "\n")
+        for stat in snapshot.statistics("lineno")[:top_n]:
+            f.write(f"{stat}\n")
+
+    print(f"🔬 Profile written to {prof_path}")
+    print(f"🔬 Hotspot summary: {summary_path}")
+
+    if error:
+        raise error
+    return result, prof_path, summary_path
+
+
+class StubLLMServer:
+    """
+    Local stand-in for the Groq chat completions endpoint.
+    Returns a canned post after an optional fixed delay so profiles are reproducible offline.
+    """
+
+    def __init__(self, port=0, delay=0.0, host="127.0.0.1"):
+        self.delay = delay
+        server_ref = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if server_ref.delay:
+                    time.sleep(server_ref.delay)
+
+                body = json.dumps({
+                    "id": "stub-completion",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", "stub"),
+                    "choices": [{
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {
+                            "role": "assistant",
+                            "content": "🚀🤖 **Stub post for profiling**\n"
+                                       "This is a canned response from the local LLM stand-in. "
+                                       "🧪 It keeps profiles reproducible. ...more\n\n"
+                                       "What are your thoughts?",
+                        },
+                    }],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                }).encode("utf-8")
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = HTTPServer((host, port), Handler)
+        self.base_url = f"http://{host}:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        print(f"🧪 Stub LLM endpoint at {self.base_url}")
+        return self
+
+    def stop(self):
+        self.server.shutdown()
@@ -0,0 +1,251 @@
+# ranking_model.py - Linear ranking model: features -> score via a sparse dot product
+#
+# DEFAULT_WEIGHTS reproduce the original hand-tuned scoring. Weights fitted
+# from engagement data (see engagement.py) are saved as versioned artifacts
+# in RANKING_WEIGHTS_DIR and the newest one is loaded at startup.
+
+import glob
+import json
+import math
+import os
+import re
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from config import RANKING_WEIGHTS_DIR, RANKING_L2
+from keyword_matcher import KeywordMatcher
+
+
+# High-value LLM keywords (stronger signals); defaults for feed_config.py,
+# where they can be edited without a code change
+PREMIUM_KEYWORDS = {
+    "gpt": 10,
+    "claude": 10,
+    "gemini": 8,
+    "llama": 8,
+    "deepseek": 8,
+    "reasoning": 12,
+    "breakthrough": 15,
+    "release": 8,
+    "announcement": 7,
+    "new model": 12,
+    "fine-tune": 6,
+    "state-of-the-art": 12,
+    "sota": 10,
+    "performance": 5,
+    "training": 6,
+    "inference": 5,
+}
+
+DEFAULT_WEIGHTS = {
+    **{f"kw:{keyword}": points for keyword, points in PREMIUM_KEYWORDS.items()},
+    "title_hits": 3,        # bonus per premium keyword in the title
+    "fresh_1d": 20,         # very recent
+    "fresh_3d": 10,         # recent
+    "fresh_7d": 5,          # this week
+    "long_summary": 5,      # longer, more detailed articles tend to be better
+}
+
+PREMIUM_MATCHER = KeywordMatcher(PREMIUM_KEYWORDS)
+
+
+def published_datetime(published):
+    """
+    Parse RSS (RFC 822) or ISO 8601 dates, None if unparseable
+    """
+    if not published:
+        return None
+    try:
+        return parsedate_to_datetime(published)
+    except (TypeError, ValueError, IndexError):
+        pass
+    try:
+        return datetime.fromisoformat(published.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+def _aware(moment):
+    return moment if moment.tzinfo else moment.astimezone()
+
+
+def extract_features(news_item, keywords=PREMIUM_MATCHER, now=None):
+    """
+    Sparse feature vector {name: value} for one article
+    (keywords: a compiled KeywordMatcher, see feed_config.py)
+    """
+    title = news_item['title'].lower()
+    summary = news_item['summary'].lower()
+    text = title + " " + summary
+    features = {}
+
+    for keyword in keywords.hits(text):
+        features[f"kw:{keyword}"] = 1
+    title_hits = len(keywords.hits(title))
+    if title_hits:
+        features["title_hits"] = title_hits
+
+    pub_date = published_datetime(news_item.get('published'))
+    if pub_date is not None:
+        days_old = (_aware(now or datetime.now(timezone.utc)) - _aware(pub_date)).days
+        if days_old <= 1:
+            features["fresh_1d"] = 1
+        elif days_old <= 3:
+            features["fresh_3d"] = 1
+        elif days_old <= 7:
+            features["fresh_7d"] = 1
+
+    if len(news_item['summary']) > 300:
+        features["long_summary"] = 1
+
+    source = news_item.get('source')
+    if source:
+        features[f"source:{source}"] = 1
+
+    return features
+
+
+def dot(features, weights):
+    return sum(weights.get(name, 0.0) * value for name, value in features.items())
+
+
+# ===================
+# ARTIFACTS
+# ===================
+
+ARTIFACT_RE = re.compile(r"ranking_weights_v(\d+)\.json$")
+
+
+def _artifact_versions(directory=RANKING_WEIGHTS_DIR):
+    versions = []
+    for path in glob.glob(os.path.join(directory, "ranking_weights_v*.json")):
+        match = ARTIFACT_RE.search(path)
+        if match:
+            versions.append((int(match.group(1)), path))
+    return sorted(versions)
+
+
+def load_weights(directory=RANKING_WEIGHTS_DIR):
+    """
+    Newest learned weights, or DEFAULT_WEIGHTS if none were fitted yet.
+    Returns (weights, version) - version 0 means defaults.
+    """
+    versions = _artifact_versions(directory)
+    if not versions:
+        return dict(DEFAULT_WEIGHTS), 0
+
+    version, path = versions[-1]
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            artifact = json.load(f)
+        return artifact["weights"], version
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠️ Could not load ranking weights {path}: {e}")
+        return dict(DEFAULT_WEIGHTS), 0
+
+
+def save_weights(weights, info, directory=RANKING_WEIGHTS_DIR):
+    """
+    Write the next versioned artifact, returns its path
+    """
+    os.makedirs(directory, exist_ok=True)
+    versions = _artifact_versions(directory)
+    version = versions[-1][0] + 1 if versions else 1
+    path = os.path.join(directory, f"ranking_weights_v{version}.json")
+
+    artifact = {
+        "version": version,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "weights": weights,
+        **info,
+    }
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(artifact, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+# ===================
+# FITTING
+# ===================
+
+def _solve(matrix, vector):
+    """
+    Solve a small dense linear system with Gauss-Jordan elimination
+    """
+    n = len(vector)
+    rows = [matrix[i][:] + [vector[i]] for i in range(n)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(rows[r][col]))
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        if abs(rows[col][col]) < 1e-12:
+            continue
+        divisor = rows[col][col]
+        rows[col] = [v / divisor for v in rows[col]]
+        for r in range(n):
+            if r != col and rows[r][col]:
+                factor = rows[r][col]
+                rows[r] = [a - factor * b for a, b in zip(rows[r], rows[col])]
+    return [rows[i][n] for i in range(n)]
+
+
+def fit_weights(samples, prior=None, l2=RANKING_L2):
+    """
+    Ridge regression shrunk towards the prior weights:
+        minimize ||Xw - y||^2 + l2 * ||w - prior||^2
+    samples: [(features, target)] with targets already on the 0-100 score scale.
+    Returns (weights, info)
+    """
+    prior = dict(prior or DEFAULT_WEIGHTS)
+    names = sorted({name for features, _ in samples for name in features} | set(prior))
+    index = {name: i for i, name in enumerate(names)}
+    n = len(names)
+
+    xtx = [[0.0] * n for _ in range(n)]
+    xty = [0.0] * n
+    for features, target in samples:
+        items = [(index[name], value) for name, value in features.items()]
+        for i, vi in items:
+            xty[i] += vi * target
+            for j, vj in items:
+                xtx[i][j] += vi * vj
+
+    for i, name in enumerate(names):
+        xtx[i][i] += l2
+        xty[i] += l2 * prior.get(name, 0.0)
+
+    solution = _solve(xtx, xty)
+    weights = {name: round(solution[i], 4) for name, i in index.items()
+               if abs(solution[i]) > 1e-4}
+
+    # Goodness of fit on the training data
+    targets = [t for _, t in samples]
+    mean = sum(targets) / len(targets)
+    ss_tot = sum((t - mean) ** 2 for t in targets) or 1.0
+    ss_res = sum((dot(f, weights) - t) ** 2 for f, t in samples)
+
+    return weights, {"n_samples": len(samples), "l2": l2, "r2": round(1 - ss_res / ss_tot, 4)}
+
+
+def engagement_target(metrics):
+    """
+    One number per post: log-scaled weighted interactions
+    """
+    interactions = (
+        float(metrics.get("reactions", metrics.get("likes", 0)) or 0)
+        + 2 * float(metrics.get("comments", 0) or 0)
+        + 3 * float(metrics.get("shares", metrics.get("reposts", 0)) or 0)
+        + float(metrics.get("clicks", 0) or 0)
+    )
+    return math.log1p(interactions)
+
+
+def scale_targets(values):
+    """
+    Map raw targets onto the 0-100 score scale (min-max)
+    """
+    low, high = min(values), max(values)
+    if high - low < 1e-9:
+        return [50.0 for _ in values]
+    return [100.0 * (v - low) / (high - low) for v in values]
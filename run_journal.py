@@ -0,0 +1,156 @@
+# run_journal.py - Checkpoints of one automation run, for cheap retries
+#
+# Every run of run_automation gets a run ID and a journal file in
+# RUN_JOURNAL_DIR. Each stage's output (fetched items, ranking, selected
+# article, draft, delivery result) is written as soon as the stage
+# completes, atomically, so a crash or a failed webhook leaves the earlier
+# stages on disk. `python main.py --resume [RUN_ID]` loads the journal and
+# only runs the stages that are missing: no refetch, no second LLM call,
+# and a delivered post is never sent again.
+
+import glob
+import json
+import os
+import uuid
+from datetime import datetime, timezone
+
+from config import RUN_JOURNAL_DIR, RUN_JOURNAL_KEEP
+from post_store import atomic_write
+
+
+STAGES = ("fetch", "rank", "select", "draft", "delivery")
+
+
+def new_run_id():
+    """
+    Unique, time-sortable run id: 20260118T091502-1a2b3c
+    """
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    return f"{stamp}-{uuid.uuid4().hex[:6]}"
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class RunJournal:
+    """
+    One run's checkpoints, kept in RUN_JOURNAL_DIR/<run_id>.json
+    """
+
+    def __init__(self, data, directory=RUN_JOURNAL_DIR):
+        self.data = data
+        self.directory = directory
+
+    @property
+    def run_id(self):
+        return self.data["run_id"]
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, f"{self.run_id}.json")
+
+    @property
+    def options(self):
+        return self.data["options"]
+
+    @property
+    def status(self):
+        return self.data["status"]
+
+    @property
+    def finished(self):
+        return self.status != "running"
+
+    @classmethod
+    def start(cls, options, directory=RUN_JOURNAL_DIR):
+        """
+        New run with the options it needs to be resumed the same way
+        """
+        journal = cls({
+            "run_id": new_run_id(),
+            "started_at": _now(),
+            "status": "running",
+            "options": options,
+            "stages": {},
+        }, directory)
+        journal.save()
+        prune_journals(directory)
+        return journal
+
+    @classmethod
+    def load(cls, run_id=None, directory=RUN_JOURNAL_DIR):
+        """
+        A run by id, or the newest unfinished one; None if there is none
+        """
+        if run_id:
+            paths = [os.path.join(directory, f"{run_id}.json")]
+        else:
+            paths = sorted(glob.glob(os.path.join(directory, "*.json")), reverse=True)
+
+        for path in paths:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    journal = cls(json.load(f), directory)
+            except (OSError, ValueError) as e:
+                if run_id:
+                    print(f"❌ Could not read run journal {path}: {e}")
+                continue
+            if run_id or not journal.finished:
+                return journal
+        return None
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        text = json.dumps(self.data, ensure_ascii=False, indent=2, default=str)
+        atomic_write(self.path, text.encode("utf-8"))
+
+    def done(self, stage):
+        return stage in self.data["stages"]
+
+    def next_stage(self):
+        """
+        First stage without a checkpoint (None when all are done)
+        """
+        return next((stage for stage in STAGES if not self.done(stage)), None)
+
+    def get(self, stage, default=None):
+        entry = self.data["stages"].get(stage)
+        return entry["output"] if entry else default
+
+    def checkpoint(self, stage, output):
+        """
+        Record a completed stage (and clear the error of an earlier attempt)
+        """
+        self.data["stages"][stage] = {"at": _now(), "output": output}
+        self.data.pop("error", None)
+        self.save()
+        return output
+
+    def fail(self, stage, error):
+        """
+        Record why a stage failed; the run stays resumable
+        """
+        self.data["error"] = {"stage": stage, "at": _now(), "message": str(error)}
+        self.save()
+
+    def finish(self, status="complete"):
+        """
+        Close the run ("complete", "skipped", "no_news"); --resume without
+        a run id only picks runs that are still "running"
+        """
+        self.data["status"] = status
+        self.data["finished_at"] = _now()
+        self.save()
+
+
+def prune_journals(directory=RUN_JOURNAL_DIR, keep=RUN_JOURNAL_KEEP):
+    """
+    Delete all but the newest keep journals
+    """
+    paths = sorted(glob.glob(os.path.join(directory, "*.json")))
+    for path in paths[:-keep] if keep else []:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
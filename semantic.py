@@ -0,0 +1,254 @@
+# semantic.py - Optional semantic relevance scoring (hashed TF-IDF, no extra dependencies)
+#
+# Articles are compared by cosine similarity to an on-disk index of past
+# high-performing posts. Term-frequency vectors are cached per article in
+# SQLite, so an article seen in an earlier fetch is never re-vectorized;
+# IDF weights come from the index and are applied at scoring time.
+
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from collections import Counter
+
+from config import (
+    SEMANTIC_INDEX_PATH, SEMANTIC_CACHE_PATH, SEMANTIC_DIM, SEMANTIC_TOP_K
+)
+from ranking_model import engagement_target
+
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9\-\.]*[a-z0-9]|[a-z0-9]")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this "
+    "to was were will with what how why who new more about after into than their our "
+    "your you we they can could would should".split()
+)
+
+
+def tokenize(text):
+    tokens = [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+    # Unigrams + bigrams so "language model" differs from "model" + "language"
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def term_vector(text, dim=SEMANTIC_DIM):
+    """
+    Sublinear term frequencies hashed into dim buckets: {bucket: weight}
+    """
+    counts = Counter(zlib.crc32(token.encode("utf-8")) % dim for token in tokenize(text))
+    return {bucket: 1.0 + math.log(count) for bucket, count in counts.items()}
+
+
+def article_text(news_item):
+    return f"{news_item.get('title', '')} {news_item.get('title', '')} {news_item.get('summary', '')}"
+
+
+def article_key(news_item):
+    return hashlib.sha1(article_text(news_item).encode("utf-8")).hexdigest()
+
+
+class SemanticIndex:
+    """
+    Examples of posts that performed well, stored as TF vectors plus document frequencies
+    """
+
+    def __init__(self, path=SEMANTIC_INDEX_PATH, dim=SEMANTIC_DIM):
+        self.path = path
+        self.dim = dim
+        self.docs = []        # [{"id", "weight", "vector": {bucket: tf}}]
+        self.df = Counter()
+        self._prepared = None
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("dim") != self.dim:
+            print("⚠️ Semantic index built with another dimension, ignoring it")
+            return
+        self.docs = [
+            {"id": d["id"], "weight": d.get("weight", 1.0),
+             "vector": {int(k): v for k, v in d["vector"].items()}}
+            for d in data["docs"]
+        ]
+        self.df = Counter()
+        for doc in self.docs:
+            self.df.update(doc["vector"].keys())
+        self._prepared = None
+
+    def save(self):
+        data = {"dim": self.dim, "docs": self.docs}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def add(self, doc_id, text, weight=1.0):
+        """
+        Add (or replace) one example post
+        """
+        self.docs = [d for d in self.docs if d["id"] != doc_id]
+        self.docs.append({"id": doc_id, "weight": weight, "vector": term_vector(text, self.dim)})
+        self.df = Counter()
+        for doc in self.docs:
+            self.df.update(doc["vector"].keys())
+        self._prepared = None
+
+    def idf(self, bucket):
+        return math.log((1 + len(self.docs)) / (1 + self.df.get(bucket, 0))) + 1.0
+
+    def _prepare(self):
+        """
+        Inverted index of L2-normalized TF-IDF example vectors: bucket -> [(doc, weight)]
+        """
+        postings = {}
+        for i, doc in enumerate(self.docs):
+            weighted = {b: tf * self.idf(b) for b, tf in doc["vector"].items()}
+            norm = math.sqrt(sum(w * w for w in weighted.values())) or 1.0
+            for bucket, w in weighted.items():
+                postings.setdefault(bucket, []).append((i, w / norm))
+        self._prepared = postings
+        return postings
+
+    def similarity(self, tf_vector, top_k=SEMANTIC_TOP_K):
+        """
+        Mean cosine similarity (0-1) to the top_k most similar examples,
+        scaled by each example's weight
+        """
+        if not self.docs or not tf_vector:
+            return 0.0
+        postings = self._prepared or self._prepare()
+
+        weighted = {b: tf * self.idf(b) for b, tf in tf_vector.items()}
+        norm = math.sqrt(sum(w * w for w in weighted.values())) or 1.0
+
+        scores = {}
+        for bucket, w in weighted.items():
+            for doc_index, doc_w in postings.get(bucket, ()):
+                scores[doc_index] = scores.get(doc_index, 0.0) + (w / norm) * doc_w
+
+        if not scores:
+            return 0.0
+        best = sorted(
+            (min(1.0, score * self.docs[i]["weight"]) for i, score in scores.items()),
+            reverse=True
+        )[:top_k]
+        return sum(best) / len(best)
+
+
+class VectorCache:
+    """
+    Per-article TF vectors keyed by a hash of the article text
+    """
+
+    def __init__(self, path=SEMANTIC_CACHE_PATH):
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS vectors (key TEXT PRIMARY KEY, dim INTEGER, vector TEXT)"
+        )
+        self.conn.commit()
+
+    def get_many(self, keys, dim):
+        found = {}
+        keys = list(keys)
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT key, vector FROM vectors WHERE dim = ? AND key IN ({placeholders})",
+                    [dim, *chunk]
+                ).fetchall()
+                for key, vector in rows:
+                    found[key] = {int(k): v for k, v in json.loads(vector).items()}
+        return found
+
+    def put_many(self, vectors, dim):
+        rows = [(key, dim, json.dumps(vector)) for key, vector in vectors.items()]
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO vectors (key, dim, vector) VALUES (?, ?, ?)", rows
+            )
+
+
+class SemanticScorer:
+    """
+    Batch-scores articles against the index, reusing cached vectors
+    """
+
+    def __init__(self, index=None, cache=None):
+        self.index = index or SemanticIndex()
+        self.cache = cache or VectorCache()
+
+    def vectors(self, news_items):
+        keys = [article_key(n) for n in news_items]
+        cached = self.cache.get_many(set(keys), self.index.dim)
+
+        missing = {}
+        for key, news in zip(keys, news_items):
+            if key not in cached and key not in missing:
+                missing[key] = term_vector(article_text(news), self.index.dim)
+        if missing:
+            self.cache.put_many(missing, self.index.dim)
+            cached.update(missing)
+
+        return [cached[key] for key in keys]
+
+    def score_batch(self, news_items):
+        """
+        Similarity (0-1) of each article to past high-performing posts
+        """
+        if not self.index.docs:
+            return [0.0] * len(news_items)
+        return [self.index.similarity(v) for v in self.vectors(news_items)]
+
+    def score(self, title, summary):
+        return self.score_batch([{"title": title, "summary": summary}])[0]
+
+
+_scorer = None
+_scorer_lock = threading.Lock()
+
+
+def get_scorer():
+    global _scorer
+    with _scorer_lock:
+        if _scorer is None:
+            _scorer = SemanticScorer()
+        return _scorer
+
+
+def engagement_weights(drafts):
+    """
+    Index weight per draft: its engagement relative to the mean of the drafts
+    with metrics (capped at 2.0), 1.0 where there are no metrics yet
+    """
+    targets = [engagement_target(d["metrics"]) if d.get("metrics") else None for d in drafts]
+    known = [t for t in targets if t is not None]
+    mean = sum(known) / len(known) if known else 0.0
+    return [1.0 if t is None or mean <= 0 else min(2.0, t / mean) for t in targets]
+
+
+def rebuild_index_from_archive(archive, limit=500):
+    """
+    Seed the index with posts that were actually published, weighted by
+    their engagement; posts nobody engaged with are left out
+    """
+    index = SemanticIndex()
+    index.docs = []
+    index.df = Counter()
+    drafts = archive.published_drafts(limit)
+    for draft, weight in zip(drafts, engagement_weights(drafts)):
+        if weight > 0:
+            index.add(f"draft-{draft['id']}", f"{draft['title']} {draft['title']} {draft['content']}",
+                      weight=round(weight, 3))
+    index.save()
+    return len(index.docs)
@@ -0,0 +1,171 @@
+# settings_store.py - The .env settings, loaded once and shared
+#
+# The file is parsed once (python-dotenv's parser, which keeps every original
+# line), and values are then served from memory. update() rewrites only the
+# changed assignments, so comments, ordering and quoting of everything else
+# survive. It writes to a temp file and os.replace()s it, mirrors the values
+# into os.environ, and notifies subscribers, so a new API key or webhook URL
+# applies without a restart:
+#
+#   get_settings().subscribe(on_change, keys={"GROQ_API_KEY"})
+#   get_settings().update({"MAKE_WEBHOOK_URL": "https://hook.make.com/..."})
+
+import io
+import os
+import re
+import threading
+
+from dotenv.parser import parse_stream
+
+from config import ENV_PATH
+
+
+SAFE_VALUE_RE = re.compile(r"^[\w@%+=:,./\-]*$")
+
+
+def quote_value(value):
+    """
+    A value as written to .env: bare when that is unambiguous, else double-quoted
+    """
+    value = str(value)
+    if value and SAFE_VALUE_RE.match(value):
+        return value
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'"{escaped}"'
+
+
+class SettingsStore:
+    """
+    In-memory view of one .env file with atomic writes and change notifications
+    """
+
+    def __init__(self, path=ENV_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self._lines = []        # (key or None, original text) in file order
+        self._values = {}
+        self._subscribers = []  # (callback, keys or None)
+        self.load()
+
+    def load(self):
+        """
+        (Re)read the file; called once at startup
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            text = ""
+        self._parse(text)
+
+    def _parse(self, text):
+        lines, values = [], {}
+        for binding in parse_stream(io.StringIO(text)):
+            lines.append((None if binding.error else binding.key, binding.original.string))
+            if binding.key and not binding.error:
+                values[binding.key] = binding.value or ""
+        with self._lock:
+            self._lines = lines
+            self._values = values
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._values.get(key, default)
+
+    def values(self):
+        with self._lock:
+            return dict(self._values)
+
+    def subscribe(self, callback, keys=None):
+        """
+        callback(changed) after every update touching keys (any key if None);
+        changed maps key -> new value (None if removed). Returns an unsubscribe function.
+        """
+        entry = (callback, frozenset(keys) if keys else None)
+        with self._lock:
+            self._subscribers.append(entry)
+
+        def unsubscribe():
+            with self._lock:
+                if entry in self._subscribers:
+                    self._subscribers.remove(entry)
+        return unsubscribe
+
+    def _render(self, values):
+        """
+        File text for values: changed keys rewritten in place, new keys appended
+        """
+        last = {key: i for i, (key, _) in enumerate(self._lines) if key}
+        out = []
+        for i, (key, original) in enumerate(self._lines):
+            if key is None or (key in values and values[key] == self._values.get(key)):
+                out.append(original)  # comments and unchanged assignments as they were
+            elif key in values and i == last[key]:
+                newline = "\n" if original.endswith("\n") else ""
+                out.append(f"{key}={quote_value(values[key])}{newline}")
+            # else: removed, or an earlier duplicate of a changed key
+
+        if out and not out[-1].endswith("\n"):
+            out[-1] += "\n"
+        for key, value in values.items():
+            if key not in last:
+                out.append(f"{key}={quote_value(value)}\n")
+        return "".join(out)
+
+    def update(self, changes):
+        """
+        Apply {key: value} (None removes the key), write the file atomically
+        and notify subscribers. Returns {key: new value} for what actually changed.
+        """
+        with self._lock:
+            values = dict(self._values)
+            for key, value in changes.items():
+                if value is None:
+                    values.pop(key, None)
+                else:
+                    values[key] = str(value)
+            changed = {key: values.get(key) for key in changes
+                       if values.get(key) != self._values.get(key)}
+            if not changed:
+                return {}
+
+            text = self._render(values)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+            # Re-parse what was written so line bookkeeping matches the file
+            self._parse(text)
+            subscribers = list(self._subscribers)
+
+        for key, value in changed.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+        for callback, keys in subscribers:
+            if keys is None or keys & changed.keys():
+                try:
+                    callback(changed)
+                except Exception as e:
+                    print(f"⚠️ Settings subscriber failed: {e}")
+        return changed
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_settings():
+    """
+    Shared store for ENV_PATH
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SettingsStore()
+        return _store
@@ -0,0 +1,526 @@
+# sources.py - News source adapters (RSS/Atom, GitHub releases, arXiv, Hacker News, JSON Feed)
+#
+# Every adapter yields normalized items:
+#   {"title", "summary", "link", "source", "published"}
+# and all adapters run in one shared thread pool. Each adapter type has its
+# own concurrency limit and minimum interval between requests, so adding
+# sources scales out instead of adding serial calls to fetch_latest_news.
+#
+# Any URL may also be a local file path (or file:// URL) for fixtures;
+# paginated adapters then read a single page from that file.
+
+import json
+import threading
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import feedparser
+import requests
+
+from metrics import span
+
+
+USER_AGENT = "LINK-NewsBot/1.0"
+
+
+def is_local(url):
+    return not url.lower().startswith(("http://", "https://"))
+
+
+def download(url, params=None, timeout=15, max_bytes=None):
+    """
+    Download raw bytes from an http(s) URL or a local file path
+    (with max_bytes: read in chunks and stop there, the rest is never fetched)
+    """
+    if max_bytes is not None:
+        data = bytearray()
+        chunks = iter_chunks(url, params=params, timeout=timeout)
+        try:
+            for chunk in chunks:
+                data += chunk
+                if len(data) >= max_bytes:
+                    break
+        finally:
+            chunks.close()
+        return bytes(data[:max_bytes])
+
+    if not is_local(url):
+        response = requests.get(url, params=params, timeout=timeout,
+                                headers={"User-Agent": USER_AGENT})
+        response.raise_for_status()
+        return response.content
+
+    path = url[len("file://"):] if url.startswith("file://") else url
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def iter_chunks(url, chunk_size=16384, timeout=15, params=None):
+    """
+    Yield raw chunks from an http(s) URL or local file without buffering the whole body.
+    Closing the generator closes the connection.
+    """
+    if not is_local(url):
+        with requests.get(url, params=params, stream=True, timeout=timeout,
+                          headers={"User-Agent": USER_AGENT}) as response:
+            response.raise_for_status()
+            yield from response.iter_content(chunk_size)
+        return
+
+    path = url[len("file://"):] if url.startswith("file://") else url
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+# ===================
+# STREAMING FEED PARSER
+# ===================
+
+ENTRY_TAGS = {"item", "entry"}
+SUMMARY_TAGS = ("description", "summary")
+CONTENT_TAGS = ("encoded", "content")
+DATE_TAGS = ("pubdate", "published", "date", "updated")
+
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1].lower()
+
+
+def _entry_fields(elem):
+    """
+    Pull title/summary/link/published out of an RSS <item> or Atom <entry>
+    """
+    fields = {}
+    for child in elem:
+        name = _local_name(child.tag)
+        if name == "link":
+            href = child.get("href")
+            if href is None:
+                fields.setdefault("link", (child.text or "").strip())
+            elif child.get("rel") in (None, "alternate"):
+                fields.setdefault("link", href.strip())
+        elif name not in fields:
+            fields[name] = "".join(child.itertext()).strip()
+
+    summary = next((fields[t] for t in SUMMARY_TAGS + CONTENT_TAGS if fields.get(t)), "")
+    published = next((fields[t] for t in DATE_TAGS if fields.get(t)), "")
+    return {
+        "title": fields.get("title", ""),
+        "summary": summary[:500],
+        "link": fields.get("link", ""),
+        "published": published,
+    }
+
+
+class FeedStream:
+    """
+    Incremental RSS/Atom parser: feed() it byte chunks as they arrive.
+    accept(title, summary) is applied to each entry as soon as it is complete;
+    feed() returns True once max_matches entries are accepted or max_bytes
+    are read, and the caller should stop reading. Up to keep_misses rejected
+    entries are kept in misses, for a second (batched) filter by the caller.
+    Finished entries are detached from the tree so memory stays flat.
+    """
+
+    def __init__(self, accept=None, max_matches=20, max_bytes=2_000_000, keep_misses=0):
+        self.accept = accept
+        self.max_matches = max_matches
+        self.max_bytes = max_bytes
+        self.keep_misses = keep_misses
+        self.feed_title = None
+        self.items = []
+        self.misses = []
+        self.stats = {"bytes": 0, "entries_scanned": 0, "stopped_early": 0}
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._stack = []
+        self._in_entry = 0
+
+    def feed(self, chunk):
+        self.stats["bytes"] += len(chunk)
+        self._parser.feed(chunk)
+
+        for event, elem in self._parser.read_events():
+            name = _local_name(elem.tag)
+            if event == "start":
+                self._stack.append(elem)
+                if name in ENTRY_TAGS:
+                    self._in_entry += 1
+                continue
+
+            self._stack.pop()
+            if name in ENTRY_TAGS:
+                self._in_entry -= 1
+                item = _entry_fields(elem)
+                self.stats["entries_scanned"] += 1
+                if self._stack:
+                    self._stack[-1].remove(elem)
+
+                if self.accept is None or self.accept(item["title"], item["summary"]):
+                    self.items.append(item)
+                    if len(self.items) >= self.max_matches:
+                        self.stats["stopped_early"] = 1
+                        return True
+                elif len(self.misses) < self.keep_misses:
+                    self.misses.append(item)
+            elif name == "title" and not self._in_entry and self.feed_title is None:
+                self.feed_title = (elem.text or "").strip()
+
+        if self.stats["bytes"] >= self.max_bytes:
+            self.stats["stopped_early"] = 1
+            return True
+        return False
+
+
+def stream_feed(chunks, accept=None, max_matches=20, max_bytes=2_000_000, keep_misses=0):
+    """
+    Incrementally parse an RSS/Atom document from byte chunks (see FeedStream).
+    Returns (feed_title, items, stats); items include the kept misses.
+    """
+    stream = FeedStream(accept, max_matches, max_bytes, keep_misses)
+    for chunk in chunks:
+        if stream.feed(chunk):
+            break
+    return stream.feed_title, stream.items + stream.misses, stream.stats
+
+
+class SourceAdapter:
+    """
+    Base adapter. Subclasses implement fetch() and call self.get() for I/O.
+    """
+    kind = "base"
+    max_concurrency = 4    # simultaneous requests across all adapters of this type
+    min_interval = 0.0     # seconds between two requests of this type
+
+    _limits = {}
+    _limits_lock = threading.Lock()
+
+    def __init__(self, url, max_items=50, name=None):
+        self.url = url
+        self.max_items = max_items
+        self.name = name
+
+    @classmethod
+    def _limit(cls):
+        with SourceAdapter._limits_lock:
+            if cls.kind not in SourceAdapter._limits:
+                SourceAdapter._limits[cls.kind] = {
+                    "semaphore": threading.BoundedSemaphore(cls.max_concurrency),
+                    "lock": threading.Lock(),
+                    "last": 0.0,
+                }
+            return SourceAdapter._limits[cls.kind]
+
+    @contextmanager
+    def throttle(self, url):
+        """
+        Hold this adapter type's concurrency slot and respect its request interval
+        """
+        limit = self._limit()
+        with limit["semaphore"]:
+            if self.min_interval and not is_local(url):
+                with limit["lock"]:
+                    wait = limit["last"] + self.min_interval - time.monotonic()
+                    if wait > 0:
+                        time.sleep(wait)
+                    limit["last"] = time.monotonic()
+            yield
+
+    def get(self, url, params=None, max_bytes=None):
+        """
+        Rate-limited, concurrency-limited download recorded as a feed_fetch span
+        """
+        with self.throttle(url):
+            with span("feed_fetch", feed=url, kind=self.kind) as s:
+                raw = download(url, params=params, max_bytes=max_bytes)
+                s.add("bytes", len(raw))
+            return raw
+
+    def fetch(self):
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.url!r})"
+
+
+class RSSAdapter(SourceAdapter):
+    """
+    RSS 2.0 / Atom feed.
+    With stream=True the document is parsed incrementally while downloading:
+    accept() filters entries on the fly and reading stops after max_matches
+    accepted entries or max_bytes; up to keep_misses rejected entries are
+    returned as well. Malformed XML falls back to feedparser.
+    """
+    kind = "rss"
+    max_concurrency = 8
+
+    def __init__(self, url, max_items=50, name=None, stream=False, accept=None,
+                 max_matches=20, max_bytes=2_000_000, keep_misses=0):
+        super().__init__(url, max_items=max_items, name=name)
+        self.stream = stream
+        self.accept = accept
+        self.max_matches = max_matches
+        self.max_bytes = max_bytes
+        self.keep_misses = keep_misses
+
+    def fetch_streaming(self):
+        with self.throttle(self.url):
+            with span("feed_stream", feed=self.url) as s:
+                chunks = iter_chunks(self.url)
+                try:
+                    feed_title, items, stats = stream_feed(
+                        chunks, self.accept, self.max_matches, self.max_bytes, self.keep_misses
+                    )
+                finally:
+                    chunks.close()
+                for key, value in stats.items():
+                    s.add(key, value)
+                s.add("entries_kept", len(items))
+
+        source = self.name or feed_title or "Unknown"
+        for item in items:
+            item["source"] = source
+        return items
+
+    def fetch(self):
+        if self.stream:
+            try:
+                yield from self.fetch_streaming()
+                return
+            except ET.ParseError as e:
+                print(f"⚠️ Streaming parse failed for {self.url[:50]} ({e}), using feedparser")
+
+        yield from self.fetch_full()
+
+    def parse(self, raw):
+        with span("parse", feed=self.url) as s:
+            feed = feedparser.parse(raw)
+            s.add("entries", len(feed.entries))
+        return feed
+
+    def fetch_full(self):
+        # Same byte cap as streaming (also for the fallback after a parse error);
+        # feedparser reads what it can from a cut-off document
+        yield from self.entries(self.parse(self.get(self.url, max_bytes=self.max_bytes)))
+
+    def entries(self, feed):
+        """
+        Normalized items from a feedparser result
+        """
+        source = self.name or feed.feed.get("title", "Unknown")
+
+        for entry in feed.entries[:self.max_items]:
+            yield {
+                "title": entry.get("title", ""),
+                "summary": entry.get("summary", "")[:500],
+                "link": entry.get("link", ""),
+                "source": source,
+                "published": entry.get("published", ""),
+            }
+
+
+class GitHubReleasesAdapter(RSSAdapter):
+    """
+    Release notes of a GitHub repository via its releases.atom feed
+    """
+    kind = "github_releases"
+    max_concurrency = 4
+
+    def __init__(self, repo=None, url=None, max_items=10, name=None, **options):
+        url = url or f"https://github.com/{repo}/releases.atom"
+        super().__init__(url, max_items=max_items, name=name or f"GitHub: {repo or url}",
+                         **options)
+
+
+class ArxivAdapter(RSSAdapter):
+    """
+    arXiv API listing (Atom), paginated with start/max_results.
+    arXiv asks clients to wait 3 seconds between calls.
+    """
+    kind = "arxiv"
+    max_concurrency = 1
+    min_interval = 3.0
+    API_URL = "http://export.arxiv.org/api/query"
+
+    def __init__(self, query="cat:cs.CL", url=None, page_size=25, max_pages=2,
+                 max_items=50, name="arXiv"):
+        super().__init__(url or self.API_URL, max_items=max_items, name=name)
+        self.query = query
+        self.page_size = page_size
+        self.max_pages = max_pages
+
+    def fetch(self):
+        count = 0
+        for page in range(self.max_pages):
+            params = None
+            if not is_local(self.url):
+                params = {
+                    "search_query": self.query,
+                    "start": page * self.page_size,
+                    "max_results": self.page_size,
+                    "sortBy": "submittedDate",
+                    "sortOrder": "descending",
+                }
+            feed = self.parse(self.get(self.url, params))
+
+            for entry in feed.entries:
+                yield {
+                    "title": " ".join(entry.get("title", "").split()),
+                    "summary": " ".join(entry.get("summary", "").split())[:500],
+                    "link": entry.get("link", ""),
+                    "source": self.name,
+                    "published": entry.get("published", ""),
+                }
+                count += 1
+                if count >= self.max_items:
+                    return
+
+            if is_local(self.url) or len(feed.entries) < self.page_size:
+                return
+
+
+class HackerNewsAdapter(SourceAdapter):
+    """
+    Hacker News stories from the Algolia search API, paginated by page number
+    """
+    kind = "hackernews"
+    max_concurrency = 2
+    min_interval = 0.5
+    API_URL = "https://hn.algolia.com/api/v1/search_by_date"
+
+    def __init__(self, query="LLM", url=None, hits_per_page=30, max_pages=2,
+                 max_items=50, name="Hacker News"):
+        super().__init__(url or self.API_URL, max_items=max_items, name=name)
+        self.query = query
+        self.hits_per_page = hits_per_page
+        self.max_pages = max_pages
+
+    def fetch(self):
+        count = 0
+        for page in range(self.max_pages):
+            params = None
+            if not is_local(self.url):
+                params = {"query": self.query, "tags": "story",
+                          "page": page, "hitsPerPage": self.hits_per_page}
+            raw = self.get(self.url, params)
+            with span("parse", feed=self.url) as s:
+                data = json.loads(raw)
+                hits = data.get("hits", [])
+                s.add("entries", len(hits))
+
+            for hit in hits:
+                item_url = f"https://news.ycombinator.com/item?id={hit.get('objectID', '')}"
+                yield {
+                    "title": hit.get("title") or "",
+                    "summary": (hit.get("story_text") or "")[:500],
+                    "link": hit.get("url") or item_url,
+                    "source": self.name,
+                    "published": hit.get("created_at", ""),
+                }
+                count += 1
+                if count >= self.max_items:
+                    return
+
+            if is_local(self.url) or page + 1 >= data.get("nbPages", 0):
+                return
+
+
+class JSONFeedAdapter(SourceAdapter):
+    """
+    JSON Feed (https://jsonfeed.org), following next_url for pagination
+    """
+    kind = "jsonfeed"
+    max_concurrency = 4
+
+    def __init__(self, url, max_pages=3, max_items=50, name=None):
+        super().__init__(url, max_items=max_items, name=name)
+        self.max_pages = max_pages
+
+    def fetch(self):
+        count = 0
+        url = self.url
+        for _ in range(self.max_pages):
+            raw = self.get(url)
+            with span("parse", feed=url) as s:
+                data = json.loads(raw)
+                items = data.get("items", [])
+                s.add("entries", len(items))
+            source = self.name or data.get("title", "Unknown")
+
+            for item in items:
+                summary = item.get("summary") or item.get("content_text") or item.get("content_html") or ""
+                yield {
+                    "title": item.get("title", ""),
+                    "summary": summary[:500],
+                    "link": item.get("url") or item.get("external_url") or "",
+                    "source": source,
+                    "published": item.get("date_published", ""),
+                }
+                count += 1
+                if count >= self.max_items:
+                    return
+
+            url = data.get("next_url")
+            if not url:
+                return
+
+
+ADAPTERS = {
+    "rss": RSSAdapter,
+    "atom": RSSAdapter,
+    "github_releases": GitHubReleasesAdapter,
+    "arxiv": ArxivAdapter,
+    "hackernews": HackerNewsAdapter,
+    "jsonfeed": JSONFeedAdapter,
+}
+
+
+def build_sources(rss_feeds, extra_sources=(), max_items=50, **stream_options):
+    """
+    Turn config (plain RSS URLs + source dicts) into adapter instances.
+    stream_options (stream, accept, max_matches, max_bytes, keep_misses) apply to RSS/Atom feeds.
+    """
+    adapters = [RSSAdapter(url, max_items=max_items, **stream_options) for url in rss_feeds]
+    for spec in extra_sources:
+        spec = dict(spec)
+        kind = spec.pop("type", "rss")
+        spec.setdefault("max_items", max_items)
+        adapter_cls = ADAPTERS.get(kind)
+        if adapter_cls is None:
+            print(f"⚠️ Unknown source type: {kind}")
+            continue
+        if adapter_cls in (RSSAdapter, GitHubReleasesAdapter):
+            for key, value in stream_options.items():
+                spec.setdefault(key, value)
+        adapters.append(adapter_cls(**spec))
+    return adapters
+
+
+def _collect(adapter):
+    print(f"📡 Fetching: {adapter.url[:50]}...")
+    return list(adapter.fetch())
+
+
+def fetch_all(adapters, max_workers=8):
+    """
+    Run every adapter in one thread pool.
+    Returns [(adapter, items)] in adapter order; items is None if the adapter failed.
+    """
+    if not adapters:
+        return []
+
+    results = []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(adapters))) as pool:
+        futures = [(adapter, pool.submit(_collect, adapter)) for adapter in adapters]
+        for adapter, future in futures:
+            try:
+                results.append((adapter, future.result()))
+            except Exception as e:
+                print(f"❌ Error fetching {adapter.url}: {e}")
+                results.append((adapter, None))
+    return results
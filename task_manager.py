@@ -0,0 +1,227 @@
+# task_manager.py - Background tasks for the desktop app on one bounded pool
+#
+# Every background job of the GUI (fetch, generate, chat, profile, publish)
+# is submitted under a key. Blocking functions run on a QThreadPool limited
+# to GUI_MAX_THREADS; coroutines run on the shared asyncio loop thread
+# (async_pipeline). Submitting a key that is already running joins the
+# running task instead of starting another one (coalescing). cancel(key)
+# drops the task's callbacks, removes it from the queue if it has not
+# started, and lets a running task stop at its next task.check().
+# Results, errors and progress are delivered on the GUI thread.
+
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from config import GUI_MAX_THREADS
+
+
+PRIORITY_LOW = 0
+PRIORITY_HIGH = 10   # chat: starts before queued fetch/generate work
+
+
+class TaskCancelled(Exception):
+    """
+    Raised by Task.check() once the task was cancelled
+    """
+
+
+class Task:
+    """
+    Handle passed to every task function as its first argument
+    """
+
+    def __init__(self, key, manager):
+        self.key = key
+        self.manager = manager
+        self.listeners = []     # (on_result, on_error, on_progress)
+        self.runnable = None
+        self.future = None
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def check(self):
+        """
+        Stop here (raise TaskCancelled) if the task was cancelled
+        """
+        if self.cancelled:
+            raise TaskCancelled(self.key)
+
+    def report(self, message):
+        """
+        Progress message for the GUI (callable from any thread)
+        """
+        self.manager.progress_ready.emit(self, message)
+
+
+class _Runnable(QRunnable):
+    def __init__(self, task, func, args, kwargs):
+        super().__init__()
+        # The manager keeps the reference; Qt must not delete it under Python
+        self.setAutoDelete(False)
+        self.task = task
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self):
+        task = self.task
+        try:
+            task.check()
+            result = self.func(task, *self.args, **self.kwargs)
+        except TaskCancelled:
+            task.manager.cancelled_ready.emit(task)
+            return
+        except Exception as e:
+            task.manager.error_ready.emit(task, str(e))
+            return
+        task.manager.result_ready.emit(task, result)
+
+
+class TaskManager(QObject):
+    """
+    Keyed, coalescing, cancellable background tasks; create it on the GUI thread
+    """
+    # Emitted from worker threads, delivered (queued) on the GUI thread
+    result_ready = pyqtSignal(object, object)
+    error_ready = pyqtSignal(object, str)
+    progress_ready = pyqtSignal(object, str)
+    cancelled_ready = pyqtSignal(object)
+
+    def __init__(self, max_threads=GUI_MAX_THREADS, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self._tasks = {}
+        self.result_ready.connect(self._on_result)
+        self.error_ready.connect(self._on_error)
+        self.progress_ready.connect(self._on_progress)
+        self.cancelled_ready.connect(self._on_cancelled)
+
+    def _join(self, key, listener):
+        task = self._tasks.get(key)
+        if task is not None and listener not in task.listeners:
+            task.listeners.append(listener)
+        return task
+
+    def submit(self, key, func, *args, on_result=None, on_error=None, on_progress=None,
+               priority=PRIORITY_LOW, **kwargs):
+        """
+        Run func(task, *args, **kwargs) on the pool. If key is already running,
+        the callbacks are attached to that task instead. Returns the Task.
+        """
+        listener = (on_result, on_error, on_progress)
+        task = self._join(key, listener)
+        if task is not None:
+            return task
+
+        task = Task(key, self)
+        task.listeners.append(listener)
+        task.runnable = _Runnable(task, func, args, kwargs)
+        self._tasks[key] = task
+        self.pool.start(task.runnable, priority)
+        return task
+
+    def submit_async(self, key, coro_func, *args, on_result=None, on_error=None,
+                     on_progress=None, **kwargs):
+        """
+        Like submit() for a coroutine function, run on the shared asyncio loop
+        thread; cancel() cancels the coroutine at its current await
+        """
+        from async_pipeline import get_loop_thread
+
+        listener = (on_result, on_error, on_progress)
+        task = self._join(key, listener)
+        if task is not None:
+            return task
+
+        task = Task(key, self)
+        task.listeners.append(listener)
+        self._tasks[key] = task
+        task.future = get_loop_thread().submit(coro_func(task, *args, **kwargs))
+        task.future.add_done_callback(lambda future: self._future_done(task, future))
+        return task
+
+    def _future_done(self, task, future):
+        # A coroutine can also end cancelled without cancel() (a CancelledError
+        # from inside, loop shutdown): its key must not stay registered
+        if future.cancelled():
+            self.cancelled_ready.emit(task)
+            return
+        error = future.exception()
+        if isinstance(error, TaskCancelled):
+            self.cancelled_ready.emit(task)
+            return
+        if error is not None:
+            self.error_ready.emit(task, str(error))
+        else:
+            self.result_ready.emit(task, future.result())
+
+    def _finish(self, task):
+        """
+        Listeners of a task that completed normally (none if it was cancelled)
+        """
+        if self._tasks.get(task.key) is task:
+            del self._tasks[task.key]
+        return [] if task.cancelled else task.listeners
+
+    def _on_result(self, task, result):
+        for on_result, _, _ in self._finish(task):
+            if on_result:
+                on_result(result)
+
+    def _on_error(self, task, message):
+        for _, on_error, _ in self._finish(task):
+            if on_error:
+                on_error(message)
+
+    def _on_cancelled(self, task):
+        self._finish(task)  # unregister only; callbacks are not called
+
+    def _on_progress(self, task, message):
+        if task.cancelled:
+            return
+        for _, _, on_progress in task.listeners:
+            if on_progress:
+                on_progress(message)
+
+    def is_running(self, key):
+        return key in self._tasks
+
+    def count(self, prefix):
+        """
+        Number of queued or running tasks whose key starts with prefix
+        """
+        return sum(1 for key in self._tasks if key.startswith(prefix))
+
+    def cancel(self, key):
+        """
+        Cancel a task; its callbacks will not be called. Returns False if no such task.
+        """
+        task = self._tasks.pop(key, None)
+        if task is None:
+            return False
+        task._cancelled.set()
+        if task.future is not None:
+            task.future.cancel()
+        elif task.runnable is not None:
+            self.pool.tryTake(task.runnable)  # not started yet: never runs
+        return True
+
+    def cancel_prefix(self, prefix, keep=None):
+        """
+        Cancel every task whose key starts with prefix (except keep)
+        """
+        for key in [k for k in self._tasks if k.startswith(prefix) and k != keep]:
+            self.cancel(key)
+
+    def shutdown(self, timeout_ms=3000):
+        """
+        Cancel everything and wait for running pool threads to finish
+        """
+        for key in list(self._tasks):
+            self.cancel(key)
+        return self.pool.waitForDone(timeout_ms)
@@ -0,0 +1,194 @@
+# url_canon.py - Canonical article URLs so the same story is only handled once
+#
+# The same article arrives as a Feedburner redirect, with utm_* tags, over
+# http or https... canonical_url() normalizes what can be normalized
+# locally (host, default port, fragment, tracking parameters, parameter
+# order) and keeps the scheme, since that link is the one that gets
+# published; dedup_key() additionally treats http and https as the same
+# page. Links on known redirector hosts are additionally resolved with a
+# HEAD request through one pooled session, and every resolution is cached
+# in SQLite, so a URL is resolved once ever.
+
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import URL_CACHE_PATH, URL_RESOLVE_HOSTS, URL_RESOLVE_WORKERS
+from metrics import span
+from sources import USER_AGENT, is_local
+
+
+# Only parameters that are known to be tracking-only; generic names like
+# "source" or "ref" select content on some sites and are kept
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "igshid", "yclid", "twclid",
+    "mc_cid", "mc_eid", "mkt_tok", "ref_src", "cmpid", "ncid",
+    "guccounter", "guce_referrer", "guce_referrer_sig", "sr_share", "smid",
+    "soc_src", "soc_trk", "s_cid", "at_medium", "at_campaign",
+})
+TRACKING_PREFIXES = ("utm_", "_hsenc", "_hsmi", "hsa_", "pk_", "mtm_")
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonical_url(url):
+    """
+    Normalize a URL without any network access (unchanged if it can't be parsed)
+    """
+    if not url or is_local(url):
+        return url
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+
+    host = (parts.hostname or "").lower().rstrip(".")
+    netloc = host if port in (None, DEFAULT_PORTS.get(scheme)) else f"{host}:{port}"
+
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    query.sort()
+
+    return urlunsplit((scheme, netloc, parts.path or "/", urlencode(query), ""))
+
+
+def dedup_key(url):
+    """
+    Identity of a canonical URL for duplicate detection: http and https are
+    the same page (the link itself keeps its scheme)
+    """
+    if url and url.startswith("http://"):
+        return "https://" + url[len("http://"):]
+    return url
+
+
+def needs_resolving(url):
+    try:
+        host = (urlsplit(url).hostname or "").lower()
+    except ValueError:
+        return False
+    if URL_RESOLVE_HOSTS is None:
+        return True
+    return any(host == h or host.endswith("." + h) for h in URL_RESOLVE_HOSTS)
+
+
+class URLCache:
+    """
+    url -> canonical url, in SQLite
+    """
+
+    def __init__(self, path=URL_CACHE_PATH):
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # "resolved_urls" rather than the old "urls" table, whose entries
+        # were forced to https and stripped of non-tracking parameters
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS resolved_urls (url TEXT PRIMARY KEY, canonical TEXT, resolved_at REAL)"
+        )
+        self.conn.commit()
+
+    def get_many(self, urls):
+        urls = list(urls)
+        found = {}
+        with self._lock:
+            for start in range(0, len(urls), 500):
+                chunk = urls[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(self.conn.execute(
+                    f"SELECT url, canonical FROM resolved_urls WHERE url IN ({placeholders})", chunk
+                ).fetchall())
+        return found
+
+    def put_many(self, mapping):
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO resolved_urls (url, canonical, resolved_at) VALUES (?, ?, ?)",
+                [(url, canonical, now) for url, canonical in mapping.items()]
+            )
+
+
+class URLResolver:
+    """
+    Follows redirects with HEAD requests on a pooled session, backed by URLCache
+    """
+
+    def __init__(self, cache=None, workers=URL_RESOLVE_WORKERS):
+        self.cache = cache or URLCache()
+        self.workers = workers
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _resolve(self, url):
+        """
+        Canonical form of the final URL after redirects, None if the request failed
+        """
+        try:
+            response = self.session.head(url, allow_redirects=True, timeout=5)
+            return canonical_url(response.url)
+        except requests.RequestException:
+            return None
+
+    def resolve_many(self, urls):
+        """
+        {url: canonical url} for every url given
+        """
+        urls = {u for u in urls if u}
+        result = {u: canonical_url(u) for u in urls if not needs_resolving(u) or is_local(u)}
+        pending = urls - result.keys()
+        if not pending:
+            return result
+
+        with span("url_resolve", urls=len(pending)) as s:
+            cached = self.cache.get_many(pending)
+            result.update(cached)
+            s.add("cache_hits", len(cached))
+
+            missing = sorted(pending - cached.keys())
+            if missing:
+                with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                    resolved = dict(zip(missing, pool.map(self._resolve, missing)))
+                # Failures are not cached, so they are retried next run
+                self.cache.put_many({u: c for u, c in resolved.items() if c})
+                result.update({u: c or canonical_url(u) for u, c in resolved.items()})
+                s.add("resolved", sum(1 for c in resolved.values() if c))
+        return result
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_resolver():
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = URLResolver()
+        return _resolver
+
+
+def canonicalize_items(news_items):
+    """
+    Replace each item's link with its canonical form (original kept in
+    'original_link' when it differs)
+    """
+    mapping = get_resolver().resolve_many(n.get("link") for n in news_items)
+    for news in news_items:
+        link = news.get("link")
+        canonical = mapping.get(link, link)
+        if canonical and canonical != link:
+            news["original_link"] = link
+            news["link"] = canonical
+    return news_items